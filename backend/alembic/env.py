@@ -0,0 +1,69 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.config import settings
+from app.database import Base
+
+# import model ทุกตัวเพื่อให้ Base.metadata ครบ
+from app.models.review import Review
+from app.models.user import User
+from app.models.prediction_log import PredictionLog
+from app.models.review_stats import ReviewStats
+from app.models.refresh_token import RefreshToken
+from app.models.cache_version import CacheVersion
+from app.services.search_service import is_search_object
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names):
+    # search index (FTS5 / pg_trgm) สร้างด้วย SQL ใน 0007 ไม่มีใน model -> autogenerate ต้องไม่ลบทิ้ง
+    return not (type_ in ("table", "index") and is_search_object(name))
+
+
+def run_migrations_offline():
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=settings.DATABASE_URL.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            # SQLite ALTER TABLE ได้จำกัด -> ใช้ batch mode
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,91 @@
+"""initial schema (users, reviews, prediction_logs)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+ฐานข้อมูลเดิมที่สร้างด้วย Base.metadata.create_all มีตารางอยู่แล้ว
+-> สร้างเฉพาะตารางที่ยังไม่มี แล้ว alembic จะ stamp revision ให้เอง
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("password", sa.String(), nullable=True),
+            sa.Column("google_id", sa.String(), nullable=True, unique=True),
+            sa.Column("full_name", sa.String(), nullable=True),
+            sa.Column("role", sa.String(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("is_verified", sa.Boolean(), nullable=True),
+            sa.Column("reset_token", sa.String(), nullable=True),
+            sa.Column("reset_token_expiry", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if not _has_table("reviews"):
+        op.create_table(
+            "reviews",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("class_name", sa.String(), nullable=False),
+            sa.Column("review_text", sa.String(), nullable=False),
+            sa.Column("rating", sa.Integer(), nullable=False),
+            sa.Column("place_name", sa.String(), nullable=True),
+            sa.Column("latitude", sa.Float(), nullable=True),
+            sa.Column("longitude", sa.Float(), nullable=True),
+            sa.Column("is_deleted", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column(
+                "user_id", sa.String(),
+                sa.ForeignKey("users.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+        )
+        op.create_index("ix_reviews_id", "reviews", ["id"])
+
+    if not _has_table("prediction_logs"):
+        op.create_table(
+            "prediction_logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("image_hash", sa.String(64), nullable=False),
+            sa.Column("class_name", sa.String(), nullable=False),
+            sa.Column("confidence", sa.Float(), nullable=False),
+            sa.Column("cached", sa.Boolean(), nullable=True),
+            sa.Column("read_ms", sa.Float(), nullable=True),
+            sa.Column("preprocess_ms", sa.Float(), nullable=True),
+            sa.Column("inference_ms", sa.Float(), nullable=True),
+            sa.Column("total_ms", sa.Float(), nullable=True),
+            sa.Column(
+                "user_id", sa.String(),
+                sa.ForeignKey("users.id", ondelete="SET NULL"),
+                nullable=True,
+            ),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_prediction_logs_id", "prediction_logs", ["id"])
+        op.create_index("ix_prediction_logs_image_hash", "prediction_logs", ["image_hash"])
+        op.create_index("ix_prediction_logs_user_id", "prediction_logs", ["user_id"])
+        op.create_index("ix_prediction_logs_created_at", "prediction_logs", ["created_at"])
+
+
+def downgrade():
+    op.drop_table("prediction_logs")
+    op.drop_table("reviews")
+    op.drop_table("users")
@@ -0,0 +1,88 @@
+"""composite + partial indexes for review listings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+- (class_name, is_deleted, created_at, id) -> /reviews/class/{class_name}
+- (user_id, is_deleted, created_at, id)    -> /reviews/my/list
+- (created_at, id) WHERE NOT is_deleted     -> /reviews/all/list
+- (latitude, longitude) WHERE latitude IS NOT NULL -> หน้า map
+
+- reviews.created_at NOT NULL (ค่า NULL เดิม -> 1970-01-01)
+
+ดู query plan ก่อน/หลังได้ที่ benchmarks/review_query_plans.py
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# index ชุดเดิมที่ create_all เคยสร้างไว้ (ถูกแทนที่ด้วยชุดใหม่)
+LEGACY_INDEXES = (
+    "ix_reviews_created_at_id",
+    "ix_reviews_class_name_created_at_id",
+    "ix_reviews_user_id_created_at_id",
+)
+
+
+# รีวิวเก่าที่ไม่มี created_at -> ถือเป็นรีวิวเก่าสุด (อยู่ท้าย list)
+LEGACY_CREATED_AT = datetime(1970, 1, 1)
+
+
+def upgrade():
+    # created_at เป็นส่วนหนึ่งของ cursor (created_at, id) -> ห้ามเป็น NULL
+    reviews = sa.table("reviews", sa.column("created_at", sa.DateTime()))
+    op.execute(
+        reviews.update()
+        .where(reviews.c.created_at.is_(None))
+        .values(created_at=LEGACY_CREATED_AT)
+    )
+    with op.batch_alter_table("reviews") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("reviews")}
+
+    for name in LEGACY_INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name="reviews")
+
+    op.create_index(
+        "ix_reviews_class_name_is_deleted_created_at",
+        "reviews",
+        ["class_name", "is_deleted", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_reviews_user_id_is_deleted_created_at",
+        "reviews",
+        ["user_id", "is_deleted", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_reviews_live_created_at",
+        "reviews",
+        ["created_at", "id"],
+        sqlite_where=sa.text("is_deleted = 0"),
+        postgresql_where=sa.text("is_deleted = false"),
+    )
+    op.create_index(
+        "ix_reviews_latitude_longitude",
+        "reviews",
+        ["latitude", "longitude"],
+        sqlite_where=sa.text("latitude IS NOT NULL"),
+        postgresql_where=sa.text("latitude IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_reviews_latitude_longitude", table_name="reviews")
+    op.drop_index("ix_reviews_live_created_at", table_name="reviews")
+    op.drop_index("ix_reviews_user_id_is_deleted_created_at", table_name="reviews")
+    op.drop_index("ix_reviews_class_name_is_deleted_created_at", table_name="reviews")
+
+    with op.batch_alter_table("reviews") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=True)
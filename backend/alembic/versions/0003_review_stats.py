@@ -0,0 +1,69 @@
+"""review_stats aggregate table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+backfill จาก reviews ที่ยังไม่ถูกลบ หลังจากนี้ router อัปเดตเองทุก write
+(คำนวณใหม่ได้ด้วย python -m app.services.review_stats_service rebuild)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "review_stats",
+        sa.Column("class_name", sa.String(), primary_key=True),
+        sa.Column("review_count", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Integer(), nullable=False),
+        sa.Column("rating_1", sa.Integer(), nullable=False),
+        sa.Column("rating_2", sa.Integer(), nullable=False),
+        sa.Column("rating_3", sa.Integer(), nullable=False),
+        sa.Column("rating_4", sa.Integer(), nullable=False),
+        sa.Column("rating_5", sa.Integer(), nullable=False),
+        sa.Column("last_review_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+    reviews = sa.table(
+        "reviews",
+        sa.column("id", sa.Integer()),
+        sa.column("class_name", sa.String()),
+        sa.column("rating", sa.Integer()),
+        sa.column("is_deleted", sa.Boolean()),
+        sa.column("created_at", sa.DateTime()),
+    )
+    review_stats = sa.table(
+        "review_stats",
+        *[sa.column(name) for name in (
+            "class_name", "review_count", "rating_sum",
+            "rating_1", "rating_2", "rating_3", "rating_4", "rating_5",
+            "last_review_at", "updated_at",
+        )]
+    )
+
+    aggregate = (
+        sa.select(
+            reviews.c.class_name,
+            sa.func.count(reviews.c.id),
+            sa.func.sum(reviews.c.rating),
+            *[sa.func.sum(sa.case((reviews.c.rating == r, 1), else_=0)) for r in range(1, 6)],
+            sa.func.max(reviews.c.created_at),
+            sa.func.current_timestamp(),
+        )
+        .where(reviews.c.is_deleted == sa.false())
+        .group_by(reviews.c.class_name)
+    )
+
+    op.execute(review_stats.insert().from_select(list(review_stats.c.keys()), aggregate))
+
+
+def downgrade():
+    op.drop_table("review_stats")
@@ -0,0 +1,102 @@
+"""reviews.geohash + covering index for /reviews/map
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# 🔥 encoder ฉบับตายตัวของ migration นี้ (สำเนาจาก app/utils/geohash.py ณ revision 0004)
+# -> แก้ / ย้าย app.utils.geohash ภายหลังไม่กระทบผลของ migration ที่รันไปแล้ว
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 9
+
+
+def _encode_geohash(latitude: float, longitude: float) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < PRECISION:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lng_range[0] = mid
+            else:
+                value <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_range[0] = mid
+            else:
+                value <<= 1
+                lat_range[1] = mid
+
+        even = not even
+        bits += 1
+
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def upgrade():
+    with op.batch_alter_table("reviews") as batch_op:
+        batch_op.add_column(sa.Column("geohash", sa.String(12), nullable=True))
+
+    # backfill รีวิวที่มีพิกัดอยู่แล้ว
+    reviews = sa.table(
+        "reviews",
+        sa.column("id", sa.Integer()),
+        sa.column("latitude", sa.Float()),
+        sa.column("longitude", sa.Float()),
+        sa.column("geohash", sa.String()),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(reviews.c.id, reviews.c.latitude, reviews.c.longitude)
+        .where(reviews.c.latitude.isnot(None), reviews.c.longitude.isnot(None))
+    ).all()
+
+    if rows:
+        bind.execute(
+            reviews.update()
+            .where(reviews.c.id == sa.bindparam("review_id"))
+            .values(geohash=sa.bindparam("value")),
+            [
+                {"review_id": row.id, "value": _encode_geohash(row.latitude, row.longitude)}
+                for row in rows
+            ],
+        )
+
+    op.create_index(
+        "ix_reviews_geohash_live",
+        "reviews",
+        ["geohash", "class_name", "latitude", "longitude"],
+        sqlite_where=sa.text("is_deleted = 0 AND geohash IS NOT NULL"),
+        postgresql_where=sa.text("is_deleted = false AND geohash IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_reviews_geohash_live", table_name="reviews")
+
+    with op.batch_alter_table("reviews") as batch_op:
+        batch_op.drop_column("geohash")
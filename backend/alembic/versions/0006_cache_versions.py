@@ -0,0 +1,27 @@
+"""cache_versions (response cache invalidation)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(cache_versions, [{"name": "reviews", "version": 0}])
+
+
+def downgrade():
+    op.drop_table("cache_versions")
@@ -0,0 +1,76 @@
+"""full-text search index for /reviews/search
+
+SQLite: FTS5 external-content table (trigram tokenizer) kept in sync by triggers.
+Postgres: pg_trgm GIN index on review_text + place_name.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# 🔥 DDL เขียนตายตัวไว้ใน migration (ไม่ import จาก app.services.search_service)
+# -> แก้ service ภายหลังจะไม่เปลี่ยนสิ่งที่ migration นี้เคยสร้างไปแล้ว
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5("
+    " review_text, place_name,"
+    " content='reviews', content_rowid='id', tokenize='trigram')",
+
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN"
+    " INSERT INTO reviews_fts(rowid, review_text, place_name)"
+    " VALUES (new.id, new.review_text, new.place_name);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN"
+    " INSERT INTO reviews_fts(reviews_fts, rowid, review_text, place_name)"
+    " VALUES ('delete', old.id, old.review_text, old.place_name);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF review_text, place_name ON reviews BEGIN"
+    " INSERT INTO reviews_fts(reviews_fts, rowid, review_text, place_name)"
+    " VALUES ('delete', old.id, old.review_text, old.place_name);"
+    " INSERT INTO reviews_fts(rowid, review_text, place_name)"
+    " VALUES (new.id, new.review_text, new.place_name);"
+    " END",
+
+    # backfill รีวิวที่มีอยู่แล้ว
+    "INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')",
+)
+
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS reviews_fts_au",
+    "DROP TRIGGER IF EXISTS reviews_fts_ad",
+    "DROP TRIGGER IF EXISTS reviews_fts_ai",
+    "DROP TABLE IF EXISTS reviews_fts",
+)
+
+POSTGRES_UPGRADE = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_search_trgm ON reviews"
+    " USING gin ((lower(coalesce(review_text, '') || ' ' || coalesce(place_name, ''))) gin_trgm_ops)",
+)
+
+POSTGRES_DOWNGRADE = (
+    "DROP INDEX IF EXISTS ix_reviews_search_trgm",
+)
+
+
+def _execute(statements):
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade():
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    _execute(SQLITE_UPGRADE if sqlite else POSTGRES_UPGRADE)
+
+
+def downgrade():
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    _execute(SQLITE_DOWNGRADE if sqlite else POSTGRES_DOWNGRADE)
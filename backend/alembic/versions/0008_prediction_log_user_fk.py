@@ -0,0 +1,46 @@
+"""drop prediction_logs.user_id -> users.id foreign key
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+prediction_logs เป็นตาราง analytics ที่เขียนแบบ batch (executemany)
+uid มาจาก token ที่ตรวจแค่ลายเซ็น -> user ที่ถูกลบไปแล้วแถวเดียวทำให้ทั้ง batch
+ผิด FK บน Postgres และถูกทิ้งทั้งชุด จึงเก็บ user_id เป็นค่าเฉยๆ ไม่มี FK
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# SQLite ไม่มีชื่อ constraint -> ตั้งชื่อผ่าน naming convention ตอน batch recreate
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+CONVENTION_NAME = "fk_prediction_logs_user_id_users"
+
+
+def upgrade():
+    foreign_keys = [
+        fk for fk in sa.inspect(op.get_bind()).get_foreign_keys("prediction_logs")
+        if fk["referred_table"] == "users"
+    ]
+
+    for fk in foreign_keys:
+        with op.batch_alter_table("prediction_logs", naming_convention=NAMING_CONVENTION) as batch:
+            batch.drop_constraint(fk["name"] or CONVENTION_NAME, type_="foreignkey")
+
+
+def downgrade():
+    # log ของ user ที่ไม่มีแล้ว -> NULL ก่อนใส่ FK กลับ (เหมือน ondelete SET NULL)
+    op.execute(
+        "UPDATE prediction_logs SET user_id = NULL "
+        "WHERE user_id IS NOT NULL AND user_id NOT IN (SELECT id FROM users)"
+    )
+
+    with op.batch_alter_table("prediction_logs", naming_convention=NAMING_CONVENTION) as batch:
+        batch.create_foreign_key(
+            CONVENTION_NAME, "users", ["user_id"], ["id"], ondelete="SET NULL"
+        )
@@ -11,13 +11,12 @@ from pathlib import Path
 # ชี้ไปที่โฟลเดอร์ backend โดยตรง
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-ENV_PATH = BASE_DIR / ".env.dev"
+# ไฟล์ env ไม่บังคับ (container / CI ตั้งค่าผ่าน environment ตรงๆ ได้)
+# ค่าใน environment มาก่อนค่าในไฟล์เสมอ
+ENV_PATH = Path(os.getenv("ENV_FILE", BASE_DIR / ".env.dev"))
 
 if ENV_PATH.exists():
     load_dotenv(dotenv_path=ENV_PATH)
-    print(f"Loaded ENV from: {ENV_PATH}")
-else:
-    raise FileNotFoundError(f".env.dev not found at {ENV_PATH}")
 
 
 class Settings:
@@ -36,6 +35,34 @@ class Settings:
         "sqlite:///./app.db"
     )
 
+    # ========================
+    # 🏊 Connection Pool (Postgres)
+    # ========================
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
+    # ปิด connection ที่เปิดนานเกินนี้ (กัน server / proxy ตัดทิ้งเอง)
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+    # prepared statement ต่อ connection (asyncpg)
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 256))
+
+    # ========================
+    # ⚡ Async DB (aiosqlite / asyncpg)
+    # ========================
+    # true = endpoint ของ review / auth ใช้ AsyncSession แทน threadpool
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+    # ว่าง = แปลงจาก DATABASE_URL (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+
+    # ========================
+    # 🪶 SQLite (single node)
+    # ========================
+    SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "true").lower() == "true"
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
     # ========================
     # 🔐 JWT
     # ========================
@@ -50,6 +77,9 @@ class Settings:
         os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7)
     )
 
+    # 🍪 Cookie ของ access / refresh token (True เมื่อ deploy HTTPS)
+    COOKIE_SECURE: bool = os.getenv("COOKIE_SECURE", "false").lower() == "true"
+
     # ========================
     # 🔑 Google OAuth
     # ========================
@@ -57,6 +87,12 @@ class Settings:
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
     GOOGLE_REDIRECT_URI: str = os.getenv("GOOGLE_REDIRECT_URI", "")
 
+    # ชี้ไป provider จำลองได้ (benchmarks/fake_oauth.py) เพื่อทดสอบ login แบบ offline
+    GOOGLE_SERVER_METADATA_URL: str = os.getenv(
+        "GOOGLE_SERVER_METADATA_URL",
+        "https://accounts.google.com/.well-known/openid-configuration"
+    )
+
     # ========================
     # 🌐 Frontend URL
     # ========================
@@ -86,6 +122,205 @@ class Settings:
         "app/ml/MobileNetV3-Large.pt"
     )
 
+    # torchscript | torchscript_optimized | int8 | int8_dynamic | onnx
+    MODEL_BACKEND: str = os.getenv("MODEL_BACKEND", "torchscript")
+
+    # fbgemm (x86) / qnnpack (ARM), ว่าง = เลือกตามเครื่อง
+    QUANTIZED_ENGINE: str = os.getenv("QUANTIZED_ENGINE", "")
+
+    # จำนวน class ที่คืนใน top_k และ temperature สำหรับ calibrate softmax
+    PREDICT_TOP_K: int = int(os.getenv("PREDICT_TOP_K", 3))
+
+    MODEL_TEMPERATURE: float = float(os.getenv("MODEL_TEMPERATURE", 1.0))
+
+    # ใช้ ImageNet mean/std ตอน preprocess หรือไม่ (โมเดลปัจจุบันใช้แค่ scale 0-1)
+    MODEL_NORMALIZE: bool = os.getenv("MODEL_NORMALIZE", "false").lower() == "true"
+
+    # ========================
+    # ⚙️ Inference Executor
+    # ========================
+    # thread = ThreadPoolExecutor ในโปรเซสเดียวกัน, process = ProcessPoolExecutor
+    # remote = ส่งงานไป worker service แยก (python -m app.ml.worker) ผ่าน INFERENCE_SOCKET
+    INFERENCE_MODE: str = os.getenv("INFERENCE_MODE", "thread")
+
+    INFERENCE_WORKERS: int = int(
+        os.getenv("INFERENCE_WORKERS", os.cpu_count() or 1)
+    )
+
+    # จำนวนงานที่รอคิวได้ (ไม่รวมงานที่กำลังรันอยู่) เกินนี้ตอบ 429
+    INFERENCE_QUEUE_SIZE: int = int(
+        os.getenv("INFERENCE_QUEUE_SIZE", 32)
+    )
+
+    INFERENCE_TIMEOUT_SECONDS: float = float(
+        os.getenv("INFERENCE_TIMEOUT_SECONDS", 30)
+    )
+
+    INFERENCE_RETRY_AFTER_SECONDS: int = int(
+        os.getenv("INFERENCE_RETRY_AFTER_SECONDS", 1)
+    )
+
+    # remote mode: Unix socket ของ worker service และเวลารอให้ service พร้อมตอน startup
+    INFERENCE_SOCKET: str = os.getenv("INFERENCE_SOCKET", "/tmp/flowerveg-inference.sock")
+
+    INFERENCE_STARTUP_TIMEOUT_SECONDS: float = float(
+        os.getenv("INFERENCE_STARTUP_TIMEOUT_SECONDS", 120)
+    )
+
+    # ========================
+    # 📦 Micro-batching
+    # ========================
+    # รวม request ที่เข้ามาพร้อมกันเป็น batch เดียว (ครบ N ภาพ หรือรอครบ X ms)
+    INFERENCE_MAX_BATCH_SIZE: int = int(
+        os.getenv("INFERENCE_MAX_BATCH_SIZE", 8)
+    )
+
+    INFERENCE_MAX_WAIT_MS: float = float(
+        os.getenv("INFERENCE_MAX_WAIT_MS", 10)
+    )
+
+    # ========================
+    # 📤 Upload Limits
+    # ========================
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+
+    # /predict/batch (multipart หลายไฟล์ หรือ zip)
+    MAX_BATCH_UPLOAD_BYTES: int = int(
+        os.getenv("MAX_BATCH_UPLOAD_BYTES", 100 * 1024 * 1024)
+    )
+
+    PREDICT_BATCH_MAX_FILES: int = int(os.getenv("PREDICT_BATCH_MAX_FILES", 64))
+
+    # ภาพมือถือ 12MP = 12 ล้านพิกเซล, เกินนี้ถือว่าผิดปกติ (decompression bomb)
+    MAX_IMAGE_PIXELS: int = int(os.getenv("MAX_IMAGE_PIXELS", 40_000_000))
+
+    ALLOWED_IMAGE_FORMATS: List[str] = os.getenv(
+        "ALLOWED_IMAGE_FORMATS",
+        "jpeg,png,webp"
+    ).split(",")
+
+    # ========================
+    # 🔥 Model Warm-up
+    # ========================
+    # โหลด + warm-up โมเดลตอน startup แล้วค่อยให้ /ready ตอบ 200
+    MODEL_EAGER_LOAD: bool = os.getenv("MODEL_EAGER_LOAD", "true").lower() == "true"
+
+    MODEL_WARMUP_RUNS: int = int(os.getenv("MODEL_WARMUP_RUNS", 3))
+
+    MODEL_WARMUP_BATCH_SIZES: List[int] = [
+        int(size) for size in os.getenv("MODEL_WARMUP_BATCH_SIZES", "1").split(",") if size.strip()
+    ]
+
+    # ========================
+    # 🗃 Prediction Cache
+    # ========================
+    PREDICT_CACHE_SIZE: int = int(os.getenv("PREDICT_CACHE_SIZE", 1024))
+
+    PREDICT_CACHE_TTL_SECONDS: float = float(
+        os.getenv("PREDICT_CACHE_TTL_SECONDS", 3600)
+    )
+
+    # "" = memory อย่างเดียว, "sqlite" หรือ "disk" = เพิ่ม tier 2
+    PREDICT_CACHE_BACKEND: str = os.getenv("PREDICT_CACHE_BACKEND", "")
+
+    # sqlite = ไฟล์ .db, disk = โฟลเดอร์, redis = URL; ว่าง = default ของแต่ละ backend
+    # (./prediction_cache.db, ./prediction_cache/, redis://localhost:6379/0)
+    PREDICT_CACHE_PATH: str = os.getenv("PREDICT_CACHE_PATH", "")
+
+    PREDICT_CACHE_STORE_TTL_SECONDS: float = float(
+        os.getenv("PREDICT_CACHE_STORE_TTL_SECONDS", 86400)
+    )
+
+    # ใช้ perceptual hash จับภาพที่เกือบซ้ำ (ต้อง decode ก่อน แต่ข้าม inference)
+    PREDICT_CACHE_PHASH: bool = os.getenv("PREDICT_CACHE_PHASH", "false").lower() == "true"
+
+    # dHash 64 bit ต่างกันไม่เกินกี่ bit ถึงนับเป็นภาพเดียวกัน (0 = ต้องตรงทุก bit)
+    PREDICT_CACHE_PHASH_DISTANCE: int = int(os.getenv("PREDICT_CACHE_PHASH_DISTANCE", 4))
+
+    # ========================
+    # 📝 Prediction Log (buffer ในหน่วยความจำ แล้ว INSERT แบบ batch)
+    # ========================
+    PREDICTION_LOG_ENABLED: bool = os.getenv("PREDICTION_LOG_ENABLED", "true").lower() == "true"
+
+    PREDICTION_LOG_BUFFER_SIZE: int = int(os.getenv("PREDICTION_LOG_BUFFER_SIZE", 10000))
+
+    PREDICTION_LOG_BATCH_SIZE: int = int(os.getenv("PREDICTION_LOG_BATCH_SIZE", 500))
+
+    PREDICTION_LOG_FLUSH_MS: float = float(os.getenv("PREDICTION_LOG_FLUSH_MS", 1000))
+
+    # ========================
+    # 📋 Review Pagination (cursor)
+    # ========================
+    REVIEW_PAGE_SIZE: int = int(os.getenv("REVIEW_PAGE_SIZE", 20))
+
+    # limit ที่ client ส่งมาเกินนี้จะถูกตัดลงมา
+    REVIEW_PAGE_MAX: int = int(os.getenv("REVIEW_PAGE_MAX", 100))
+
+    # ========================
+    # 🧊 Review Response Cache (+ ETag / 304)
+    # ========================
+    # จำนวน response (route + params) ที่เก็บต่อ process, 0 = ปิด
+    REVIEW_CACHE_SIZE: int = int(os.getenv("REVIEW_CACHE_SIZE", 512))
+    REVIEW_CACHE_TTL_SECONDS: float = float(os.getenv("REVIEW_CACHE_TTL_SECONDS", 300))
+
+    # อ่าน version จาก DB ไม่บ่อยกว่านี้ (worker อื่นเห็นรีวิวใหม่ช้าสุดเท่านี้)
+    REVIEW_CACHE_VERSION_TTL_SECONDS: float = float(
+        os.getenv("REVIEW_CACHE_VERSION_TTL_SECONDS", 1)
+    )
+
+    # Cache-Control: max-age สำหรับ browser / nginx (0 = revalidate ทุกครั้ง)
+    REVIEW_CACHE_MAX_AGE: int = int(os.getenv("REVIEW_CACHE_MAX_AGE", 0))
+
+    # ========================
+    # 👤 Auth Cache (ไม่ query users ทุก request)
+    # ========================
+    # อายุของ user principal ใน cache (role / profile เปลี่ยนจะลบทิ้งทันที)
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 30))
+
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+
+    # "" = memory ต่อ process, "redis" = แชร์ระหว่าง worker (ต้องมี package redis)
+    AUTH_CACHE_BACKEND: str = os.getenv("AUTH_CACHE_BACKEND", "")
+
+    AUTH_CACHE_REDIS_URL: str = os.getenv("AUTH_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+    # claims ของ JWT ที่ decode แล้ว (key = token)
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
+    # ========================
+    # 🔎 Review Search (/reviews/search)
+    # ========================
+    SEARCH_QUERY_MAX_LENGTH: int = int(os.getenv("SEARCH_QUERY_MAX_LENGTH", 200))
+
+    # จำนวนคำค้นสูงสุดต่อ query (AND กันทุกคำ)
+    SEARCH_MAX_TERMS: int = int(os.getenv("SEARCH_MAX_TERMS", 8))
+
+    # คำที่เจอในรีวิวเกือบทั้งหมด: จัดอันดับเฉพาะ N รีวิวล่าสุดที่ match, 0 = จัดอันดับทั้งหมด
+    # (match ที่เก่ากว่านั้นยังได้อยู่ แค่ต่อท้ายหลังกลุ่มที่จัดอันดับ เรียงใหม่ -> เก่า)
+    SEARCH_RANK_CANDIDATES: int = int(os.getenv("SEARCH_RANK_CANDIDATES", 5000))
+
+    # ตัดคำไทยใน query ด้วย pythainlp (ถ้าติดตั้งไว้)
+    SEARCH_SEGMENT_THAI: bool = os.getenv("SEARCH_SEGMENT_THAI", "true").lower() == "true"
+
+    # ========================
+    # 🗺 Review Map (/reviews/map)
+    # ========================
+    # zoom ตั้งแต่ค่านี้ขึ้นไปส่งจุดรายรีวิว ต่ำกว่านี้ส่งเป็น cluster
+    MAP_CLUSTER_MAX_ZOOM: int = int(os.getenv("MAP_CLUSTER_MAX_ZOOM", 15))
+
+    # จำนวนจุดสูงสุดต่อ request (ที่ zoom สูง)
+    MAP_POINT_LIMIT: int = int(os.getenv("MAP_POINT_LIMIT", 1000))
+
+    # ========================
+    # 📈 Metrics (/metrics, Prometheus)
+    # ========================
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # วัด event loop lag ทุกกี่ ms, 0 = ปิด
+    METRICS_LOOP_LAG_INTERVAL_MS: float = float(os.getenv("METRICS_LOOP_LAG_INTERVAL_MS", 250))
+
     # ========================
     # Validate Critical Config
     # ========================
@@ -93,11 +328,8 @@ class Settings:
         if self.ENV == "prod" and not self.SECRET_KEY:
             raise ValueError("SECRET_KEY is required in production.")
 
-        if not self.GOOGLE_CLIENT_ID:
-            raise ValueError("GOOGLE_CLIENT_ID is empty. Check .env.dev")
-
-        if not self.GOOGLE_CLIENT_SECRET:
-            raise ValueError("GOOGLE_CLIENT_SECRET is empty. Check .env.dev")
+        # Google OAuth ตรวจตอน login ครั้งแรก (app/core/oauth_handler.py)
+        # เพื่อให้ import app / alembic / benchmarks ได้โดยไม่ต้องมี credential
 
 
 settings = Settings()
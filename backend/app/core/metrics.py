@@ -0,0 +1,240 @@
+import asyncio
+import contextvars
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.ml.executor import inference_executor
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# 🔥 หลาย worker (gunicorn -w N / uvicorn --workers N): ตั้ง PROMETHEUS_MULTIPROC_DIR
+# ทุก worker เขียนค่าลงไฟล์ในโฟลเดอร์นั้น แล้ว /metrics ของ worker ไหนก็รวมค่าทุก worker
+# (ไม่ตั้ง = ค่าต่อ process, ใช้ได้เมื่อมี worker เดียว) ดู gunicorn.conf.py
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# วินาที: ครอบคลุมตั้งแต่ query / route เร็วๆ (ms) ถึง inference ที่รอคิวนาน
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+registry = CollectorRegistry(auto_describe=True)
+
+
+# =========================
+# HTTP
+# =========================
+HTTP_REQUESTS = Counter(
+    "http_requests", "HTTP requests by route template and status.",
+    ("method", "route", "status"), registry=registry,
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from request start until the response body is sent.",
+    ("method", "route"), buckets=DEFAULT_BUCKETS, registry=registry,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled.",
+    ("method",), multiprocess_mode="livesum", registry=registry,
+)
+
+# =========================
+# Database (SQLAlchemy event hooks ทุก engine: sync, async, prediction log)
+# =========================
+DB_QUERIES = Counter(
+    "db_queries", "SQL statements executed.",
+    registry=registry,
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Time spent in cursor.execute per statement.",
+    buckets=DEFAULT_BUCKETS, registry=registry,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "http_request_db_queries", "SQL statements executed while handling one request.",
+    ("route",), buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100), registry=registry,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "http_request_db_seconds", "Total SQL time while handling one request.",
+    ("route",), buckets=DEFAULT_BUCKETS, registry=registry,
+)
+
+# =========================
+# /predict: แยก latency ตามช่วง (model ช้า / PIL ช้า / รอคิว)
+# =========================
+PREDICT_STAGE_LATENCY = Histogram(
+    "predict_stage_duration_seconds", "Latency of each /predict stage for images that ran the model.",
+    ("stage",), buckets=DEFAULT_BUCKETS, registry=registry,
+)
+PREDICT_CACHE = Counter(
+    "predict_cache", "Predictions served from cache (hit) or the model (miss).",
+    ("result",), registry=registry,
+)
+# อ่านค่าจาก executor ทุกรอบของ EventLoopMonitor (set_function ใช้ไม่ได้ใน multiprocess mode)
+INFERENCE_PENDING = Gauge(
+    "inference_jobs_pending", "Jobs admitted to the inference executor (running + queued).",
+    multiprocess_mode="livesum", registry=registry,
+)
+
+# =========================
+# Event loop: ถ้ามีโค้ด sync บล็อก loop, lag จะขึ้นที่นี่
+# =========================
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a periodic timer.",
+    buckets=DEFAULT_BUCKETS, registry=registry,
+)
+
+# key ใน timings ของ predict_upload -> ชื่อ stage
+PREDICT_STAGES = (
+    ("read_ms", "upload_read"),
+    ("decode_ms", "decode"),
+    ("tensor_ms", "preprocess"),
+    ("queue_ms", "queue_wait"),
+    ("forward_ms", "forward"),
+    ("postprocess_ms", "postprocess"),
+)
+
+
+def observe_predict(timings: dict):
+    PREDICT_CACHE.labels(result="hit" if timings.get("cached") else "miss").inc()
+
+    for key, stage in PREDICT_STAGES:
+        value = timings.get(key)
+        if value is not None:
+            PREDICT_STAGE_LATENCY.labels(stage=stage).observe(value / 1000)
+
+
+def mark_worker_stopped():
+    # ลบ gauge แบบ live ของ process นี้ออกจากผลรวม (worker ที่ตายกะทันหัน -> gunicorn.conf.py child_exit)
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> bytes:
+    if not MULTIPROCESS:
+        return generate_latest(registry)
+
+    # รวมไฟล์ของทุก worker ทุกครั้งที่ scrape
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return generate_latest(collected)
+
+
+# =========================
+# DB query นับต่อ request ผ่าน contextvar
+# (run_in_threadpool / to_thread / AsyncSession.run_sync ส่ง context ต่อให้อยู่แล้ว)
+# =========================
+class RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_stats = contextvars.ContextVar("request_db_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERIES.inc()
+    DB_QUERY_LATENCY.observe(elapsed)
+
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # statement error -> after_cursor_execute ไม่ถูกเรียก, ทิ้งเวลาเริ่มที่ค้างไว้
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+# =========================
+# ASGI middleware (ครอบนอกสุด -> รวมเวลาของ middleware อื่นด้วย)
+# =========================
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+        in_flight = HTTP_IN_FLIGHT.labels(method=method)
+        in_flight.inc()
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            _request_db_stats.reset(token)
+
+            # ใช้ path template ของ route (/reviews/class/{class_name}) ไม่ใช่ path จริง กัน label บวม
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+
+            HTTP_REQUESTS.labels(method=method, route=route, status=status).inc()
+            HTTP_LATENCY.labels(method=method, route=route).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(route=route).observe(stats.seconds)
+
+
+# =========================
+# Event loop lag monitor
+# =========================
+class EventLoopMonitor:
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - self.interval))
+            INFERENCE_PENDING.set(inference_executor.pending)
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+event_loop_monitor = EventLoopMonitor(settings.METRICS_LOOP_LAG_INTERVAL_MS / 1000)
@@ -0,0 +1,36 @@
+from functools import lru_cache
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+
+# =========================
+# Google OAuth client (สร้างตอน login ครั้งแรก ไม่ใช่ตอน import app)
+# =========================
+@lru_cache(maxsize=1)
+def _build_oauth():
+    from authlib.integrations.starlette_client import OAuth
+
+    oauth = OAuth()
+    oauth.register(
+        name="google",
+        client_id=settings.GOOGLE_CLIENT_ID,
+        client_secret=settings.GOOGLE_CLIENT_SECRET,
+        server_metadata_url=settings.GOOGLE_SERVER_METADATA_URL,
+        client_kwargs={
+            "scope": "openid email profile",
+        }
+    )
+    return oauth
+
+
+def get_oauth():
+    # ไม่ได้ตั้งค่า Google -> route อื่นยังใช้ได้ แค่ login ไม่ได้
+    if not settings.GOOGLE_CLIENT_ID or not settings.GOOGLE_CLIENT_SECRET:
+        raise HTTPException(
+            status_code=503,
+            detail="ยังไม่ได้ตั้งค่า Google login (GOOGLE_CLIENT_ID / GOOGLE_CLIENT_SECRET)"
+        )
+
+    return _build_oauth()
@@ -1,20 +1,52 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
 
 DATABASE_URL = settings.DATABASE_URL
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+# =========================
+# SQLite: WAL ให้อ่านพร้อมกับเขียนได้ + รอ lock แทน error "database is locked"
+# =========================
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")
+    cursor.close()
+
+
+def _pool_options():
+    # SQLite ไม่ต้อง pool แบบ server (ใช้ค่า default ของ SQLAlchemy)
+    if IS_SQLITE:
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
 # ตรวจสอบว่าเป็น SQLite หรือไม่
-if DATABASE_URL.startswith("sqlite"):
+if IS_SQLITE:
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},
         pool_pre_ping=True
     )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 else:
     engine = create_engine(
         DATABASE_URL,
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        **_pool_options()
     )
 
 SessionLocal = sessionmaker(
@@ -33,3 +65,85 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# =========================
+# ⚡ Async engine (DB_ASYNC=true)
+# =========================
+def async_database_url(url: str) -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgres:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    if url.startswith("postgresql+psycopg2:"):
+        return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+    raise ValueError(f"No async driver for {url.split(':', 1)[0]}")
+
+
+def _create_async_engine():
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url = async_database_url(DATABASE_URL)
+
+    if IS_SQLITE:
+        async_engine = create_async_engine(url, pool_pre_ping=True)
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    else:
+        async_engine = create_async_engine(
+            url,
+            pool_pre_ping=True,
+            connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+            **_pool_options()
+        )
+
+    return async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+if settings.DB_ASYNC:
+    async_engine, AsyncSessionLocal = _create_async_engine()
+else:
+    async_engine, AsyncSessionLocal = None, None
+
+
+# =========================
+# DB runner: endpoint เขียนครั้งเดียว ใช้ได้ทั้ง sync / async engine
+#   await db.run(fn, *args)  ->  fn(session, *args)
+# - sync: รัน fn ใน threadpool เหมือน endpoint แบบ def
+# - async: AsyncSession.run_sync รัน fn บน event loop (ไม่กิน thread)
+# =========================
+class SyncDBRunner:
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+class AsyncDBRunner:
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        return await self.session.run_sync(fn, *args, **kwargs)
+
+
+async def get_db_runner():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield AsyncDBRunner(session)
+        return
+
+    session = SessionLocal()
+    try:
+        yield SyncDBRunner(session)
+    finally:
+        # close คืน connection เข้า pool (อาจ rollback) -> ทำใน thread
+        await run_in_threadpool(session.close)
+
+
+async def dispose_engines():
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
@@ -1,28 +1,67 @@
-from fastapi import Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.core.jwt_handler import verify_token
-from app.models.user import User
+from fastapi import Cookie, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.database import get_db_runner
+from app.services.auth_service import UserPrincipal, aget_cached_principal, load_principal
+from app.services.token_service import verify_token
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# auto_error=False: ไม่มี header ก็ยังอ่านจาก cookie ได้
+bearer_scheme = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+# =========================
+# Access token จาก Authorization: Bearer (มาก่อน) หรือ cookie access_token
+# =========================
+def get_access_token(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    access_token: str = Cookie(None),
 ):
+    if credentials:
+        return credentials.credentials
+    return access_token
+
+
+async def get_current_user(
+    token: str = Depends(get_access_token),
+    db=Depends(get_db_runner)
+):
+    if not token:
+        raise HTTPException(
+            status_code=401,
+            detail="กรุณาเข้าสู่ระบบก่อนใช้งาน"
+        )
+
     payload = verify_token(token)
-    email = payload.get("sub")
 
-    user = db.query(User).filter(User.email == email).first()
+    # 🔥 principal จาก cache (query users เฉพาะตอน miss)
+    subject = payload.get("sub")
+    user = await aget_cached_principal(subject)
+    if user is None and subject:
+        user = await db.run(load_principal, subject)
     if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(
+            status_code=401,
+            detail="ไม่พบผู้ใช้งาน กรุณาเข้าสู่ระบบใหม่"
+        )
 
     return user
 
 
-def require_admin(current_user: User = Depends(get_current_user)):
+# =========================
+# Optional user (ไม่บังคับ login) -> user id จาก token โดยไม่ query DB
+# =========================
+def get_optional_user_id(token: str = Depends(get_access_token)):
+    if not token:
+        return None
+
+    try:
+        payload = verify_token(token)
+    except HTTPException:
+        return None
+
+    return payload.get("uid")
+
+
+def require_admin(current_user: UserPrincipal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
     return current_user
@@ -0,0 +1,28 @@
+class InferenceQueueFullError(Exception):
+    """Raised when the inference executor has no free slot for a new job."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class UploadRejectedError(Exception):
+    """Raised when an uploaded image fails size, format or pixel checks."""
+
+    def __init__(self, status_code: int, detail: str):
+        # ส่ง args ครบเพื่อให้ pickle ข้าม process ได้ (INFERENCE_MODE=process)
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ReviewNotFoundError(Exception):
+    """Raised when a review does not exist or has been soft-deleted."""
+
+
+class ReviewPermissionError(Exception):
+    """Raised when the current user may not modify a review."""
+
+
+class InvalidReviewError(ValueError):
+    """Raised when review input (rating, coordinates) is invalid."""
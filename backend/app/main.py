@@ -1,115 +1,198 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from authlib.integrations.starlette_client import OAuth
 
-from app.database import Base, engine
 from app.config import settings
+from app.core.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    event_loop_monitor,
+    mark_worker_stopped,
+    render_metrics,
+)
+from app.database import dispose_engines
+from app.ml.executor import inference_executor
+from app.services.predict_service import prediction_batcher, start_inference
+from app.services.prediction_log_service import prediction_log_buffer
+from app.storage.upload_handler import UploadSizeLimitMiddleware
 
 from app.routers.predict_router import router as predict_router
 from app.routers.auth_router import router as auth_router
 from app.routers.review_router import router as review_router
+from app.routers.location_router import router as location_router
 
-# 🔥 สำคัญมาก ต้อง import model เพื่อให้ Base.metadata.create_all ทำงานครบ
+# 🔥 import model ให้ mapper ครบ (schema อยู่ใน alembic/versions)
 from app.models.review import Review
 from app.models.user import User
+from app.models.prediction_log import PredictionLog
+from app.models.review_stats import ReviewStats
+from app.models.refresh_token import RefreshToken
+from app.models.cache_version import CacheVersion
 
+import asyncio
+import logging
 
-# =========================
-# Create App
-# =========================
-app = FastAPI(
-    title="Flower Veg Enterprise API",
-    docs_url="/docs",
-    redoc_url=None
-)
-
-print("GOOGLE_CLIENT_ID:", settings.GOOGLE_CLIENT_ID)
-print("SECRET_KEY:", settings.SECRET_KEY)
+logger = logging.getLogger(__name__)
 
 
 # =========================
-# 🔥 CORS MUST BE FIRST
+# Startup / Shutdown
 # =========================
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:8000",        # 🔥 เพิ่มตัวนี้
-        "http://127.0.0.1:8000",        # 🔥 เพิ่มตัวนี้
-        "https://your-frontend-domain.onrender.com",
-    ],
-    allow_credentials=True,   # 🔥 สำคัญมากสำหรับ cookie login
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+async def warmup_inference(app: FastAPI):
+    try:
+        # โหลด + warm-up ใน thread แยก ระหว่างนี้ /ping ยังตอบได้ แต่ /ready ตอบ 503
+        await asyncio.to_thread(start_inference)
+    except Exception:
+        logger.exception("Model warm-up failed; worker stays not ready")
+        return
 
+    app.state.ready = True
 
-# =========================
-# 🔥 Session Middleware AFTER CORS
-# =========================
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=settings.SECRET_KEY,
-    same_site="lax",     # local dev ใช้ lax ถูกต้อง
-    https_only=False,    # เปลี่ยนเป็น True ตอน deploy https
-)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = not settings.MODEL_EAGER_LOAD
 
-# =========================
-# OAuth Setup
-# =========================
-if not settings.GOOGLE_CLIENT_ID:
-    raise ValueError("GOOGLE_CLIENT_ID is empty. Check .env.dev")
-
-oauth = OAuth()
-
-oauth.register(
-    name="google",
-    client_id=settings.GOOGLE_CLIENT_ID,
-    client_secret=settings.GOOGLE_CLIENT_SECRET,
-    server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
-    client_kwargs={
-        "scope": "openid email profile",
-    }
-)
+    prediction_log_buffer.start()
+    if settings.METRICS_ENABLED:
+        event_loop_monitor.start()
 
-app.state.oauth = oauth
+    warmup_task = None
+    if settings.MODEL_EAGER_LOAD:
+        warmup_task = asyncio.create_task(warmup_inference(app))
 
+    yield
 
-# =========================
-# 🔥 DEBUG COOKIE CHECK (เพิ่มเพื่อเช็คปัญหา)
-# =========================
-@app.get("/debug-cookie")
-def debug_cookie(request):
-    return {
-        "cookies": request.cookies
-    }
-
-
-# =========================
-# Database (สร้างตารางครบ)
-# =========================
-Base.metadata.create_all(bind=engine)
+    if warmup_task is not None:
+        warmup_task.cancel()
 
-
-# =========================
-# Routers (ไม่ลบของคุณ)
-# =========================
-app.include_router(predict_router)
-app.include_router(auth_router)
-app.include_router(review_router)
+    await prediction_batcher.close()
+    inference_executor.shutdown()
+    await prediction_log_buffer.stop()
+    await event_loop_monitor.stop()
+    mark_worker_stopped()
+    await dispose_engines()
 
 
 # =========================
-# Health
+# Create App
 # =========================
-@app.get("/")
-def root():
-    return {"status": "API Running"}
-
-
-@app.get("/ping")
-def ping():
-    return {"pong": True}
+# 🔥 import app.main ไม่มี side effect หนักๆ: ไม่ import torch (โหลดตอน warm-up / predict ครั้งแรก),
+# ไม่สร้าง OAuth client (สร้างตอน login ครั้งแรก), ไม่แตะ schema (alembic upgrade head)
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="Flower Veg Enterprise API",
+        docs_url="/docs",
+        redoc_url=None,
+        # 🔥 response ทั่วไป encode ด้วย orjson
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+    app.state.ready = not settings.MODEL_EAGER_LOAD
+
+    add_middlewares(app)
+    add_routes(app)
+    return app
+
+
+def add_middlewares(app: FastAPI):
+    # =========================
+    # 📦 จำกัดขนาด upload ของ /predict ก่อนอ่าน body (เพิ่มก่อน CORS เพื่อให้ 413 ยังมี CORS header)
+    # =========================
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        limits={
+            "/predict": settings.MAX_UPLOAD_BYTES,
+            "/predict/batch": settings.MAX_BATCH_UPLOAD_BYTES,
+        }
+    )
+
+    # =========================
+    # 🔥 CORS MUST BE FIRST
+    # =========================
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000",
+            "http://127.0.0.1:3000",
+            "http://localhost:8000",        # 🔥 เพิ่มตัวนี้
+            "http://127.0.0.1:8000",        # 🔥 เพิ่มตัวนี้
+            "https://your-frontend-domain.onrender.com",
+        ],
+        allow_credentials=True,   # 🔥 สำคัญมากสำหรับ cookie login
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
+    )
+
+    # =========================
+    # 🔥 Session Middleware AFTER CORS
+    # =========================
+    app.add_middleware(
+        SessionMiddleware,
+        secret_key=settings.SECRET_KEY,
+        same_site="lax",     # local dev ใช้ lax ถูกต้อง
+        https_only=False,    # เปลี่ยนเป็น True ตอน deploy https
+    )
+
+    # =========================
+    # 📈 Metrics: latency / in-flight / DB query ต่อ route (เพิ่มท้ายสุด = ครอบนอกสุด)
+    # =========================
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+
+def add_routes(app: FastAPI):
+    # =========================
+    # 🔥 DEBUG COOKIE CHECK (เพิ่มเพื่อเช็คปัญหา)
+    # =========================
+    @app.get("/debug-cookie")
+    def debug_cookie(request):
+        return {
+            "cookies": request.cookies
+        }
+
+    # =========================
+    # Routers (ไม่ลบของคุณ)
+    # =========================
+    app.include_router(predict_router)
+    app.include_router(auth_router)
+    app.include_router(review_router)
+    app.include_router(location_router)
+
+    # =========================
+    # Health
+    # =========================
+    @app.get("/")
+    def root():
+        return {"status": "API Running"}
+
+    @app.get("/ping")
+    def ping():
+        return {"pong": True}
+
+    # 🔥 Readiness: ให้ load balancer ส่ง traffic มาเมื่อโมเดล warm-up เสร็จแล้วเท่านั้น
+    @app.get("/ready")
+    def ready(request: Request):
+        if not request.app.state.ready:
+            return JSONResponse(status_code=503, content={"ready": False})
+        return {"ready": True}
+
+    # 📈 Prometheus scrape endpoint
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
+# =========================
+# Database
+# =========================
+# 🔥 schema จัดการด้วย alembic แล้ว (ไม่ create_all ตอน import)
+# รันก่อน start server: cd backend && alembic upgrade head
+
+
+# uvicorn app.main:app (หรือ uvicorn --factory app.main:create_app)
+app = create_app()
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Groups concurrent inference requests into a single batched call.
+
+    Items are collected until ``max_batch_size`` is reached or ``max_wait_ms``
+    has passed since the first item arrived, then ``run_batch(items)`` is
+    awaited once and each caller receives its own slot of the result list.
+    """
+
+    def __init__(self, run_batch, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        # จำนวนครั้งที่รัน batch แยกตามขนาด batch
+        self.batch_size_histogram = Counter()
+
+        self._pending = []
+        self._wakeup = None
+        self._task = None
+        self._loop = None
+        self._inflight = set()
+
+    # =========================
+    # Public API
+    # =========================
+    async def submit(self, item):
+        self._ensure_started()
+
+        future = self._loop.create_future()
+        self._pending.append((item, future))
+        self._wakeup.set()
+
+        return await future
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+        }
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # =========================
+    # Collector loop
+    # =========================
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+
+        # event loop ใหม่ (เช่น reload / test) ต้องสร้าง primitive ใหม่
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._collect())
+
+    async def _collect(self):
+        while True:
+            await self._wakeup.wait()
+
+            deadline = self._loop.time() + self.max_wait
+
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+
+            if not self._pending:
+                self._wakeup.clear()
+
+            # request ที่ถูกยกเลิกไปแล้ว (timeout / client หลุด) ไม่ต้องรัน
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if batch:
+                task = self._loop.create_task(self._dispatch(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch):
+        self.batch_size_histogram[len(batch)] += 1
+
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.config import settings
+from app.exceptions import InferenceQueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_torch_threads(num_threads: int):
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def _init_worker_process(num_threads: int, initializer=None):
+    _configure_torch_threads(num_threads)
+
+    # process mode: ทุก process ต้องโหลด + warm-up โมเดลของตัวเอง
+    if initializer is not None:
+        initializer()
+
+
+class InferenceExecutor:
+    """Runs blocking inference jobs off the event loop with a bounded backlog.
+
+    At most ``workers + queue_size`` jobs are admitted at once; anything beyond
+    that is rejected immediately with ``InferenceQueueFullError`` so callers can
+    answer 429 instead of piling up requests.
+
+    ``mode="remote"`` sends each job to the worker service (``app.ml.worker``)
+    over the Unix socket ``socket_path``; ``workers`` is then the number of jobs
+    in flight to it and this process never imports torch.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 1,
+        queue_size: int = 32,
+        timeout: float = 30.0,
+        retry_after: int = 1,
+        socket_path: str = None,
+        startup_timeout: float = 120.0,
+    ):
+        if mode not in ("thread", "process", "remote"):
+            raise ValueError(f"Unknown inference mode: {mode}")
+
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.socket_path = socket_path
+        self.startup_timeout = startup_timeout
+
+        self._pool = None
+        self._initializer = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    # =========================
+    # Pool lifecycle
+    # =========================
+    def _create_pool(self):
+        if self.mode == "remote":
+            # thread แค่รอ socket (CPU อยู่ที่ worker service) -> ไม่ตั้งค่า torch
+            logger.info("Using remote inference workers at %s: in_flight=%d", self.socket_path, self.workers)
+            return ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="inference-remote",
+            )
+
+        # แบ่ง core ให้ worker แต่ละตัว ไม่ให้ torch intra-op แย่ง CPU กันเอง
+        cores = os.cpu_count() or 1
+        intra_op_threads = max(1, cores // self.workers)
+
+        logger.info(
+            "Starting %s inference pool: workers=%d intra_op_threads=%d",
+            self.mode, self.workers, intra_op_threads
+        )
+
+        if self.mode == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker_process,
+                initargs=(intra_op_threads, self._initializer),
+            )
+
+        _configure_torch_threads(intra_op_threads)
+        return ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="inference",
+        )
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self._create_pool()
+        return self._pool
+
+    def start(self, initializer=None):
+        """Create the pool eagerly and run ``initializer`` before returning.
+
+        Thread mode runs it once (the model is shared by all threads); process
+        mode runs it in every worker process, so this blocks until each worker
+        has spawned and finished its initializer. Remote mode skips it (the
+        worker service warms up itself) and waits until the service answers.
+        """
+        self._initializer = initializer
+        pool = self._get_pool()
+
+        if self.mode == "remote":
+            self._wait_for_remote()
+        elif self.mode == "process":
+            # ส่งงานเปล่าพร้อมกันเท่าจำนวน worker เพื่อบังคับให้ spawn ครบทุก process
+            futures = [pool.submit(os.getpid) for _ in range(self.workers)]
+            pids = {future.result() for future in futures}
+            logger.info("Inference worker processes ready: %s", sorted(pids))
+        elif initializer is not None:
+            pool.submit(initializer).result()
+
+    def _wait_for_remote(self):
+        from app.ml.worker import call_remote
+
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                # worker จะตอบหลัง warm-up เสร็จแล้วเท่านั้น
+                pid = call_remote(self.socket_path, self.startup_timeout, os.getpid)
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Inference worker service not reachable at {self.socket_path}")
+                time.sleep(0.5)
+                continue
+
+            logger.info("Inference worker service ready (worker pid %s)", pid)
+            return
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # =========================
+    # Admission control
+    # =========================
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise InferenceQueueFullError(self.retry_after)
+            self._pending += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    async def submit(self, fn, *args):
+        """Run ``fn(*args)`` in the pool and await its result.
+
+        Raises ``InferenceQueueFullError`` when the backlog is full and
+        ``asyncio.TimeoutError`` when the job does not finish in time. A job
+        that is still queued at timeout is cancelled; one that already started
+        keeps its slot until it finishes.
+        """
+        self._acquire()
+
+        if self.mode == "remote":
+            from app.ml.worker import call_remote
+
+            fn, args = functools.partial(call_remote, self.socket_path, self.timeout, fn), args
+
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+
+        # ปล่อย slot ตอนงานจบจริง ไม่ใช่ตอน request เลิกรอ
+        future.add_done_callback(self._release)
+
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future),
+            timeout=self.timeout
+        )
+
+
+inference_executor = InferenceExecutor(
+    mode=settings.INFERENCE_MODE,
+    workers=settings.INFERENCE_WORKERS,
+    queue_size=settings.INFERENCE_QUEUE_SIZE,
+    timeout=settings.INFERENCE_TIMEOUT_SECONDS,
+    retry_after=settings.INFERENCE_RETRY_AFTER_SECONDS,
+    socket_path=settings.INFERENCE_SOCKET,
+    startup_timeout=settings.INFERENCE_STARTUP_TIMEOUT_SECONDS,
+)
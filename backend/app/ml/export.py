@@ -0,0 +1,100 @@
+"""Build alternative model artifacts from the fp32 TorchScript model.
+
+    python -m app.ml.export optimized   --output app/ml/MobileNetV3-Large.opt.pt
+    python -m app.ml.export int8_dynamic --output app/ml/MobileNetV3-Large.int8.pt
+    python -m app.ml.export int8_static  --output app/ml/MobileNetV3-Large.int8.pt \\
+        --calibration-dir data/calibration
+    python -m app.ml.export onnx        --output app/ml/MobileNetV3-Large.onnx
+
+Serve the result with MODEL_PATH=<output> and MODEL_BACKEND=torchscript
+(optimized), int8 (int8_*) or onnx, then verify it with ``python -m app.ml.parity``.
+"""
+import argparse
+from pathlib import Path
+
+import torch
+
+from app.ml.model_loader import DEFAULT_MODEL_PATH, set_quantized_engine, build_model
+from app.ml.preprocess import INPUT_SIZE, preprocess_batch
+from app.utils.image_utils import list_image_files
+
+
+def _calibration_batches(directory, batch_size: int = 16, limit: int = 256):
+    files = list_image_files(directory)[:limit]
+    if not files:
+        raise SystemExit(f"No calibration images found in {directory}")
+
+    for start in range(0, len(files), batch_size):
+        chunk = files[start:start + batch_size]
+        yield preprocess_batch([path.read_bytes() for path in chunk])
+
+
+def export_optimized(model, output: Path, **_):
+    model = torch.jit.optimize_for_inference(torch.jit.freeze(model))
+    torch.jit.save(model, str(output))
+
+
+def export_int8_dynamic(model, output: Path, **_):
+    from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic_jit
+
+    set_quantized_engine()
+    model = quantize_dynamic_jit(model, {"": default_dynamic_qconfig})
+    torch.jit.save(model, str(output))
+
+
+def export_int8_static(model, output: Path, calibration_dir=None, **_):
+    from torch.ao.quantization import get_default_qconfig, quantize_jit
+
+    if not calibration_dir:
+        raise SystemExit("int8_static needs --calibration-dir")
+
+    set_quantized_engine()
+    qconfig = get_default_qconfig(torch.backends.quantized.engine)
+
+    def calibrate(model, directory):
+        with torch.no_grad():
+            for batch in _calibration_batches(directory):
+                model(batch)
+
+    model = quantize_jit(model, {"": qconfig}, calibrate, [calibration_dir])
+    torch.jit.save(model, str(output))
+
+
+def export_onnx(model, output: Path, **_):
+    dummy = torch.zeros(1, 3, INPUT_SIZE[1], INPUT_SIZE[0])
+    torch.onnx.export(
+        model,
+        dummy,
+        str(output),
+        input_names=["input"],
+        output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=17,
+        dynamo=False,
+    )
+
+
+EXPORTERS = {
+    "optimized": export_optimized,
+    "int8_dynamic": export_int8_dynamic,
+    "int8_static": export_int8_static,
+    "onnx": export_onnx,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("variant", choices=sorted(EXPORTERS))
+    parser.add_argument("--output", required=True, type=Path)
+    parser.add_argument("--source", default=str(DEFAULT_MODEL_PATH), help="fp32 TorchScript model")
+    parser.add_argument("--calibration-dir", help="images used to calibrate int8_static")
+    args = parser.parse_args(argv)
+
+    model = build_model("torchscript", args.source)
+    EXPORTERS[args.variant](model, args.output, calibration_dir=args.calibration_dir)
+
+    print(f"Saved {args.variant} model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,46 @@
+import time
+
 import torch
-from torchvision import transforms
-import json
-import os
 
-BASE_DIR = os.path.dirname(__file__)
+from app.config import settings
+from app.ml.labels import CLASS_NAMES
+from app.ml.preprocess import resize_image, stack_images
+
+def predict(model, image, k: int = None):
+    images = stack_images([resize_image(image)])
+    return predict_batch(model, images, k)[0]
 
-with open(os.path.join(BASE_DIR, "classes.json"), "r", encoding="utf-8") as f:
-    CLASS_NAMES = json.load(f)
 
-transform = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.ToTensor(),
-])
+# =========================
+# Batched forward pass (N, 3, 224, 224) -> N results (top-k ในครั้งเดียว)
+# =========================
+def predict_batch(model, images, k: int = None, timings: dict = None):
+    k = min(k or settings.PREDICT_TOP_K, len(CLASS_NAMES))
 
-def predict(model, image):
-    image = transform(image).unsqueeze(0)
+    start = time.perf_counter()
 
     with torch.no_grad():
-        outputs = model(image)
-        probabilities = torch.softmax(outputs, dim=1)
+        outputs = model(images)
+        forward_end = time.perf_counter()
+
+        # temperature scaling (calibrate ความมั่นใจ), 1.0 = softmax ปกติ
+        probabilities = torch.softmax(outputs / settings.MODEL_TEMPERATURE, dim=1)
+
+        scores, indices = torch.topk(probabilities, k, dim=1)
+
+    results = []
+    for row_indices, row_scores in zip(indices.tolist(), scores.tolist()):
+        top_k = [[index, round(score, 4)] for index, score in zip(row_indices, row_scores)]
+        results.append({
+            "class_name": CLASS_NAMES[row_indices[0]],
+            "confidence": top_k[0][1],
+            "index": row_indices[0],
+            "top_k": top_k,
+        })
 
-        confidence, predicted = torch.max(probabilities, 1)
+    # timings: forward pass / softmax + top-k แยกกัน (ms)
+    if timings is not None:
+        timings["forward_ms"] = round((forward_end - start) * 1000, 3)
+        timings["postprocess_ms"] = round((time.perf_counter() - forward_end) * 1000, 3)
 
-    return {
-        "class_name": CLASS_NAMES[predicted.item()],
-        "confidence": round(confidence.item(), 4)
-    }
+    return results
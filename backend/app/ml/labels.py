@@ -0,0 +1,8 @@
+import json
+import os
+
+BASE_DIR = os.path.dirname(__file__)
+
+# ลำดับตรงกับ output index ของโมเดล
+with open(os.path.join(BASE_DIR, "classes.json"), "r", encoding="utf-8") as f:
+    CLASS_NAMES = json.load(f)
@@ -1,14 +1,146 @@
 import torch
+import numpy as np
+import logging
+import platform
+import threading
 from pathlib import Path
 
+from app.config import settings
+
+ML_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = ML_DIR.parent.parent
+
+DEFAULT_MODEL_PATH = ML_DIR / "MobileNetV3-Large.pt"
+
+logger = logging.getLogger(__name__)
+
 _model = None
+_model_lock = threading.Lock()
+
+
+# =========================
+# Model path (MODEL_PATH relative กับโฟลเดอร์ backend หรือ absolute)
+# =========================
+def resolve_model_path(model_path: str = None) -> Path:
+    path = Path(model_path or settings.MODEL_PATH)
+
+    if not path.is_absolute():
+        path = BACKEND_DIR / path
+
+    if not path.exists():
+        raise FileNotFoundError(f"Model file not found: {path}")
+
+    return path
+
+
+# =========================
+# Backend registry
+# =========================
+MODEL_BACKENDS = {}
+
+
+def register_backend(name: str):
+    def decorator(loader):
+        MODEL_BACKENDS[name] = loader
+        return loader
+    return decorator
+
+
+def set_quantized_engine():
+    engine = settings.QUANTIZED_ENGINE
+    if not engine:
+        engine = "qnnpack" if platform.machine().lower() in ("arm64", "aarch64") else "fbgemm"
+
+    if engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+
+
+@register_backend("torchscript")
+def _load_torchscript(path: Path):
+    model = torch.jit.load(str(path), map_location="cpu")
+    model.eval()
+    return model
+
+
+@register_backend("torchscript_optimized")
+def _load_torchscript_optimized(path: Path):
+    # freeze (inline weights เป็นค่าคงที่) + fuse conv/bn/activation สำหรับ CPU
+    model = _load_torchscript(path)
+    return torch.jit.optimize_for_inference(torch.jit.freeze(model))
+
+
+@register_backend("int8")
+def _load_int8(path: Path):
+    # ไฟล์ที่ quantize ไว้แล้ว (dynamic หรือ static) จาก python -m app.ml.export
+    set_quantized_engine()
+    return _load_torchscript(path)
+
+
+@register_backend("int8_dynamic")
+def _load_int8_dynamic(path: Path):
+    # quantize ตอนโหลด: Linear เป็น int8 (weights), activation คำนวณ scale ตอนรัน
+    from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic_jit
+
+    set_quantized_engine()
+    model = _load_torchscript(path)
+    return quantize_dynamic_jit(model, {"": default_dynamic_qconfig})
+
+
+class OnnxModel:
+    """Callable wrapper that makes an ONNX Runtime session look like a torch module."""
+
+    def __init__(self, path: Path):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError(
+                "MODEL_BACKEND=onnx requires onnxruntime (pip install onnxruntime)"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = torch.get_num_threads()
+
+        self.session = ort.InferenceSession(
+            str(path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def eval(self):
+        return self
+
+    def __call__(self, images: torch.Tensor) -> torch.Tensor:
+        inputs = np.ascontiguousarray(images.numpy(), dtype=np.float32)
+        outputs = self.session.run(None, {self.input_name: inputs})[0]
+        return torch.from_numpy(outputs)
+
+
+@register_backend("onnx")
+def _load_onnx(path: Path):
+    return OnnxModel(path)
+
+
+def build_model(backend: str = None, model_path: str = None):
+    backend = backend or settings.MODEL_BACKEND
+
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(
+            f"Unknown MODEL_BACKEND '{backend}'. "
+            f"Available: {', '.join(sorted(MODEL_BACKENDS))}"
+        )
+
+    return MODEL_BACKENDS[backend](resolve_model_path(model_path))
+
 
 def load_model():
     global _model
 
     if _model is None:
-        model_path = Path(__file__).resolve().parent / "MobileNetV3-Large.pt"
-        _model = torch.jit.load(str(model_path), map_location="cpu")
-        _model.eval()
+        with _model_lock:
+            if _model is None:
+                logger.info("Loading model (%s)...", settings.MODEL_BACKEND)
+                _model = build_model()
 
     return _model
@@ -0,0 +1,93 @@
+"""Check a model backend against the fp32 TorchScript model on held-out images.
+
+    python -m app.ml.parity data/holdout --backend int8 \\
+        --model-path app/ml/MobileNetV3-Large.int8.pt --min-agreement 0.99
+
+Images in sub-folders named after a class in classes.json are also scored
+for accuracy. Exits non-zero when top-1 agreement is below --min-agreement.
+"""
+import argparse
+import json
+import time
+
+import torch
+
+from app.ml.labels import CLASS_NAMES
+from app.ml.model_loader import DEFAULT_MODEL_PATH, build_model
+from app.ml.preprocess import preprocess_batch
+from app.utils.image_utils import list_image_files
+
+
+def _run(model, batches):
+    probabilities = []
+    elapsed = 0.0
+
+    with torch.no_grad():
+        for batch in batches:
+            start = time.perf_counter()
+            outputs = model(batch)
+            elapsed += time.perf_counter() - start
+            probabilities.append(torch.softmax(outputs, dim=1))
+
+    return torch.cat(probabilities), elapsed
+
+
+def check_parity(files, backend, model_path=None, reference_path=None, batch_size=16):
+    batches = [
+        preprocess_batch([path.read_bytes() for path in files[start:start + batch_size]])
+        for start in range(0, len(files), batch_size)
+    ]
+
+    reference = build_model("torchscript", reference_path or str(DEFAULT_MODEL_PATH))
+    candidate = build_model(backend, model_path)
+
+    ref_probs, ref_time = _run(reference, batches)
+    cand_probs, cand_time = _run(candidate, batches)
+
+    ref_top1 = ref_probs.argmax(dim=1)
+    cand_top1 = cand_probs.argmax(dim=1)
+
+    report = {
+        "backend": backend,
+        "images": len(files),
+        "top1_agreement": round((ref_top1 == cand_top1).float().mean().item(), 4),
+        "max_prob_diff": round((ref_probs - cand_probs).abs().max().item(), 4),
+        "reference_ms_per_image": round(ref_time * 1000 / len(files), 3),
+        "candidate_ms_per_image": round(cand_time * 1000 / len(files), 3),
+    }
+
+    # ถ้าโฟลเดอร์แม่เป็นชื่อ class ให้วัด accuracy ด้วย
+    labels = [CLASS_NAMES.index(p.parent.name) if p.parent.name in CLASS_NAMES else -1 for p in files]
+    labelled = torch.tensor(labels) >= 0
+
+    if labelled.any():
+        target = torch.tensor(labels)[labelled]
+        report["reference_accuracy"] = round((ref_top1[labelled] == target).float().mean().item(), 4)
+        report["candidate_accuracy"] = round((cand_top1[labelled] == target).float().mean().item(), 4)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="held-out image directory")
+    parser.add_argument("--backend", required=True)
+    parser.add_argument("--model-path", help="defaults to MODEL_PATH")
+    parser.add_argument("--reference-path", help="fp32 TorchScript model")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    args = parser.parse_args(argv)
+
+    files = list_image_files(args.images)
+    if not files:
+        raise SystemExit(f"No images found in {args.images}")
+
+    report = check_parity(files, args.backend, args.model_path, args.reference_path, args.batch_size)
+    print(json.dumps(report, indent=2))
+
+    if report["top1_agreement"] < args.min_agreement:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
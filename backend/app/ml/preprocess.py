@@ -1,19 +1,96 @@
-from torchvision import transforms
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
+import numpy as np
+import torch
 import io
 
-transform = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.ToTensor(),
-    transforms.Normalize(
-        mean=[0.485, 0.456, 0.406],
-        std=[0.229, 0.224, 0.225]
-    )
-])
+from app.config import settings
+from app.exceptions import UploadRejectedError
+from app.utils.image_utils import check_image_pixels
+
+INPUT_SIZE = (224, 224)
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+# =========================
+# Normalize = (x / 255 - mean) / std  ->  x * scale + bias (คำนวณครั้งเดียวตอน import)
+# =========================
+def _normalize_params(normalize: bool):
+    mean = np.array(IMAGENET_MEAN if normalize else (0.0, 0.0, 0.0), dtype=np.float32)
+    std = np.array(IMAGENET_STD if normalize else (1.0, 1.0, 1.0), dtype=np.float32)
+
+    scale = torch.from_numpy(1.0 / (255.0 * std)).view(1, 3, 1, 1)
+    bias = torch.from_numpy(-mean / std).view(1, 3, 1, 1)
+    return scale, bias
+
+
+_SCALE, _BIAS = _normalize_params(settings.MODEL_NORMALIZE)
+
+
+# =========================
+# Decode -> resize (uint8, HWC)
+# =========================
+def resize_image(image: Image.Image, out: np.ndarray = None) -> np.ndarray:
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    image = image.resize(INPUT_SIZE, Image.BILINEAR, reducing_gap=3.0)
+
+    if out is None:
+        return np.asarray(image, dtype=np.uint8)
+
+    out[...] = image
+    return out
+
+
+def decode_image(file_bytes: bytes, out: np.ndarray = None) -> np.ndarray:
+    try:
+        image = Image.open(io.BytesIO(file_bytes))
+    except Image.DecompressionBombError:
+        raise UploadRejectedError(413, "ภาพมีจำนวนพิกเซลมากเกินกำหนด")
+    except UnidentifiedImageError:
+        raise UploadRejectedError(400, "ไฟล์ไม่ใช่รูปภาพที่รองรับ หรือไฟล์เสียหาย")
+
+    # Image.open อ่านแค่ header -> เช็คขนาดก่อน decode จริง
+    check_image_pixels(image)
+
+    # 🔥 JPEG: ให้ libjpeg ย่อด้วย DCT scaling (1/2, 1/4, 1/8) ระหว่าง decode
+    # ภาพมือถือ 12MP จึงไม่ต้อง decode เต็มความละเอียด
+    image.draft("RGB", INPUT_SIZE)
+
+    try:
+        return resize_image(image, out)
+    except OSError:
+        raise UploadRejectedError(400, "ไม่สามารถอ่านไฟล์รูปภาพได้ ไฟล์อาจเสียหาย")
+
+
+# =========================
+# uint8 (N, H, W, 3) -> float (N, 3, H, W)
+# =========================
+def to_tensor(batch: np.ndarray) -> torch.Tensor:
+    # permute จาก NHWC ได้ tensor แบบ channels_last โดยไม่ต้อง copy
+    tensor = torch.from_numpy(batch).permute(0, 3, 1, 2).float()
+    return tensor.mul_(_SCALE).add_(_BIAS)
+
+
+def stack_images(images) -> torch.Tensor:
+    buffer = np.empty((len(images), INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8)
+
+    for i, image in enumerate(images):
+        buffer[i] = image
+
+    return to_tensor(buffer)
+
+
+def preprocess_batch(files) -> torch.Tensor:
+    buffer = np.empty((len(files), INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8)
+
+    for i, file_bytes in enumerate(files):
+        decode_image(file_bytes, out=buffer[i])
+
+    return to_tensor(buffer)
 
 
 def preprocess_image(file_bytes: bytes):
-    image = Image.open(io.BytesIO(file_bytes)).convert("RGB")
-    image = transform(image)
-    image = image.unsqueeze(0)
-    return image
+    return preprocess_batch([file_bytes])
@@ -0,0 +1,202 @@
+"""Standalone inference worker service (INFERENCE_MODE=remote).
+
+    cd backend && python -m app.ml.worker --socket /tmp/flowerveg-inference.sock --workers 4
+
+API process ส่ง job (ฟังก์ชัน top-level + args แบบ pickle เหมือน ProcessPoolExecutor)
+ผ่าน Unix socket มาให้ worker รัน แล้วส่งผลกลับ -> scale web (uvicorn --workers)
+กับ inference (--workers ของ service นี้) แยกกันได้ และ API ไม่ต้อง import torch เลย
+
+โหลดโมเดลครั้งเดียวใน process แม่ก่อน fork -> weights ของทุก worker ใช้ memory ชุดเดียวกัน
+(copy-on-write) แต่ละ worker warm-up เองแล้วค่อยเริ่ม accept
+"""
+import argparse
+import functools
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import signal
+import socket
+import struct
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("!I")
+
+
+# =========================
+# Protocol: 1 connection = 1 job, [length][pickle] ทั้งสองทาง
+# =========================
+def send_message(sock: socket.socket, message):
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+
+    while view:
+        received = sock.recv_into(view)
+        if not received:
+            raise ConnectionError("Inference worker closed the connection")
+        view = view[received:]
+
+    return bytes(buffer)
+
+
+def recv_message(sock: socket.socket):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return pickle.loads(_recv_exact(sock, size))
+
+
+def call_remote(socket_path: str, timeout: float, fn, *args):
+    """Run ``fn(*args)`` in the worker service and return its result (or raise its error)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        send_message(sock, (fn, args))
+        ok, result = recv_message(sock)
+
+    if not ok:
+        raise result
+    return result
+
+
+# =========================
+# Worker process
+# =========================
+def _handle(conn: socket.socket):
+    try:
+        fn, args = recv_message(conn)
+    except (ConnectionError, EOFError, pickle.UnpicklingError):
+        return
+
+    try:
+        reply = (True, fn(*args))
+    except Exception as e:
+        reply = (False, e)
+
+    try:
+        try:
+            send_message(conn, reply)
+        except pickle.PicklingError:
+            send_message(conn, (False, RuntimeError(repr(reply[1]))))
+    except OSError:
+        # API เลิกรอไปแล้ว (timeout / client หลุด)
+        pass
+
+
+def _serve(listener: socket.socket, num_threads: int, initializer=None):
+    # process แม่จัดการ SIGINT / SIGTERM เอง
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    from app.ml.executor import _configure_torch_threads
+
+    _configure_torch_threads(num_threads)
+    if initializer is not None:
+        initializer()
+
+    # worker ที่ว่างเท่านั้นที่เรียก accept -> kernel กระจายงานให้เอง
+    while True:
+        conn, _ = listener.accept()
+        with conn:
+            _handle(conn)
+
+
+def run_worker_service(socket_path: str, workers: int, preload=None, initializer=None, backlog: int = 128):
+    """Bind ``socket_path``, run ``preload`` once, then fork ``workers`` processes.
+
+    ``initializer`` runs in every worker before it accepts jobs (warm-up).
+    Crashed workers are replaced until SIGINT / SIGTERM.
+    """
+    workers = max(1, workers)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    # job เป็น pickle -> ให้เฉพาะ user เดียวกันเชื่อมต่อได้
+    os.chmod(socket_path, 0o600)
+    listener.listen(backlog)
+
+    # 🔥 โหลดโมเดลก่อน fork: weights อยู่ใน memory ชุดเดียว แชร์แบบ copy-on-write
+    # (ห้ามรัน forward ใน process แม่ ไม่งั้น thread pool ของ torch จะค้างหลัง fork)
+    if preload is not None:
+        preload()
+
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context("fork")
+
+    def spawn():
+        process = context.Process(
+            target=_serve,
+            args=(listener, num_threads, initializer),
+            name="inference-worker",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    processes = [spawn() for _ in range(workers)]
+    logger.info(
+        "Inference worker service on %s: workers=%s intra_op_threads=%d",
+        socket_path, [p.pid for p in processes], num_threads
+    )
+
+    try:
+        while not stopping:
+            multiprocessing.connection.wait([p.sentinel for p in processes], timeout=1)
+
+            for i, process in enumerate(processes):
+                if not process.is_alive() and not stopping:
+                    logger.warning("Inference worker %s exited (%s), restarting", process.pid, process.exitcode)
+                    processes[i] = spawn()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=settings.INFERENCE_SOCKET)
+    parser.add_argument("--workers", type=int, default=settings.INFERENCE_WORKERS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    from app.ml.model_loader import load_model
+    from app.services.predict_service import warmup_model
+
+    batch_sizes = sorted({1, *settings.MODEL_WARMUP_BATCH_SIZES, settings.INFERENCE_MAX_BATCH_SIZE})
+
+    run_worker_service(
+        args.socket,
+        args.workers,
+        preload=load_model,
+        initializer=functools.partial(warmup_model, batch_sizes, settings.MODEL_WARMUP_RUNS),
+    )
+
+
+if __name__ == "__main__":
+    main()
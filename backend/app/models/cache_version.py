@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+
+class CacheVersion(Base):
+    """Monotonic counter per cached resource; bumped in the same transaction as writes."""
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
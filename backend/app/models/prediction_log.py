@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class PredictionLog(Base):
+    __tablename__ = "prediction_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # sha256 ของไฟล์ที่อัปโหลด
+    image_hash = Column(String(64), nullable=False, index=True)
+
+    class_name = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    cached = Column(Boolean, default=False)
+
+    # 🔥 Latency breakdown (ms)
+    read_ms = Column(Float, nullable=True)
+    preprocess_ms = Column(Float, nullable=True)
+    inference_ms = Column(Float, nullable=True)
+    total_ms = Column(Float, nullable=True)
+
+    # ผู้ใช้ที่ login อยู่ (ไม่บังคับ login สำหรับ /predict)
+    # ไม่มี FK: เป็นตาราง analytics ที่ insert ทีละ batch, user ที่ถูกลบไปแล้วต้องไม่ทำให้ทั้ง batch fail
+    user_id = Column(String, nullable=True, index=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
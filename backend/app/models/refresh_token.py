@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # เก็บแค่ sha256 ของ token (ตัว token อยู่ที่ client เท่านั้น)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # 🔥 token ที่ rotate ต่อกันมาอยู่ family เดียวกัน
+    # token เก่าถูกใช้ซ้ำ = หลุด -> revoke ทั้ง family
+    family_id = Column(String(36), nullable=False, index=True)
+
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -7,6 +7,40 @@ from app.database import Base
 class Review(Base):
     __tablename__ = "reviews"
 
+    # 🔥 index ตรงกับ query ของหน้า list (filter แล้วเรียง created_at, id)
+    # ต้องตรงกับ alembic/versions/0002_review_indexes.py
+    __table_args__ = (
+        Index(
+            "ix_reviews_class_name_is_deleted_created_at",
+            "class_name", "is_deleted", "created_at", "id",
+        ),
+        Index(
+            "ix_reviews_user_id_is_deleted_created_at",
+            "user_id", "is_deleted", "created_at", "id",
+        ),
+        # partial index เฉพาะรีวิวที่ยังไม่ถูกลบ (SQLite / Postgres)
+        Index(
+            "ix_reviews_live_created_at",
+            "created_at", "id",
+            sqlite_where=text("is_deleted = 0"),
+            postgresql_where=text("is_deleted = false"),
+        ),
+        # หน้า map: bounding box บน lat/lng เฉพาะรีวิวที่มีพิกัด
+        Index(
+            "ix_reviews_latitude_longitude",
+            "latitude", "longitude",
+            sqlite_where=text("latitude IS NOT NULL"),
+            postgresql_where=text("latitude IS NOT NULL"),
+        ),
+        # หน้า map: GROUP BY prefix ของ geohash (covering index, ไม่ต้องอ่านตาราง)
+        Index(
+            "ix_reviews_geohash_live",
+            "geohash", "class_name", "latitude", "longitude",
+            sqlite_where=text("is_deleted = 0 AND geohash IS NOT NULL"),
+            postgresql_where=text("is_deleted = false AND geohash IS NOT NULL"),
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     class_name = Column(String, nullable=False)
@@ -18,10 +52,14 @@ class Review(Base):
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
 
+    # คำนวณจาก latitude/longitude ตอนเขียน (app.utils.geohash)
+    geohash = Column(String(12), nullable=True)
+
     # 🔥 Soft delete
     is_deleted = Column(Boolean, default=False)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # NOT NULL: เป็นส่วนหนึ่งของ cursor (created_at, id) ของหน้า list
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # 🔥 สำคัญมาก: ต้องเป็น String ให้ตรงกับ User.id
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
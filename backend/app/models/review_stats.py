@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class ReviewStats(Base):
+    """Per-class aggregate of live (not deleted) reviews.
+
+    Kept in step with ``reviews`` by app.services.review_stats_service in the
+    same transaction as each write.
+    """
+    __tablename__ = "review_stats"
+
+    class_name = Column(String, primary_key=True)
+
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+
+    # 🔥 Histogram (แยก column เพื่อให้ UPDATE แบบ x = x + 1 ได้ใน SQL)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+
+    last_review_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0.0
+        return round(self.rating_sum / self.review_count, 2)
+
+    def to_dict(self):
+        return {
+            "class_name": self.class_name,
+            "review_count": self.review_count,
+            "average_rating": self.average_rating,
+            "histogram": {str(r): getattr(self, f"rating_{r}") for r in range(1, 6)},
+            "last_review_at": self.last_review_at,
+        }
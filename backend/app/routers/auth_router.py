@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Request, HTTPException, Cookie, Depends
-from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Request, HTTPException, Cookie, Depends, Body
+from fastapi.responses import JSONResponse, RedirectResponse
 from app.config import settings
-from app.models.user import User
-from app.database import SessionLocal, get_db
-from app.utils.security import create_access_token, verify_token
+from app.core.oauth_handler import get_oauth
+from app.database import get_db_runner
+from app.dependencies import get_current_user
+from app.services.auth_service import UserPrincipal, login_google_user
+from app.services.token_service import (
+    clear_auth_cookies,
+    refresh_session,
+    revoke_refresh_token,
+    set_auth_cookies,
+)
 import logging
 
 router = APIRouter()
@@ -15,7 +21,7 @@ logger = logging.getLogger(__name__)
 # =========================
 @router.get("/google/login")
 async def login_via_google(request: Request):
-    oauth = request.app.state.oauth
+    oauth = get_oauth()
     redirect_uri = request.url_for("auth_callback")
     return await oauth.google.authorize_redirect(request, redirect_uri)
 
@@ -24,96 +30,35 @@ async def login_via_google(request: Request):
 # Google Callback
 # =========================
 @router.get("/google/callback", name="auth_callback")
-async def auth_callback(request: Request):
-    db = SessionLocal()
-
-    try:
-        oauth = request.app.state.oauth
-        token = await oauth.google.authorize_access_token(request)
-        user_info = token.get("userinfo")
-
-        if not user_info:
-            raise HTTPException(
-                status_code=400,
-                detail="ไม่สามารถดึงข้อมูลจาก Google ได้"
-            )
-
-        user = db.query(User).filter(
-            User.email == user_info["email"]
-        ).first()
-
-        if not user:
-            user = User(
-                email=user_info["email"],
-                full_name=user_info.get("name"),
-                google_id=user_info.get("sub"),
-                password=None
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-        jwt_token = create_access_token({"sub": user.email})
-
-        response = RedirectResponse(
-            url=settings.FRONTEND_URL,
-            status_code=302
-        )
-
-        response.set_cookie(
-            key="access_token",
-            value=jwt_token,
-            httponly=True,
-            secure=False,  # True เมื่อ deploy HTTPS
-            samesite="lax",
-            path="/"
-        )
-
-        return response
-
-    finally:
-        db.close()
-
+async def auth_callback(request: Request, db=Depends(get_db_runner)):
+    oauth = get_oauth()
+    token = await oauth.google.authorize_access_token(request)
+    user_info = token.get("userinfo")
 
-# =========================
-# 🔥 JWT Dependency (แก้ไขภาษาไทย)
-# =========================
-def get_current_user(
-    access_token: str = Cookie(None),
-    db: Session = Depends(get_db)
-):
-    if not access_token:
+    if not user_info:
         raise HTTPException(
-            status_code=401,
-            detail="กรุณาเข้าสู่ระบบก่อนใช้งาน"
+            status_code=400,
+            detail="ไม่สามารถดึงข้อมูลจาก Google ได้"
         )
 
-    payload = verify_token(access_token)
+    # 🔥 query / upsert user ผ่าน DB runner (ไม่ block event loop)
+    access_token, refresh_token = await db.run(login_google_user, user_info)
 
-    if not payload:
-        raise HTTPException(
-            status_code=401,
-            detail="Session หมดอายุ กรุณาเข้าสู่ระบบใหม่"
-        )
-
-    user = db.query(User).filter(
-        User.email == payload.get("sub")
-    ).first()
+    response = RedirectResponse(
+        url=settings.FRONTEND_URL,
+        status_code=302
+    )
 
-    if not user:
-        raise HTTPException(
-            status_code=401,
-            detail="ไม่พบผู้ใช้งาน กรุณาเข้าสู่ระบบใหม่"
-        )
+    set_auth_cookies(response, access_token, refresh_token)
 
-    return user
+    return response
 
 
 # =========================
 # GET CURRENT USER
 # =========================
 @router.get("/me")
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: UserPrincipal = Depends(get_current_user)):
     return {
         "user": {
             "email": current_user.email,
@@ -123,15 +68,67 @@ def get_me(current_user: User = Depends(get_current_user)):
     }
 
 
+# =========================
+# 🔄 Refresh (access token หมดอายุ -> ไม่ต้องวนกลับไป Google)
+# cookie: ส่ง refresh_token cookie มา -> ได้ cookie ใหม่
+# header: ส่ง {"refresh_token": "..."} มา -> ได้ token ใหม่ใน body
+# =========================
+@router.post("/auth/refresh")
+async def refresh_tokens(
+    body: dict = Body(None),
+    refresh_token: str = Cookie(None),
+    db=Depends(get_db_runner),
+):
+    from_body = bool(body and body.get("refresh_token"))
+    token = body["refresh_token"] if from_body else refresh_token
+
+    if not token:
+        raise HTTPException(
+            status_code=401,
+            detail="กรุณาเข้าสู่ระบบก่อนใช้งาน"
+        )
+
+    access_token, new_refresh_token = await db.run(refresh_session, token)
+
+    if from_body:
+        return {
+            "access_token": access_token,
+            "refresh_token": new_refresh_token,
+            "token_type": "bearer",
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+
+    response = JSONResponse({"token_type": "bearer", "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60})
+    set_auth_cookies(response, access_token, new_refresh_token)
+    return response
+
+
 # =========================
 # Logout
+# 🔥 revoke refresh token (เปลี่ยน state ฝั่ง server) ต้องเป็น POST เท่านั้น
+# -> link / redirect ข้ามเว็บ (GET) ทำให้ user หลุด session ไม่ได้
+# refresh cookie ถูกส่งมาแค่ใต้ /auth/refresh -> route นี้จึงอยู่ใต้ path นั้น
 # =========================
+@router.post("/auth/refresh/logout")
+async def logout_refresh_session(
+    refresh_token: str = Cookie(None),
+    db=Depends(get_db_runner),
+):
+    if refresh_token:
+        await db.run(revoke_refresh_token, refresh_token)
+
+    response = JSONResponse({"message": "Logged out"})
+    clear_auth_cookies(response)
+    return response
+
+
+# GET /logout: ลบ cookie ใน browser แล้วกลับหน้าเว็บ (ไม่ revoke อะไรฝั่ง server)
 @router.get("/logout")
-def logout():
+async def logout():
     response = RedirectResponse(
         url=settings.FRONTEND_URL,
         status_code=302
     )
 
-    response.delete_cookie("access_token", path="/")
+    clear_auth_cookies(response)
     return response
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.database import get_db_runner
+from app.schemas.location_schema import MapResponse
+from app.services.location_service import get_map
+
+
+router = APIRouter(prefix="/reviews", tags=["Map"])
+
+
+# =========================
+# 🗺 MAP (cluster ที่ zoom ต่ำ / จุดรายรีวิวที่ zoom สูง)
+# =========================
+@router.get("/map", response_model=MapResponse)
+async def review_map(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    zoom: int = Query(..., ge=0, le=22),
+    db=Depends(get_db_runner),
+):
+    try:
+        return await db.run(get_map, bbox, zoom)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
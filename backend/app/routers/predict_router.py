@@ -1,124 +1,180 @@
-from fastapi import APIRouter, UploadFile, File
-from PIL import Image
-import io
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional
+import asyncio
+import logging
+import time
 
-from app.services.predict_service import predict_image
+from app.config import settings
+from app.core.metrics import observe_predict
+from app.exceptions import InferenceQueueFullError, UploadRejectedError
+from app.dependencies import get_optional_user_id
+from app.services.predict_service import predict_upload, predict_many, get_predict_stats, elapsed_ms
+from app.services.prediction_log_service import record_prediction
+from app.services.vegetable_service import CLASS_INDEX, VEGETABLE_INFO
+from app.storage.upload_handler import read_image_upload, read_zip_upload
+from app.utils.response_formatter import (
+    encode_prediction,
+    encode_unknown,
+    encode_value,
+    with_fields,
+)
 
-# =========================
-# 🌿 VEGETABLE INFO DATABASE
-# =========================
-VEGETABLE_INFO = {
-    "มะแขว่น": {
-        "thai_name": "มะแขว่น",
-        "local_name": "หมากแขว่น",
-        "scientific_name": "Zanthoxylum limonella",
-        "properties": "ช่วยขับลม แก้ท้องอืด บำรุงธาตุ",
-        "recommended_menu": "ไส้อั่ว, น้ำพริกมะแขว่น",
-        "botanical_description": "ไม้ยืนต้นขนาดเล็ก มีหนามตามลำต้น",
-        "images": [
-            "/images/makwaen1.png",
-            "/images/makwaen2.png",
-            "/images/makwaen3.png"
-        ]
-    },
-    "สะเดา": {
-        "thai_name": "สะเดา",
-        "local_name": "ผักสะเดา",
-        "scientific_name": "Azadirachta indica",
-        "properties": "ช่วยลดไข้ บำรุงเลือด",
-        "recommended_menu": "สะเดาน้ำปลาหวาน",
-        "botanical_description": "ไม้ยืนต้น ใบประกอบ ดอกสีขาว",
-        "images": [
-            "/images/sadao1.png",
-            "/images/sadao2.png",
-            "/images/sadao3.png"
-        ]
-    },
-    "สะแล": {
-        "thai_name": "สะแล",
-        "local_name": "ผักสะแล",
-        "scientific_name": "Bauhinia purpurea",
-        "properties": "ช่วยบำรุงร่างกาย",
-        "recommended_menu": "แกงแคสะแล",
-        "botanical_description": "ไม้ยืนต้น ดอกสีม่วง",
-        "images": [
-            "/images/salae1.png",
-            "/images/salae2.png",
-            "/images/salae3.png"
-        ]
-    },
-    "นางแลว": {
-        "thai_name": "นางแลว",
-        "local_name": "ดอกนางแลว",
-        "scientific_name": "Clerodendrum glandulosum",
-        "properties": "ช่วยลดความดัน",
-        "recommended_menu": "แกงดอกนางแลว",
-        "botanical_description": "ไม้พุ่ม ดอกเป็นช่อ",
-        "images": [
-            "/images/nanglaew1.png",
-            "/images/nanglaew2.png",
-            "/images/nanglaew3.png"
-        ]
-    },
-    "ผักเผ็ด": {
-        "thai_name": "ผักเผ็ด",
-        "local_name": "ผักแพว",
-        "scientific_name": "Polygonum odoratum",
-        "properties": "ช่วยขับลม เจริญอาหาร",
-        "recommended_menu": "ลาบ, น้ำตก",
-        "botanical_description": "ไม้ล้มลุก ใบเรียวยาว",
-        "images": [
-            "/images/phakphet1.png",
-            "/images/phakphet2.png",
-            "/images/phakphet3.png"
-        ]
-    },
-    "ขี้หูด": {
-        "thai_name": "ผักขี้หูด",
-        "local_name": "ขี้หูด",
-        "scientific_name": "Senna tora",
-        "properties": "ช่วยระบายอ่อน ๆ",
-        "recommended_menu": "แกงผักขี้หูด",
-        "botanical_description": "ไม้ล้มลุก ดอกสีเหลือง",
-        "images": [
-            "/images/kheehud1.png",
-            "/images/kheehud2.png",
-            "/images/kheehud3.png"
-        ]
-    }
-}
 
 router = APIRouter(prefix="/predict", tags=["Prediction"])
+logger = logging.getLogger(__name__)
 
 CONFIDENCE_THRESHOLD = 0.90
 
-@router.post("/")
-async def predict(file: UploadFile = File(...)):
-    contents = await file.read()
-    image = Image.open(io.BytesIO(contents)).convert("RGB")
+UNKNOWN_MESSAGE = encode_value("ไม่สามารถจำแนกได้ กรุณาส่งภาพที่มีผักดอกมาอีกครั้ง")
+
+# =========================
+# Error mapping (ใช้ร่วมกันระหว่าง /predict และ /predict/batch)
+# =========================
+def prediction_error(e: Exception) -> HTTPException:
+    if isinstance(e, UploadRejectedError):
+        return HTTPException(status_code=e.status_code, detail=e.detail)
+
+    if isinstance(e, InferenceQueueFullError):
+        return HTTPException(
+            status_code=429,
+            detail="ระบบกำลังประมวลผลภาพจำนวนมาก กรุณาลองใหม่อีกครั้ง",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    if isinstance(e, asyncio.TimeoutError):
+        return HTTPException(
+            status_code=504,
+            detail="การประมวลผลภาพใช้เวลานานเกินไป กรุณาลองใหม่อีกครั้ง"
+        )
 
-    result = predict_image(image)
+    logger.exception("Prediction failed", exc_info=e)
+    return HTTPException(status_code=500, detail="เกิดข้อผิดพลาดในการประมวลผลภาพ")
 
-    predicted_class = result["class_name"]
 
+def build_prediction_response(result: dict) -> bytes:
     # 🔥 ลด confidence ลง ~4% ให้ดู realistic
-    raw_confidence = float(result["confidence"])
-    confidence = round(raw_confidence * 0.96, 4)
+    confidence = round(float(result["confidence"]) * 0.96, 4)
+
+    top_k = [
+        (CLASS_INDEX[index], round(score * 0.96, 4))
+        for index, score in result["top_k"]
+    ]
 
     # =========================
     # Threshold logic (เหมือนเดิม)
     # =========================
     if confidence < CONFIDENCE_THRESHOLD:
-        return {
-            "class_name": "Unknown",
-            "confidence": confidence,
-            "message": "ไม่สามารถจำแนกได้ กรุณาส่งภาพที่มีผักดอกมาอีกครั้ง"
-        }
-
-    veg_data = VEGETABLE_INFO.get(predicted_class, {})
-
-    return {
-        "class_name": predicted_class,
-        "confidence": confidence,
-        **veg_data
-    }
+        return encode_unknown(confidence, UNKNOWN_MESSAGE, top_k)
+
+    # ข้อมูลผักถูก encode ไว้แล้วใน CLASS_INDEX ตาม output index ของโมเดล
+    return encode_prediction(CLASS_INDEX[result["index"]], confidence, top_k)
+
+
+@router.post("/")
+async def predict(
+    file: UploadFile = File(...),
+    user_id: Optional[str] = Depends(get_optional_user_id),
+):
+    start = time.perf_counter()
+    timings = {}
+
+    # 🔥 อ่านทีละ chunk จำกัดขนาด + เช็ค format ก่อนอ่านทั้งไฟล์
+    # decode + inference รันใน executor ไม่บล็อก event loop (forward pass รวมเป็น batch)
+    try:
+        upload = await read_image_upload(file)
+        timings["read_ms"] = elapsed_ms(start)
+
+        result = await predict_upload(upload.contents, key=upload.sha256, timings=timings)
+    except (UploadRejectedError, InferenceQueueFullError, asyncio.TimeoutError) as e:
+        raise prediction_error(e)
+
+    timings["total_ms"] = elapsed_ms(start)
+    observe_predict(timings)
+
+    # 📝 เข้า buffer ในหน่วยความจำ เขียน DB แบบ batch ทีหลัง
+    record_prediction(upload.sha256, result, timings, user_id)
+
+    return Response(
+        content=build_prediction_response(result),
+        media_type="application/json"
+    )
+
+
+# =========================
+# 📦 BATCH PREDICT (หลายไฟล์ หรือ zip) -> NDJSON ทีละบรรทัดตามลำดับที่เสร็จ
+# =========================
+@router.post("/batch")
+async def predict_batch_upload(
+    files: Optional[List[UploadFile]] = File(None),
+    archive: Optional[UploadFile] = File(None),
+    user_id: Optional[str] = Depends(get_optional_user_id),
+):
+    start = time.perf_counter()
+    uploads = []
+
+    # อ่านไฟล์ทั้งหมดก่อนเริ่ม stream (ไฟล์ชั่วคราวของ multipart อาจถูกปิดหลัง handler return)
+    if archive is not None:
+        try:
+            uploads.extend(await read_zip_upload(archive))
+        except UploadRejectedError as e:
+            raise prediction_error(e)
+
+    for file in files or []:
+        try:
+            uploads.append((file.filename, await read_image_upload(file)))
+        except UploadRejectedError as e:
+            uploads.append((file.filename, e))
+
+    if not uploads:
+        raise HTTPException(status_code=400, detail="กรุณาแนบไฟล์ภาพอย่างน้อย 1 ไฟล์")
+
+    if len(uploads) > settings.PREDICT_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"ส่งภาพได้ไม่เกิน {settings.PREDICT_BATCH_MAX_FILES} ภาพต่อครั้ง"
+        )
+
+    valid = [
+        (index, upload) for index, (_, upload) in enumerate(uploads)
+        if not isinstance(upload, Exception)
+    ]
+
+    def line(index, fields, body=None):
+        fields = {"index": index, "filename": uploads[index][0], **fields}
+
+        if body is None:
+            return encode_value(fields) + b"\n"
+        return with_fields(body, fields) + b"\n"
+
+    async def stream():
+        # ไฟล์ที่ถูกปฏิเสธตั้งแต่ตอนอ่าน ตอบก่อนเลย
+        for index, (_, upload) in enumerate(uploads):
+            if isinstance(upload, Exception):
+                yield line(index, {"status": upload.status_code, "detail": upload.detail})
+
+        async for position, result, timings in predict_many(
+            [(upload.contents, upload.sha256) for _, upload in valid]
+        ):
+            index, upload = valid[position]
+
+            if isinstance(result, Exception):
+                error = prediction_error(result)
+                yield line(index, {"status": error.status_code, "detail": error.detail})
+                continue
+
+            timings["total_ms"] = elapsed_ms(start)
+            observe_predict(timings)
+            record_prediction(upload.sha256, result, timings, user_id)
+
+            yield line(index, {"status": 200}, build_prediction_response(result))
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# =========================
+# 📊 Executor / batching stats
+# =========================
+@router.get("/stats")
+def predict_stats():
+    return get_predict_stats()
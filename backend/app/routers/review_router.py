@@ -1,25 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
 from typing import List, Optional
 
-from app.database import get_db
-from app.models.review import Review
-from app.models.user import User
-from app.schemas.review_schema import ReviewCreate, ReviewResponse
-from app.routers.auth_router import get_current_user
+from app.config import settings
+from app.database import get_db_runner
+from app.schemas.review_schema import (
+    ReviewCreate,
+    ReviewResponse,
+    ReviewSearchResponse,
+    ReviewStatsResponse,
+)
+from app.dependencies import get_current_user
+from app.exceptions import InvalidReviewError, ReviewNotFoundError, ReviewPermissionError
+from app.services.auth_service import UserPrincipal
+from app.services import review_service
+from app.services.review_service import (
+    list_reviews,
+    list_user_reviews,
+    list_class_reviews,
+)
+from app.services.review_stats_service import get_all_stats, get_class_stats
+from app.services.search_service import search_reviews
+from app.utils.response_formatter import encode_rows
+from app.services.review_cache_service import (
+    review_response_cache,
+    cached_review_version,
+    load_review_version,
+    make_etag,
+    etag_matches,
+    cache_control,
+)
 
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
+REVIEW_WRITE_ERRORS = (ReviewNotFoundError, ReviewPermissionError, InvalidReviewError)
+
+
+# =========================
+# Error mapping ของ write (update / location / delete)
+# =========================
+def review_error(e: Exception) -> HTTPException:
+    if isinstance(e, ReviewNotFoundError):
+        return HTTPException(status_code=404, detail="Review not found")
+
+    if isinstance(e, ReviewPermissionError):
+        return HTTPException(status_code=403, detail="Not allowed")
+
+    return HTTPException(status_code=400, detail=str(e))
+
+
+# =========================
+# Cursor pagination helper: body ยังเป็น list เหมือนเดิม, หน้าถัดไปอยู่ใน header X-Next-Cursor
+# 🔥 row -> JSON bytes ด้วย orjson ตรงๆ (ไม่สร้าง ReviewResponse / validate response_model ซ้ำ)
+# =========================
+async def fetch_page(db, fetch, *args, **kwargs):
+    try:
+        rows, next_cursor = await db.run(fetch, *args, **kwargs)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return encode_rows(rows), next_cursor
+
+
+async def paged(db, fetch, *args, **kwargs):
+    body, next_cursor = await fetch_page(db, fetch, *args, **kwargs)
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# =========================
+# 🧊 Public list + response cache: key = path + query + version ของรีวิว
+# version เปลี่ยนทุกครั้งที่มี write -> ไม่ต้องไล่ลบ key
+# =========================
+async def cached_page(request: Request, db, fetch, *args, **kwargs):
+    version = cached_review_version()
+    if version is None:
+        version = await db.run(load_review_version)
+
+    key = f"{version}|{request.url.path}?{sorted(request.query_params.multi_items())}"
+    entry = review_response_cache.get(key)
+
+    if entry is None:
+        body, next_cursor = await fetch_page(db, fetch, *args, **kwargs)
+        entry = (body, make_etag(body), next_cursor)
+        review_response_cache.set(key, entry)
+
+    body, etag, next_cursor = entry
+    headers = {"ETag": etag, "Cache-Control": cache_control()}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    # client / nginx มี body นี้แล้ว -> 304 ไม่ต้องส่งซ้ำ
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 # =========================
 # ⭐ CREATE REVIEW
 # =========================
 @router.post("/", response_model=dict)
-def create_review(
+async def create_review(
     review: ReviewCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db=Depends(get_db_runner),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -27,54 +113,38 @@ def create_review(
     if review.rating < 1 or review.rating > 5:
         raise HTTPException(status_code=400, detail="Rating must be 1-5")
 
-    new_review = Review(
-        class_name=review.class_name,
-        review_text=review.review_text,
-        rating=review.rating,
-        user_id=current_user.id,
+    review_id = await db.run(
+        review_service.create_review,
+        current_user.id,
+        review.class_name,
+        review.review_text,
+        review.rating,
     )
 
-    db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
-
-    return {"review_id": new_review.id}
+    return {"review_id": review_id}
 
 
 # =========================
 # ✏ UPDATE REVIEW (JSON SAFE)
 # =========================
 @router.put("/{review_id}", response_model=dict)
-def update_review(
+async def update_review(
     review_id: int,
     data: dict = Body(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db=Depends(get_db_runner),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
 
-    review = db.query(Review).filter(
-        Review.id == review_id,
-        Review.is_deleted == False
-    ).first()
-
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
-
-    if review.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
-
-    rating = data.get("rating")
-    review_text = data.get("review_text")
-
-    if rating is not None:
-        if rating < 1 or rating > 5:
-            raise HTTPException(status_code=400, detail="Rating must be 1-5")
-        review.rating = rating
-
-    if review_text is not None:
-        review.review_text = review_text
-
-    db.commit()
+    try:
+        await db.run(
+            review_service.update_review,
+            review_id,
+            current_user.id,
+            rating=data.get("rating"),
+            review_text=data.get("review_text"),
+        )
+    except REVIEW_WRITE_ERRORS as e:
+        raise review_error(e)
 
     return {"message": "Review updated successfully"}
 
@@ -83,130 +153,103 @@ def update_review(
 # 📍 UPDATE LOCATION
 # =========================
 @router.put("/{review_id}/location", response_model=dict)
-def update_location(
+async def update_location(
     review_id: int,
     data: dict = Body(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db=Depends(get_db_runner),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
 
-    review = db.query(Review).filter(
-        Review.id == review_id,
-        Review.is_deleted == False
-    ).first()
+    try:
+        await db.run(
+            review_service.update_review_location,
+            review_id,
+            current_user.id,
+            data.get("latitude"),
+            data.get("longitude"),
+            data.get("place_name"),
+        )
+    except REVIEW_WRITE_ERRORS as e:
+        raise review_error(e)
 
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
+    return {"message": "Location updated successfully"}
 
-    if review.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
 
-    review.latitude = data.get("latitude")
-    review.longitude = data.get("longitude")
-    review.place_name = data.get("place_name")
+# =========================
+# 📊 REVIEW STATS (อ่านจาก review_stats ไม่ต้องดึงรีวิวทั้งหมด)
+# =========================
+@router.get("/stats", response_model=List[ReviewStatsResponse])
+async def review_stats(db=Depends(get_db_runner)):
+    return await db.run(get_all_stats)
 
-    db.commit()
 
-    return {"message": "Location updated successfully"}
+@router.get("/stats/{class_name}", response_model=ReviewStatsResponse)
+async def review_stats_by_class(class_name: str, db=Depends(get_db_runner)):
+    return await db.run(get_class_stats, class_name)
 
 
 # =========================
 # 📋 GET ALL REVIEWS (Pagination)
 # =========================
 @router.get("/all/list", response_model=List[ReviewResponse])
-def get_all_reviews(
-    skip: int = Query(0),
-    limit: int = Query(20),
-    db: Session = Depends(get_db),
+async def get_all_reviews(
+    request: Request,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(settings.REVIEW_PAGE_SIZE, ge=1),
+    cursor: Optional[str] = Query(None),
+    db=Depends(get_db_runner),
 ):
 
-    reviews = (
-        db.query(Review)
-        .filter(Review.is_deleted == False)
-        .order_by(Review.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    # 🔥 JOIN users ใน query เดียว (เดิม lazy load r.user ทีละแถว = N+1)
+    return await cached_page(request, db, list_reviews, limit=limit, cursor=cursor, skip=skip)
 
-    return [
-        ReviewResponse(
-            id=r.id,
-            class_name=r.class_name,
-            review_text=r.review_text,
-            rating=r.rating,
-            username=r.user.full_name if r.user else "Unknown",
-            created_at=r.created_at,
-            latitude=r.latitude,
-            longitude=r.longitude,
-            place_name=r.place_name,
-        )
-        for r in reviews
-    ]
+
+# =========================
+# 🔎 SEARCH (review_text + place_name, เรียงตามความตรง)
+# =========================
+@router.get("/search", response_model=List[ReviewSearchResponse])
+async def search(
+    q: str = Query(..., min_length=1),
+    class_name: Optional[str] = Query(None),
+    limit: int = Query(settings.REVIEW_PAGE_SIZE, ge=1),
+    cursor: Optional[str] = Query(None),
+    db=Depends(get_db_runner),
+):
+
+    return await paged(db, search_reviews, q, class_name=class_name, limit=limit, cursor=cursor)
 
 
 # =========================
 # 👤 MY REVIEWS
 # =========================
 @router.get("/my/list", response_model=List[ReviewResponse])
-def my_reviews(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def my_reviews(
+    limit: int = Query(settings.REVIEW_PAGE_SIZE, ge=1),
+    cursor: Optional[str] = Query(None),
+    db=Depends(get_db_runner),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
 
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    reviews = (
-        db.query(Review)
-        .filter(
-            Review.user_id == current_user.id,
-            Review.is_deleted == False
-        )
-        .order_by(Review.created_at.desc())
-        .all()
-    )
-
-    return [
-        ReviewResponse(
-            id=r.id,
-            class_name=r.class_name,
-            review_text=r.review_text,
-            rating=r.rating,
-            username=r.user.full_name if r.user else "Unknown",
-            created_at=r.created_at,
-            latitude=r.latitude,
-            longitude=r.longitude,
-            place_name=r.place_name,
-        )
-        for r in reviews
-    ]
+    return await paged(db, list_user_reviews, current_user.id, limit=limit, cursor=cursor)
 
 
 # =========================
 # 🗑 DELETE REVIEW (Soft Delete + Admin)
 # =========================
 @router.delete("/{review_id}", response_model=dict)
-def delete_review(
+async def delete_review(
     review_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db=Depends(get_db_runner),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
 
-    review = db.query(Review).filter(
-        Review.id == review_id,
-        Review.is_deleted == False
-    ).first()
-
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
-
-    # 🔥 owner หรือ admin ลบได้
-    if review.user_id != current_user.id and not current_user.is_admin():
-        raise HTTPException(status_code=403, detail="Not allowed")
-
-    review.is_deleted = True
-    db.commit()
+    try:
+        await db.run(review_service.delete_review, review_id, current_user.id, current_user.is_admin())
+    except REVIEW_WRITE_ERRORS as e:
+        raise review_error(e)
 
     return {"message": "Review deleted successfully"}
 
@@ -215,32 +258,12 @@ def delete_review(
 # 📄 GET REVIEWS BY CLASS (FIX ROUTE CONFLICT)
 # =========================
 @router.get("/class/{class_name}", response_model=List[ReviewResponse])
-def get_reviews_by_class(
+async def get_reviews_by_class(
     class_name: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    limit: int = Query(settings.REVIEW_PAGE_SIZE, ge=1),
+    cursor: Optional[str] = Query(None),
+    db=Depends(get_db_runner),
 ):
 
-    reviews = (
-        db.query(Review)
-        .filter(
-            Review.class_name == class_name,
-            Review.is_deleted == False
-        )
-        .order_by(Review.created_at.desc())
-        .all()
-    )
-
-    return [
-        ReviewResponse(
-            id=r.id,
-            class_name=r.class_name,
-            review_text=r.review_text,
-            rating=r.rating,
-            username=r.user.full_name if r.user else "Unknown",
-            created_at=r.created_at,
-            latitude=r.latitude,
-            longitude=r.longitude,
-            place_name=r.place_name,
-        )
-        for r in reviews
-    ]
+    return await cached_page(request, db, list_class_reviews, class_name, limit=limit, cursor=cursor)
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class MapCluster(BaseModel):
+    geohash: str
+    count: int
+    latitude: float
+    longitude: float
+    class_name: str
+
+
+class MapPoint(BaseModel):
+    id: int
+    class_name: str
+    rating: int
+    place_name: Optional[str] = None
+    latitude: float
+    longitude: float
+
+
+class MapResponse(BaseModel):
+    zoom: int
+    clusters: List[MapCluster]
+    points: List[MapPoint]
+    truncated: bool
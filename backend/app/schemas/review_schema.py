@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, Optional
 from datetime import datetime
 
 
@@ -21,5 +21,17 @@ class ReviewResponse(BaseModel):
     longitude: Optional[float] = None
     place_name: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReviewSearchResponse(ReviewResponse):
+    # ยิ่งน้อยยิ่งตรง (bm25)
+    score: float
+
+
+class ReviewStatsResponse(BaseModel):
+    class_name: str
+    review_count: int
+    average_rating: float
+    histogram: Dict[str, int]
+    last_review_at: Optional[datetime] = None
@@ -0,0 +1,145 @@
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.services.token_service import create_access_token, create_refresh_token
+from app.utils.cache import LRUCache, create_cache_store
+
+
+# =========================
+# User principal: ข้อมูลผู้ใช้ที่ endpoint ต้องใช้ (ไม่ผูกกับ DB session)
+# =========================
+@dataclass(frozen=True)
+class UserPrincipal:
+    id: str
+    email: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+
+    def is_admin(self):
+        return self.role == "admin"
+
+
+PRINCIPAL_COLUMNS = (User.id, User.email, User.full_name, User.role, User.is_active)
+
+
+def _create_principal_cache():
+    # redis: ทุก worker เห็น cache เดียวกัน -> invalidate ครั้งเดียวมีผลทุก process
+    store = create_cache_store(
+        settings.AUTH_CACHE_BACKEND,
+        settings.AUTH_CACHE_REDIS_URL,
+        settings.AUTH_CACHE_TTL_SECONDS,
+    )
+    if store is not None:
+        return store
+    return LRUCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+
+principal_cache = _create_principal_cache()
+
+
+def _cache_key(subject: str) -> str:
+    return f"principal:{subject}"
+
+
+def get_cached_principal(subject: str) -> Optional[UserPrincipal]:
+    if not subject:
+        return None
+
+    cached = principal_cache.get(_cache_key(subject))
+    if cached is None:
+        return None
+    return UserPrincipal(**cached)
+
+
+async def aget_cached_principal(subject: str) -> Optional[UserPrincipal]:
+    """``get_cached_principal`` for the event loop: in-memory LRU inline, Redis in a thread."""
+    if isinstance(principal_cache, LRUCache):
+        return get_cached_principal(subject)
+
+    # 🔥 redis = network round-trip ทุก request -> ห้ามบล็อก event loop
+    return await asyncio.to_thread(get_cached_principal, subject)
+
+
+def load_principal(db: Session, subject: str) -> Optional[UserPrincipal]:
+    """Read a principal from the DB and cache it."""
+    row = db.query(*PRINCIPAL_COLUMNS).filter(User.email == subject).first()
+    if row is None:
+        return None
+
+    principal = UserPrincipal(
+        id=row.id,
+        email=row.email,
+        full_name=row.full_name,
+        role=row.role,
+        is_active=row.is_active,
+    )
+    principal_cache.set(_cache_key(subject), asdict(principal))
+    return principal
+
+
+def get_principal(db: Session, subject: str) -> Optional[UserPrincipal]:
+    """Resolve a token subject (email) to a principal, hitting the DB only on a miss."""
+    if not subject:
+        return None
+    return get_cached_principal(subject) or load_principal(db, subject)
+
+
+# =========================
+# Google login: หา / สร้าง user แล้วออก token คู่ใหม่
+# =========================
+def login_google_user(db: Session, user_info: dict):
+    user = db.query(User).filter(
+        User.email == user_info["email"]
+    ).first()
+
+    if not user:
+        user = User(
+            email=user_info["email"],
+            full_name=user_info.get("name"),
+            google_id=user_info.get("sub"),
+            password=None
+        )
+        db.add(user)
+        db.flush()
+
+    # uid ใน token: endpoint ที่ไม่บังคับ login รู้ user id ได้โดยไม่ต้อง query DB
+    access_token = create_access_token({"sub": user.email, "uid": user.id})
+    refresh_token = create_refresh_token(db, user.id)
+    db.commit()
+
+    return access_token, refresh_token
+
+
+def invalidate_principal(subject: str):
+    principal_cache.delete(_cache_key(subject))
+
+
+def get_auth_cache_stats():
+    return principal_cache.stats()
+
+
+# =========================
+# 🔥 User ถูกแก้ผ่าน ORM ที่ไหนก็ตาม (role / ชื่อ / email / ลบ) -> ลบ principal ทิ้ง
+# (bulk query.update() ไม่ผ่าน event นี้ ต้องเรียก invalidate_principal เอง)
+# =========================
+@event.listens_for(User.email, "set", active_history=True)
+def _remember_old_email(target, value, oldvalue, initiator):
+    # email เปลี่ยน -> key เดิมต้องหายด้วยตอน flush
+    if isinstance(oldvalue, str) and oldvalue != value:
+        inspect(target).info.setdefault("old_emails", set()).add(oldvalue)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    invalidate_principal(target.email)
+
+    for old_email in inspect(target).info.pop("old_emails", ()):
+        invalidate_principal(old_email)
@@ -0,0 +1,180 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.exceptions import InvalidReviewError
+from app.models.review import Review
+from app.utils import geohash
+
+
+# =========================
+# zoom ของแผนที่ (Leaflet / slippy tiles) -> ความยาว prefix ของ geohash
+# cell ประมาณ 1/4 ของ tile 256px -> cluster ห่างกันราว 60px บนจอ
+# =========================
+ZOOM_PRECISION = (
+    (3, 1),    # ~5000 km
+    (5, 2),    # ~1250 km
+    (8, 3),    # ~156 km
+    (10, 4),   # ~39 km
+    (13, 5),   # ~4.9 km
+    (15, 6),   # ~1.2 km
+)
+
+
+def precision_for_zoom(zoom: int) -> int:
+    for max_zoom, precision in ZOOM_PRECISION:
+        if zoom < max_zoom:
+            return precision
+    return ZOOM_PRECISION[-1][1] + 1
+
+
+def parse_bbox(bbox: str):
+    """Parse ``min_lng,min_lat,max_lng,max_lat`` (Leaflet ``toBBoxString()``)."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+        raise ValueError("bbox is out of range")
+
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_coordinates(latitude, longitude):
+    """Return ``(latitude, longitude)`` as floats, or ``(None, None)`` to clear the location."""
+    if latitude is None and longitude is None:
+        return None, None
+
+    if latitude is None or longitude is None:
+        raise InvalidReviewError("latitude and longitude must be set together")
+
+    try:
+        # bool เป็น int ใน Python -> ไม่รับ
+        if isinstance(latitude, bool) or isinstance(longitude, bool):
+            raise TypeError
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise InvalidReviewError("latitude and longitude must be numbers")
+
+    # NaN ไม่ผ่านการเทียบ -> ตกเงื่อนไขนี้ด้วย
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise InvalidReviewError("latitude must be -90..90 and longitude -180..180")
+
+    return latitude, longitude
+
+
+def set_review_location(review: Review, latitude, longitude, place_name):
+    """Raises ``InvalidReviewError`` on invalid coordinates (router -> 400)."""
+    latitude, longitude = parse_coordinates(latitude, longitude)
+
+    review.latitude = latitude
+    review.longitude = longitude
+    review.place_name = place_name
+
+    # 🔥 geohash คำนวณตอนเขียน -> หน้า map GROUP BY ได้เลย
+    if latitude is None:
+        review.geohash = None
+    else:
+        review.geohash = geohash.encode(latitude, longitude)
+
+
+def _in_bbox(query, bbox):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    return query.filter(
+        Review.is_deleted == False,
+        Review.geohash.isnot(None),
+        Review.latitude.between(min_lat, max_lat),
+        Review.longitude.between(min_lng, max_lng),
+    )
+
+
+# =========================
+# zoom ต่ำ: cluster ต่อ cell (count, centroid, class ที่พบมากที่สุด)
+# =========================
+def get_clusters(db: Session, bbox, precision: int) -> list:
+    cell = func.substr(Review.geohash, 1, precision).label("cell")
+
+    # แถวละ (cell, class) -> รวมเป็น cell ใน Python (จำนวนแถว = cell x class)
+    rows = (
+        _in_bbox(
+            db.query(
+                cell,
+                Review.class_name,
+                func.count(),
+                func.sum(Review.latitude),
+                func.sum(Review.longitude),
+            ),
+            bbox,
+        )
+        .group_by(cell, Review.class_name)
+        .all()
+    )
+
+    clusters = {}
+    for cell_id, class_name, count, lat_sum, lng_sum in rows:
+        cluster = clusters.setdefault(cell_id, {
+            "geohash": cell_id,
+            "count": 0,
+            "lat_sum": 0.0,
+            "lng_sum": 0.0,
+            "class_name": class_name,
+            "class_count": 0,
+        })
+        cluster["count"] += count
+        cluster["lat_sum"] += lat_sum
+        cluster["lng_sum"] += lng_sum
+
+        if count > cluster["class_count"]:
+            cluster["class_name"] = class_name
+            cluster["class_count"] = count
+
+    return [
+        {
+            "geohash": cluster["geohash"],
+            "count": cluster["count"],
+            "latitude": cluster["lat_sum"] / cluster["count"],
+            "longitude": cluster["lng_sum"] / cluster["count"],
+            "class_name": cluster["class_name"],
+        }
+        for cluster in clusters.values()
+    ]
+
+
+# =========================
+# zoom สูง: จุดรายรีวิว (จำกัดจำนวน)
+# =========================
+def get_points(db: Session, bbox, limit: int):
+    rows = (
+        _in_bbox(
+            db.query(
+                Review.id,
+                Review.class_name,
+                Review.rating,
+                Review.place_name,
+                Review.latitude,
+                Review.longitude,
+            ),
+            bbox,
+        )
+        .order_by(Review.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    return [dict(row._mapping) for row in rows[:limit]], len(rows) > limit
+
+
+def get_map(db: Session, bbox: str, zoom: int) -> dict:
+    bounds = parse_bbox(bbox)
+
+    if zoom >= settings.MAP_CLUSTER_MAX_ZOOM:
+        points, truncated = get_points(db, bounds, settings.MAP_POINT_LIMIT)
+        return {"zoom": zoom, "clusters": [], "points": points, "truncated": truncated}
+
+    return {
+        "zoom": zoom,
+        "clusters": get_clusters(db, bounds, precision_for_zoom(zoom)),
+        "points": [],
+        "truncated": False,
+    }
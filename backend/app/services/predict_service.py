@@ -1,17 +1,238 @@
-from app.ml.model_loader import load_model
-from app.ml.inference import predict
-import threading
+from app.config import settings
+from app.ml.batcher import MicroBatcher
+from app.ml.executor import inference_executor
+from app.utils.cache import HammingIndex, LRUCache, TieredCache, create_cache_store
+from app.utils.image_utils import dhash
+from app.storage.upload_handler import get_upload_stats
+from app.services.prediction_log_service import prediction_log_buffer
+import numpy as np
+import asyncio
+import functools
+import hashlib
+import logging
+import time
 
-_model = None
-_model_lock = threading.Lock()
+logger = logging.getLogger(__name__)
 
+
+# 🔥 app.ml.{model_loader, inference, preprocess} import torch -> import ตอนใช้งานครั้งแรก
+# (ใน executor) ไม่ใช่ตอน import app: route ที่ไม่ใช้โมเดลไม่ต้องจ่ายค่า import torch
 def predict_image(image):
-    global _model
+    from app.ml.inference import predict
+    from app.ml.model_loader import load_model
+
+    return predict(load_model(), image)
+
+
+# =========================
+# Job สำหรับ inference executor (ต้องเป็นฟังก์ชัน top-level เพื่อให้ pickle ได้ใน process mode)
+# =========================
+# คืนเวลาที่ใช้จริงใน worker ด้วย -> ส่วนที่เหลือของ wall time คือเวลารอคิว
+def preprocess_bytes(contents: bytes):
+    from app.ml.preprocess import decode_image
+
+    start = time.perf_counter()
+    image = decode_image(contents)
+    return image, elapsed_ms(start)
+
+
+def predict_arrays(images):
+    from app.ml.inference import predict_batch
+    from app.ml.model_loader import load_model
+    from app.ml.preprocess import stack_images
+
+    start = time.perf_counter()
+
+    # normalize ทั้ง batch ในครั้งเดียว
+    tensor = stack_images(images)
+    timings = {"tensor_ms": elapsed_ms(start)}
+
+    return predict_batch(load_model(), tensor, timings=timings), timings
+
+
+# =========================
+# 🔥 Warm-up: โหลดโมเดล + รัน forward pass ทุกขนาด batch ที่ใช้จริง
+# (TorchScript profiling executor จะ optimize graph หลังรันไป 2-3 รอบ)
+# =========================
+def warmup_model(batch_sizes, runs: int):
+    from app.ml.inference import predict_batch
+    from app.ml.model_loader import load_model
+    from app.ml.preprocess import INPUT_SIZE, stack_images
+
+    model = load_model()
+    # ภาพหลัง decode เป็น HWC: INPUT_SIZE = (width, height)
+    blank = np.zeros((INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    for batch_size in batch_sizes:
+        images = stack_images([blank] * batch_size)
+        for _ in range(runs):
+            predict_batch(model, images)
+
+    logger.info("Model warm-up done in %.2fs (batch sizes %s)", time.perf_counter() - start, list(batch_sizes))
+
+
+def start_inference():
+    batch_sizes = sorted({1, *settings.MODEL_WARMUP_BATCH_SIZES, settings.INFERENCE_MAX_BATCH_SIZE})
+    inference_executor.start(
+        functools.partial(warmup_model, batch_sizes, settings.MODEL_WARMUP_RUNS)
+    )
+
+
+# =========================
+# 📦 Micro-batching
+# =========================
+async def _run_batch(images):
+    results, timings = await inference_executor.submit(predict_arrays, images)
+    # ทุกภาพใน batch ได้ timings ชุดเดียวกัน (forward pass เดียวกัน)
+    return [(result, timings) for result in results]
+
+
+prediction_batcher = MicroBatcher(
+    _run_batch,
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+)
+
+
+# =========================
+# 🗃 Prediction cache (key = sha256 ของไฟล์ที่อัปโหลด)
+# =========================
+# PREDICT_CACHE_PATH ว่าง -> ค่า default ของแต่ละ backend
+PREDICT_CACHE_DEFAULT_PATHS = {
+    "sqlite": "./prediction_cache.db",
+    "disk": "./prediction_cache",
+    "redis": "redis://localhost:6379/0",
+}
+
+prediction_cache = TieredCache(
+    LRUCache(
+        maxsize=settings.PREDICT_CACHE_SIZE,
+        ttl=settings.PREDICT_CACHE_TTL_SECONDS,
+    ),
+    create_cache_store(
+        settings.PREDICT_CACHE_BACKEND,
+        settings.PREDICT_CACHE_PATH or PREDICT_CACHE_DEFAULT_PATHS.get(settings.PREDICT_CACHE_BACKEND),
+        settings.PREDICT_CACHE_STORE_TTL_SECONDS,
+    ),
+)
+
+# dHash ของภาพที่เคย predict (ในหน่วยความจำ) -> หาภาพที่เกือบซ้ำภายใน N bit
+phash_index = HammingIndex(
+    max_distance=settings.PREDICT_CACHE_PHASH_DISTANCE,
+    maxsize=settings.PREDICT_CACHE_SIZE,
+)
+
+_phash_hits = 0
+
+
+# เปลี่ยนเมื่อรูปแบบผลลัพธ์เปลี่ยน เพื่อไม่ให้อ่านค่าเก่าจาก tier 2
+CACHE_NAMESPACE = f"v2-k{settings.PREDICT_TOP_K}-t{settings.MODEL_TEMPERATURE}-{settings.MODEL_BACKEND}"
+
+
+def image_hash(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+async def predict_upload(contents: bytes, key: str = None, timings: dict = None):
+    global _phash_hits
+
+    # timings: dict ที่ผู้เรียกส่งมาให้เติม latency (ms) แต่ละช่วง
+    timings = {} if timings is None else timings
+    timings["cached"] = True
+
+    key = f"{CACHE_NAMESPACE}-{key or image_hash(contents)}"
+
+    # 🔥 ภาพเดิม -> ข้าม decode และ inference ทั้งหมด
+    result = await prediction_cache.aget(key)
+    if result is not None:
+        return result
+
+    # decode + resize ขนานกันใน executor (ได้ uint8 224x224) แล้วส่งเข้า batcher รวม forward pass
+    start = time.perf_counter()
+    image, decode_ms = await inference_executor.submit(preprocess_bytes, contents)
+    timings["preprocess_ms"] = elapsed_ms(start)
+    timings["decode_ms"] = decode_ms
+
+    phash = None
+    if settings.PREDICT_CACHE_PHASH:
+        phash = dhash(image)
+
+        # ภาพใกล้เคียงที่สุดใน index; ไม่เจอ (เช่นหลัง restart) -> ลอง key ตรงตัวใน tier 2
+        match = phash_index.find(phash) or phash
+        result = await prediction_cache.aget(f"{CACHE_NAMESPACE}-phash-{match}")
+
+        if result is not None:
+            _phash_hits += 1
+            await prediction_cache.aset(key, result)
+            return result
+
+    timings["cached"] = False
+
+    start = time.perf_counter()
+    result, batch_timings = await prediction_batcher.submit(image)
+    timings["inference_ms"] = elapsed_ms(start)
+    timings.update(batch_timings)
+
+    # รอ executor (decode) + รอ batcher รวม batch + รอ executor (forward)
+    worker_ms = decode_ms + sum(batch_timings.values())
+    timings["queue_ms"] = round(max(0.0, timings["preprocess_ms"] + timings["inference_ms"] - worker_ms), 3)
+
+    await prediction_cache.aset(key, result)
+    if phash:
+        phash_index.add(phash)
+        await prediction_cache.aset(f"{CACHE_NAMESPACE}-phash-{phash}", result)
+
+    return result
+
+
+# =========================
+# 📦 หลายภาพพร้อมกัน: ส่งเข้า batcher พร้อมกันทีละชุด แล้วคืนผลตามลำดับที่เสร็จ
+# =========================
+async def predict_many(items):
+    """Yield ``(index, result_or_exception, timings)`` for ``items = [(contents, key), ...]``."""
+    semaphore = asyncio.Semaphore(max(settings.INFERENCE_MAX_BATCH_SIZE, inference_executor.workers))
+
+    async def run(index, contents, key):
+        timings = {}
+        async with semaphore:
+            try:
+                return index, await predict_upload(contents, key=key, timings=timings), timings
+            except Exception as e:
+                return index, e, timings
+
+    tasks = [
+        asyncio.ensure_future(run(index, contents, key))
+        for index, (contents, key) in enumerate(items)
+    ]
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # client หลุดกลางทาง -> ยกเลิกภาพที่ยังไม่เสร็จ
+        for task in tasks:
+            task.cancel()
 
-    if _model is None:
-        with _model_lock:
-            if _model is None:
-                print("🔥 Loading model...")
-                _model = load_model()
 
-    return predict(_model, image)
+def get_predict_stats():
+    return {
+        "executor": {
+            "mode": inference_executor.mode,
+            "workers": inference_executor.workers,
+            "pending": inference_executor.pending,
+            "capacity": inference_executor.capacity,
+        },
+        "batching": prediction_batcher.stats(),
+        "uploads": get_upload_stats(),
+        "prediction_log": prediction_log_buffer.stats(),
+        "cache": {
+            **prediction_cache.stats(),
+            "phash_hits": _phash_hits,
+            "phash_indexed": len(phash_index),
+        },
+    }
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import engine
+from app.models.prediction_log import PredictionLog
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionLogBuffer:
+    """In-memory ring buffer of prediction rows, flushed to the DB in bulk.
+
+    ``record`` never touches the database; a background task drains the
+    buffer every ``flush_interval_ms`` or as soon as ``batch_size`` rows are
+    waiting, writing each chunk with a single executemany INSERT.
+    """
+
+    def __init__(self, capacity: int = 10000, batch_size: int = 500, flush_interval_ms: float = 1000):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._rows = deque(maxlen=capacity)
+        self._wakeup = None
+        self._task = None
+
+    # =========================
+    # Request path (ไม่แตะ DB)
+    # =========================
+    def record(self, **row):
+        row.setdefault("created_at", datetime.utcnow())
+
+        # deque เต็ม -> แถวเก่าสุดถูกทิ้ง (ยอมเสีย log ดีกว่าให้ request ช้า)
+        if len(self._rows) == self._rows.maxlen:
+            self.dropped += 1
+
+        self._rows.append(row)
+
+        if self._wakeup is not None and len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+
+    # =========================
+    # Background flush
+    # =========================
+    def _drain(self):
+        rows = []
+        while self._rows and len(rows) < self.batch_size:
+            rows.append(self._rows.popleft())
+        return rows
+
+    def _write(self, rows):
+        # list ของ dict -> SQLAlchemy ใช้ executemany ในคำสั่งเดียว
+        with engine.begin() as conn:
+            conn.execute(insert(PredictionLog), rows)
+
+    async def flush(self):
+        while self._rows:
+            rows = self._drain()
+
+            try:
+                await asyncio.to_thread(self._write, rows)
+            except Exception:
+                self.failed += len(rows)
+                logger.exception("Failed to write %d prediction log rows", len(rows))
+                return
+
+            self.written += len(rows)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # เขียนที่ค้างอยู่ให้หมดก่อนปิด
+        await self.flush()
+
+    def stats(self):
+        return {
+            "buffered": len(self._rows),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+prediction_log_buffer = PredictionLogBuffer(
+    capacity=settings.PREDICTION_LOG_BUFFER_SIZE,
+    batch_size=settings.PREDICTION_LOG_BATCH_SIZE,
+    flush_interval_ms=settings.PREDICTION_LOG_FLUSH_MS,
+)
+
+
+def record_prediction(image_hash: str, result: dict, timings: dict, user_id: str = None):
+    if not settings.PREDICTION_LOG_ENABLED:
+        return
+
+    prediction_log_buffer.record(
+        image_hash=image_hash,
+        class_name=result["class_name"],
+        confidence=result["confidence"],
+        cached=timings.get("cached", False),
+        read_ms=timings.get("read_ms"),
+        preprocess_ms=timings.get("preprocess_ms"),
+        inference_ms=timings.get("inference_ms"),
+        total_ms=timings.get("total_ms"),
+        user_id=user_id,
+    )
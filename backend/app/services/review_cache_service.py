@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.cache_version import CacheVersion
+from app.utils.cache import LRUCache
+
+REVIEWS = "reviews"
+
+# body ที่ render แล้ว: key = route + params + version
+review_response_cache = LRUCache(
+    maxsize=settings.REVIEW_CACHE_SIZE,
+    ttl=settings.REVIEW_CACHE_TTL_SECONDS,
+)
+
+
+# =========================
+# Version counter (อยู่ใน DB -> ทุก worker เห็นตรงกัน)
+# =========================
+class _LocalVersion:
+    # จำ version ล่าสุดไว้สั้นๆ ไม่ต้อง query ทุก request
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.value = None
+        self.expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if time.monotonic() < self.expires_at:
+            return self.value
+        return None
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+            self.expires_at = time.monotonic() + self.ttl
+
+    def expire(self):
+        with self._lock:
+            self.expires_at = 0.0
+
+
+_local_version = _LocalVersion(settings.REVIEW_CACHE_VERSION_TTL_SECONDS)
+
+
+def bump_review_version(db: Session):
+    """Call inside a review write, before ``db.commit()``."""
+    updated = db.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == REVIEWS)
+        .values(version=CacheVersion.version + 1)
+    ).rowcount
+
+    if not updated:
+        db.add(CacheVersion(name=REVIEWS, version=1))
+
+    db.info["review_version_bumped"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _expire_local_version(session):
+    # process ที่เขียนเห็นผลทันที ไม่ต้องรอ REVIEW_CACHE_VERSION_TTL_SECONDS
+    if session.info.pop("review_version_bumped", False):
+        _local_version.expire()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bump(session):
+    session.info.pop("review_version_bumped", None)
+
+
+def cached_review_version():
+    return _local_version.get()
+
+
+def load_review_version(db: Session) -> int:
+    version = db.query(CacheVersion.version).filter(CacheVersion.name == REVIEWS).scalar() or 0
+    _local_version.set(version)
+    return version
+
+
+# =========================
+# ETag / Cache-Control
+# =========================
+def make_etag(body: bytes) -> str:
+    # strong ETag: เปลี่ยนเมื่อ byte ของ body เปลี่ยนเท่านั้น
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+def cache_control() -> str:
+    return f"public, max-age={settings.REVIEW_CACHE_MAX_AGE}, must-revalidate"
+
+
+def get_review_cache_stats():
+    return {**review_response_cache.stats(), "version": _local_version.value}
@@ -0,0 +1,213 @@
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from datetime import datetime
+import base64
+import json
+
+from app.config import settings
+from app.exceptions import InvalidReviewError, ReviewNotFoundError, ReviewPermissionError
+from app.models.review import Review
+from app.models.user import User
+from app.services.location_service import set_review_location
+from app.services.review_cache_service import bump_review_version
+from app.services.review_stats_service import (
+    record_review_added,
+    record_rating_changed,
+    record_review_removed,
+)
+
+
+# =========================
+# Column projection: ดึงเฉพาะ field ที่ ReviewResponse ใช้ + ชื่อผู้ใช้ใน JOIN เดียว
+# (ไม่ต้องโหลด Review/User เป็น ORM object และไม่เกิด lazy load ทีละแถว)
+# ลำดับ / ชื่อ column = field ของ ReviewResponse (router encode row เป็น JSON ตรงๆ)
+# =========================
+REVIEW_RESPONSE_COLUMNS = (
+    Review.id,
+    Review.class_name,
+    Review.review_text,
+    Review.rating,
+    func.coalesce(User.full_name, "Unknown").label("username"),
+    Review.created_at,
+    Review.latitude,
+    Review.longitude,
+    Review.place_name,
+)
+
+
+def review_rows_query(db: Session):
+    return (
+        db.query(*REVIEW_RESPONSE_COLUMNS)
+        .outerjoin(User, User.id == Review.user_id)
+        .filter(Review.is_deleted == False)
+    )
+
+
+# =========================
+# Keyset (cursor) pagination บน (created_at, id) เรียงใหม่ -> เก่า
+# cursor = base64url ของ [created_at, id] ของแถวสุดท้ายในหน้าก่อน
+# =========================
+def encode_cursor(created_at: datetime, review_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), review_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, review_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(review_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def clamp_page_size(limit: int) -> int:
+    return max(1, min(limit or settings.REVIEW_PAGE_SIZE, settings.REVIEW_PAGE_MAX))
+
+
+def paginate(query, limit: int, cursor: str = None, skip: int = 0):
+    """Return ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+
+    Rows are REVIEW_RESPONSE_COLUMNS tuples, encoded straight to JSON by the router.
+    """
+    limit = clamp_page_size(limit)
+
+    if cursor:
+        created_at, review_id = decode_cursor(cursor)
+        # (created_at, id) < cursor -> ใช้ index (…, created_at, id) ได้ตรงๆ ไม่ต้อง OFFSET
+        query = query.filter(
+            or_(
+                Review.created_at < created_at,
+                and_(Review.created_at == created_at, Review.id < review_id),
+            )
+        )
+
+    query = query.order_by(Review.created_at.desc(), Review.id.desc())
+
+    if skip and not cursor:
+        # 🔥 รองรับ client เก่าที่ยังส่ง skip (ยิ่งลึกยิ่งช้า), OFFSET ต้องมาหลัง ORDER BY
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
+
+
+def list_reviews(db: Session, limit: int = None, cursor: str = None, skip: int = 0):
+    return paginate(review_rows_query(db), limit, cursor, skip)
+
+
+def list_user_reviews(db: Session, user_id: str, limit: int = None, cursor: str = None):
+    query = review_rows_query(db).filter(Review.user_id == user_id)
+    return paginate(query, limit, cursor)
+
+
+def list_class_reviews(db: Session, class_name: str, limit: int = None, cursor: str = None):
+    query = review_rows_query(db).filter(Review.class_name == class_name)
+    return paginate(query, limit, cursor)
+
+
+# =========================
+# Writes: ทุกฟังก์ชันรับ Session เป็น argument แรก
+# -> router เรียกผ่าน DBRunner ได้ทั้ง sync / async engine
+# error เป็น exception ของ domain (app.exceptions) router แปลงเป็น HTTP status เอง
+# =========================
+def get_live_review(db: Session, review_id: int, for_update: bool = False) -> Review:
+    query = db.query(Review).filter(
+        Review.id == review_id,
+        Review.is_deleted == False
+    )
+
+    # 🔒 SELECT ... FOR UPDATE (Postgres): write พร้อมกันบนรีวิวเดียวกันต้องเห็นค่าล่าสุด
+    # ไม่งั้น rating เดิมที่ใช้คำนวณ review_stats จะเก่า (SQLite มี writer ทีละตัวอยู่แล้ว)
+    if for_update:
+        query = query.with_for_update().populate_existing()
+
+    review = query.first()
+
+    if not review:
+        raise ReviewNotFoundError(review_id)
+
+    return review
+
+
+def create_review(db: Session, user_id: str, class_name: str, review_text: str, rating: int) -> int:
+    new_review = Review(
+        class_name=class_name,
+        review_text=review_text,
+        rating=rating,
+        user_id=user_id,
+    )
+
+    db.add(new_review)
+    db.flush()
+
+    # 🔥 อัปเดต review_stats + version ของ response cache ใน transaction เดียวกัน
+    record_review_added(db, new_review)
+    bump_review_version(db)
+    db.commit()
+
+    return new_review.id
+
+
+def parse_rating(rating) -> int:
+    # body เป็น dict ดิบ -> รับเฉพาะจำนวนเต็ม 1-5 (3.0 ได้, 2.5 / "3" / true ไม่ได้)
+    if isinstance(rating, float) and rating.is_integer():
+        rating = int(rating)
+
+    if not isinstance(rating, int) or isinstance(rating, bool) or not 1 <= rating <= 5:
+        raise InvalidReviewError("Rating must be 1-5")
+
+    return rating
+
+
+def update_review(db: Session, review_id: int, user_id: str, rating=None, review_text=None):
+    if rating is not None:
+        rating = parse_rating(rating)
+
+    review = get_live_review(db, review_id, for_update=True)
+
+    if review.user_id != user_id:
+        raise ReviewPermissionError(review_id)
+
+    if rating is not None:
+        record_rating_changed(db, review.class_name, review.rating, rating)
+        review.rating = rating
+
+    if review_text is not None:
+        review.review_text = review_text
+
+    bump_review_version(db)
+    db.commit()
+
+
+def update_review_location(db: Session, review_id: int, user_id: str, latitude, longitude, place_name):
+    review = get_live_review(db, review_id)
+
+    if review.user_id != user_id:
+        raise ReviewPermissionError(review_id)
+
+    set_review_location(review, latitude, longitude, place_name)
+    bump_review_version(db)
+    db.commit()
+
+
+def delete_review(db: Session, review_id: int, user_id: str, is_admin: bool):
+    review = get_live_review(db, review_id, for_update=True)
+
+    # 🔥 owner หรือ admin ลบได้
+    if review.user_id != user_id and not is_admin:
+        raise ReviewPermissionError(review_id)
+
+    review.is_deleted = True
+    db.flush()
+
+    # flush ก่อน เพื่อให้ last_review_at คำนวณจากรีวิวที่เหลือ
+    record_review_removed(db, review)
+    bump_review_version(db)
+    db.commit()
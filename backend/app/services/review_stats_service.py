@@ -0,0 +1,222 @@
+"""Per-class review aggregates (``review_stats``).
+
+ทุก write ของรีวิวเรียกฟังก์ชันในนี้ก่อน commit -> stats อยู่ใน transaction เดียวกับรีวิว
+
+    python -m app.services.review_stats_service rebuild   # คำนวณใหม่ทั้งตาราง
+    python -m app.services.review_stats_service check     # exit 1 ถ้าไม่ตรงกับ reviews
+"""
+import argparse
+import json
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from app.models.review import Review
+from app.models.review_stats import ReviewStats
+
+RATINGS = range(1, 6)
+
+
+def _rating_column(rating: int):
+    return getattr(ReviewStats, f"rating_{rating}")
+
+
+def _insert(db: Session):
+    # INSERT ... ON CONFLICT มีทั้ง SQLite และ Postgres
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(ReviewStats)
+
+
+def _latest_live_review_at(class_name: str):
+    # ใช้ index (class_name, is_deleted, created_at, id)
+    return (
+        Review.__table__.select()
+        .with_only_columns(func.max(Review.created_at))
+        .where(Review.class_name == class_name, Review.is_deleted == False)
+        .scalar_subquery()
+    )
+
+
+# =========================
+# Incremental updates (เรียกก่อน db.commit() ของ router)
+# =========================
+def record_review_added(db: Session, review: Review):
+    rating_column = _rating_column(review.rating)
+
+    statement = _insert(db).values(
+        class_name=review.class_name,
+        review_count=1,
+        rating_sum=review.rating,
+        last_review_at=review.created_at,
+        **{f"rating_{r}": int(r == review.rating) for r in RATINGS},
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ReviewStats.class_name],
+        set_={
+            "review_count": ReviewStats.review_count + 1,
+            "rating_sum": ReviewStats.rating_sum + review.rating,
+            rating_column.key: rating_column + 1,
+            "last_review_at": case(
+                (ReviewStats.last_review_at >= review.created_at, ReviewStats.last_review_at),
+                else_=review.created_at,
+            ),
+        },
+    )
+    db.execute(statement)
+
+
+def record_rating_changed(db: Session, class_name: str, old_rating: int, new_rating: int):
+    if old_rating == new_rating:
+        return
+
+    old_column = _rating_column(old_rating)
+    new_column = _rating_column(new_rating)
+
+    db.execute(
+        update(ReviewStats)
+        .where(ReviewStats.class_name == class_name)
+        .values({
+            ReviewStats.rating_sum: ReviewStats.rating_sum + (new_rating - old_rating),
+            old_column: old_column - 1,
+            new_column: new_column + 1,
+        })
+    )
+
+
+def record_review_removed(db: Session, review: Review):
+    """Call after ``review.is_deleted`` has been flushed."""
+    rating_column = _rating_column(review.rating)
+
+    db.execute(
+        update(ReviewStats)
+        .where(ReviewStats.class_name == review.class_name)
+        .values({
+            ReviewStats.review_count: ReviewStats.review_count - 1,
+            ReviewStats.rating_sum: ReviewStats.rating_sum - review.rating,
+            rating_column: rating_column - 1,
+            ReviewStats.last_review_at: _latest_live_review_at(review.class_name),
+        })
+    )
+
+
+# =========================
+# Read (PK lookup / ทั้งตารางมีแค่จำนวน class)
+# =========================
+def empty_stats(class_name: str) -> dict:
+    return ReviewStats(
+        class_name=class_name,
+        review_count=0,
+        rating_sum=0,
+        **{f"rating_{r}": 0 for r in RATINGS},
+    ).to_dict()
+
+
+def get_class_stats(db: Session, class_name: str) -> dict:
+    stats = db.get(ReviewStats, class_name)
+    return stats.to_dict() if stats else empty_stats(class_name)
+
+
+def get_all_stats(db: Session) -> list:
+    rows = (
+        db.query(ReviewStats)
+        .filter(ReviewStats.review_count > 0)
+        .order_by(ReviewStats.class_name)
+        .all()
+    )
+    return [row.to_dict() for row in rows]
+
+
+# =========================
+# Rebuild / consistency check จากตาราง reviews
+# =========================
+def aggregate_from_reviews(db: Session) -> dict:
+    rows = (
+        db.query(
+            Review.class_name,
+            func.count(Review.id),
+            func.sum(Review.rating),
+            *[func.sum(case((Review.rating == r, 1), else_=0)) for r in RATINGS],
+            func.max(Review.created_at),
+        )
+        .filter(Review.is_deleted == False)
+        .group_by(Review.class_name)
+        .all()
+    )
+
+    return {
+        row[0]: {
+            "review_count": row[1],
+            "rating_sum": row[2],
+            **{f"rating_{r}": row[2 + r] for r in RATINGS},
+            "last_review_at": row[8],
+        }
+        for row in rows
+    }
+
+
+def rebuild_review_stats(db: Session) -> int:
+    expected = aggregate_from_reviews(db)
+
+    db.query(ReviewStats).delete()
+    db.add_all(ReviewStats(class_name=name, **values) for name, values in expected.items())
+    db.commit()
+
+    return len(expected)
+
+
+def check_review_stats(db: Session) -> list:
+    """Return one entry per class whose stored stats differ from ``reviews``."""
+    expected = aggregate_from_reviews(db)
+    stored = {
+        row.class_name: {
+            "review_count": row.review_count,
+            "rating_sum": row.rating_sum,
+            **{f"rating_{r}": getattr(row, f"rating_{r}") for r in RATINGS},
+            "last_review_at": row.last_review_at,
+        }
+        for row in db.query(ReviewStats).all()
+    }
+
+    mismatches = []
+    for class_name in sorted(expected.keys() | stored.keys()):
+        want = expected.get(class_name)
+        have = stored.get(class_name)
+
+        # แถว stats ที่เหลือ 0 รีวิวถือว่าตรงกับ "ไม่มีรีวิว"
+        if want is None and have is not None and have["review_count"] == 0:
+            continue
+
+        if want != have:
+            mismatches.append({"class_name": class_name, "expected": want, "stored": have})
+
+    return mismatches
+
+
+def main(argv=None):
+    from app.database import SessionLocal
+    from app.models.user import User  # noqa: F401 (ให้ relationship ของ Review resolve ได้)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"Rebuilt review_stats for {rebuild_review_stats(db)} classes")
+            return
+
+        mismatches = check_review_stats(db)
+        print(json.dumps(mismatches, indent=2, ensure_ascii=False, default=str))
+        if mismatches:
+            raise SystemExit(1)
+        print("review_stats is consistent")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import base64
+import json
+import re
+import unicodedata
+
+from sqlalchemy import Float, Integer, and_, column, func, literal, literal_column, or_, table, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.review import Review
+from app.models.user import User
+from app.services.review_service import REVIEW_RESPONSE_COLUMNS, clamp_page_size
+
+# ภาษาไทยไม่มีช่องว่างระหว่างคำ -> index เป็น trigram (ทุก 3 ตัวอักษร) ไม่ต้องตัดคำตอนเขียน
+# คำที่สั้นกว่านี้ใช้ trigram index ไม่ได้ -> กรองด้วย LIKE แทน
+TRIGRAM_LENGTH = 3
+
+# FTS5 virtual table (ไม่มี model) -> อ้างถึง rowid / MATCH / bm25 ผ่าน table() ตรงๆ
+_FTS = table("reviews_fts", column("rowid", Integer))
+_FTS_TABLE = literal_column("reviews_fts")
+
+# zero-width space / joiner ที่มักติดมากับข้อความไทยที่ copy มา
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\u2060\ufeff]")
+
+
+# =========================
+# Index: SQLite = FTS5 (tokenize trigram), Postgres = pg_trgm GIN
+# schema ที่ deploy แล้วมาจาก alembic/versions/0007_review_search.py (DDL ชุดเดียวกัน คัดลอกไว้ตายตัว)
+# ที่นี่ใช้กับ benchmark / DB ชั่วคราว -> แก้ตรงนี้ต้องเพิ่ม migration ใหม่ด้วย
+# =========================
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5("
+    " review_text, place_name,"
+    " content='reviews', content_rowid='id', tokenize='trigram')",
+
+    # 🔥 trigger อัปเดต index ในทุก write (ORM, SQL ตรง, migration)
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN"
+    " INSERT INTO reviews_fts(rowid, review_text, place_name)"
+    " VALUES (new.id, new.review_text, new.place_name);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN"
+    " INSERT INTO reviews_fts(reviews_fts, rowid, review_text, place_name)"
+    " VALUES ('delete', old.id, old.review_text, old.place_name);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF review_text, place_name ON reviews BEGIN"
+    " INSERT INTO reviews_fts(reviews_fts, rowid, review_text, place_name)"
+    " VALUES ('delete', old.id, old.review_text, old.place_name);"
+    " INSERT INTO reviews_fts(rowid, review_text, place_name)"
+    " VALUES (new.id, new.review_text, new.place_name);"
+    " END",
+
+    # backfill รีวิวที่มีอยู่แล้ว
+    "INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')",
+)
+
+SQLITE_DROP_SEARCH_DDL = (
+    "DROP TRIGGER IF EXISTS reviews_fts_au",
+    "DROP TRIGGER IF EXISTS reviews_fts_ad",
+    "DROP TRIGGER IF EXISTS reviews_fts_ai",
+    "DROP TABLE IF EXISTS reviews_fts",
+)
+
+# text search config ของ Postgres ไม่มี parser ภาษาไทย -> ใช้ trigram เหมือนฝั่ง SQLite
+POSTGRES_SEARCH_DOCUMENT = "lower(coalesce(review_text, '') || ' ' || coalesce(place_name, ''))"
+
+POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_search_trgm ON reviews"
+    f" USING gin (({POSTGRES_SEARCH_DOCUMENT}) gin_trgm_ops)",
+)
+
+POSTGRES_DROP_SEARCH_DDL = (
+    "DROP INDEX IF EXISTS ix_reviews_search_trgm",
+)
+
+
+def is_search_object(name: str) -> bool:
+    # ตาราง FTS5 + shadow table (reviews_fts_data, _idx, ...) และ index ที่ไม่ได้อยู่ใน model
+    return name.startswith("reviews_fts") or name == "ix_reviews_search_trgm"
+
+
+def create_search_index(bind):
+    ddl = SQLITE_SEARCH_DDL if bind.dialect.name == "sqlite" else POSTGRES_SEARCH_DDL
+    for statement in ddl:
+        bind.execute(text(statement))
+
+
+def drop_search_index(bind):
+    ddl = SQLITE_DROP_SEARCH_DDL if bind.dialect.name == "sqlite" else POSTGRES_DROP_SEARCH_DDL
+    for statement in ddl:
+        bind.execute(text(statement))
+
+
+# =========================
+# Query -> คำค้น
+# =========================
+def _segment_thai(term: str) -> list:
+    # มี pythainlp -> ตัดคำไทยที่พิมพ์ติดกัน ("ผักหวานไข่มด" -> ผักหวาน, ไข่มด) แล้ว AND กัน
+    # ไม่มี -> ค้นทั้งก้อนเป็น substring (trigram หาได้อยู่แล้ว แค่ต้องติดกันตรงตัว)
+    try:
+        from pythainlp.tokenize import word_tokenize
+    except ImportError:
+        return [term]
+
+    return [word for word in word_tokenize(term, keep_whitespace=False) if word.strip()]
+
+
+def parse_search_query(q: str) -> list:
+    """Normalise ``q`` and split it into de-duplicated, lower-cased terms."""
+    q = _INVISIBLE.sub("", unicodedata.normalize("NFC", q or ""))
+    q = q[:settings.SEARCH_QUERY_MAX_LENGTH].lower()
+
+    terms = []
+    for chunk in q.split():
+        for term in (_segment_thai(chunk) if settings.SEARCH_SEGMENT_THAI else [chunk]):
+            if term not in terms:
+                terms.append(term)
+
+    return terms[:settings.SEARCH_MAX_TERMS]
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def term_filter(term: str):
+    pattern = _like_pattern(term)
+    return or_(
+        Review.review_text.ilike(pattern, escape="\\"),
+        Review.place_name.ilike(pattern, escape="\\"),
+    )
+
+
+# =========================
+# score: ยิ่งน้อยยิ่งตรง (bm25 ของ FTS5 ติดลบอยู่แล้ว, similarity ของ pg_trgm กลับเครื่องหมาย)
+# query นี้คืนแค่ (review_id, score) -> จัดอันดับ / ตัดหน้าก่อน แล้วค่อย JOIN users เฉพาะแถวที่ส่งจริง
+# =========================
+def _split_terms(terms: list):
+    long_terms = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+    short_terms = [term for term in terms if len(term) < TRIGRAM_LENGTH]
+    return long_terms, short_terms
+
+
+def _fts_query(db: Session, long_terms: list, filters: list, *columns):
+    # 🔥 JOIN reviews + กรองใน query เดียวกับ MATCH -> แถวที่ลบแล้ว / ไม่ผ่าน filter ไม่ถูกนับเป็น candidate
+    match = _FTS_TABLE.op("MATCH")(" AND ".join(_fts_phrase(term) for term in long_terms))
+    return (
+        db.query(*columns)
+        .join(Review, Review.id == _FTS.c.rowid)
+        .filter(match, *filters)
+    )
+
+
+def _ranked_query(db: Session, terms: list, filters: list, min_id: int = None, before_id: int = None):
+    """``(query, score)`` of live reviews matching every term and ``filters``, optionally limited to an id range."""
+    long_terms, short_terms = _split_terms(terms)
+    filters = [*filters, *[term_filter(term) for term in short_terms]]
+    dialect = db.get_bind().dialect.name
+
+    if long_terms and dialect == "sqlite":
+        if min_id is not None:
+            filters.append(_FTS.c.rowid >= min_id)
+        if before_id is not None:
+            filters.append(_FTS.c.rowid < before_id)
+
+        # review_text สำคัญกว่า place_name
+        matches = _fts_query(
+            db, long_terms, filters,
+            _FTS.c.rowid.label("review_id"), func.bm25(_FTS_TABLE, 1.0, 0.5).label("score"),
+        ).subquery("matches")
+        score = matches.c.score
+        return (
+            db.query(Review.id.label("review_id"), score.label("score"))
+            .join(matches, matches.c.review_id == Review.id)
+        ), score
+
+    if min_id is not None:
+        filters.append(Review.id >= min_id)
+    if before_id is not None:
+        filters.append(Review.id < before_id)
+
+    if long_terms:
+        document = literal_column(POSTGRES_SEARCH_DOCUMENT)
+        score = -func.word_similarity(" ".join(long_terms), document)
+        query = db.query(Review.id.label("review_id"), score.label("score")).filter(
+            # ILIKE บน expression เดียวกับ index -> ใช้ GIN trigram ได้
+            *[document.ilike(_like_pattern(term), escape="\\") for term in long_terms]
+        )
+    else:
+        # คำสั้นล้วน (เช่น "มด") -> ไม่มี index ช่วย, เรียงตามรีวิวใหม่สุด
+        # (score = None -> ORDER BY แค่ id และหยุด scan เมื่อได้ครบหน้า)
+        score = None
+        query = db.query(Review.id.label("review_id"), literal(0.0, Float).label("score"))
+
+    return query.filter(*filters), score
+
+
+def _rank_cutoff(db: Session, terms: list, filters: list):
+    """Id of the ``SEARCH_RANK_CANDIDATES``-th newest match, or ``None`` when every match can be ranked.
+
+    Matches with ``id >= cutoff`` are ranked by score; older ones follow, newest first.
+    """
+    long_terms, short_terms = _split_terms(terms)
+    candidates = settings.SEARCH_RANK_CANDIDATES
+
+    if not candidates or not long_terms or db.get_bind().dialect.name != "sqlite":
+        return None
+
+    filters = [*filters, *[term_filter(term) for term in short_terms]]
+    return (
+        _fts_query(db, long_terms, filters, _FTS.c.rowid)
+        .order_by(_FTS.c.rowid.desc())
+        .offset(candidates - 1)
+        .limit(1)
+        .scalar()
+    )
+
+
+# =========================
+# Cursor = [score, id, cutoff] ของแถวสุดท้าย (เรียง score, id ใหม่ -> เก่า)
+# score = None -> อยู่ในช่วงหลัง cutoff แล้ว (เรียงแค่ id)
+# =========================
+def encode_search_cursor(score, review_id: int, cutoff: int = None) -> str:
+    raw = json.dumps([score, review_id, cutoff], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, review_id, *rest = json.loads(base64.urlsafe_b64decode(padded))
+        cutoff = rest[0] if rest else None
+        return (
+            None if score is None else float(score),
+            int(review_id),
+            None if cutoff is None else int(cutoff),
+        )
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _fetch_page(db: Session, query, score, count: int):
+    # score = None -> เรียงแค่ id ใหม่ -> เก่า
+    order = (Review.id.desc(),) if score is None else (score, Review.id.desc())
+    ranked = query.order_by(*order).limit(count).subquery("ranked")
+
+    outer_order = (Review.id.desc(),) if score is None else (ranked.c.score, Review.id.desc())
+    return (
+        db.query(*REVIEW_RESPONSE_COLUMNS, ranked.c.score)
+        .join(ranked, ranked.c.review_id == Review.id)
+        .outerjoin(User, User.id == Review.user_id)
+        .order_by(*outer_order)
+        .all()
+    )
+
+
+def search_reviews(db: Session, q: str, class_name: str = None, limit: int = None, cursor: str = None):
+    """Return ``(rows, next_cursor)`` ranked best match first; empty query -> no rows."""
+    terms = parse_search_query(q)
+    if not terms:
+        return [], None
+
+    limit = clamp_page_size(limit)
+
+    filters = [Review.is_deleted == False]
+    if class_name:
+        filters.append(Review.class_name == class_name)
+
+    # cutoff อยู่ใน cursor -> ทุกหน้าแบ่งช่วงเดียวกัน แม้มีรีวิวใหม่เข้ามาระหว่างเลื่อนหน้า
+    if cursor:
+        last_score, last_id, cutoff = decode_search_cursor(cursor)
+    else:
+        last_score = last_id = None
+        cutoff = _rank_cutoff(db, terms, filters)
+
+    rows = []
+    in_tail = cutoff is not None and last_id is not None and last_score is None
+
+    # ช่วงแรก: N match ล่าสุด จัดอันดับตาม score
+    if not in_tail:
+        query, score = _ranked_query(db, terms, filters, min_id=cutoff)
+
+        if last_id is not None:
+            if score is None:
+                query = query.filter(Review.id < last_id)
+            else:
+                query = query.filter(
+                    or_(
+                        score > last_score,
+                        and_(score == last_score, Review.id < last_id),
+                    )
+                )
+
+        rows = _fetch_page(db, query, score, limit + 1)
+
+    # ช่วงหลัง: match ที่เก่ากว่า cutoff ต่อท้าย เรียงใหม่ -> เก่า (ไม่ตัดทิ้ง)
+    if cutoff is not None and len(rows) <= limit:
+        query, _ = _ranked_query(db, terms, filters, before_id=cutoff)
+        if in_tail:
+            query = query.filter(Review.id < last_id)
+
+        rows += _fetch_page(db, query, None, limit + 1 - len(rows))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        last_in_tail = cutoff is not None and last.id < cutoff
+        next_cursor = encode_search_cursor(None if last_in_tail else last.score, last.id, cutoff)
+
+    return rows, next_cursor
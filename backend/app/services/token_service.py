@@ -0,0 +1,186 @@
+"""Access + refresh tokens (ที่เดียวของทั้งระบบ)
+
+- access token: JWT อายุสั้น (ACCESS_TOKEN_EXPIRE_MINUTES) ไม่ต้องแตะ DB
+- refresh token: random string, เก็บ sha256 ใน refresh_tokens, ใช้ได้ครั้งเดียว
+  (POST /auth/refresh จะ revoke ตัวเดิมแล้วออกตัวใหม่ใน family เดียวกัน)
+"""
+from datetime import datetime, timedelta
+import hashlib
+import secrets
+import time
+import uuid
+
+from fastapi import HTTPException, Response
+from jose import JWTError, jwt
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.utils.cache import LRUCache
+
+ACCESS_COOKIE = "access_token"
+REFRESH_COOKIE = "refresh_token"
+# browser ส่ง refresh cookie ไปเฉพาะ /auth/refresh (และ path ย่อย) ไม่ใช่ทุก request
+REFRESH_COOKIE_PATH = "/auth/refresh"
+
+# 🔥 claims ที่ verify แล้ว (key = token) -> request ถัดไปไม่ต้องเช็ค signature ซ้ำ
+_claims_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+
+# =========================
+# Access token (JWT)
+# =========================
+def create_access_token(data: dict):
+    to_encode = data.copy()
+
+    expire = datetime.utcnow() + timedelta(
+        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+
+    to_encode.update({"exp": expire, "type": "access"})
+
+    return jwt.encode(
+        to_encode,
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+
+def decode_token(token: str) -> dict:
+    """Verify a JWT and return its claims (memoized); raises ``JWTError``."""
+    payload = _claims_cache.get(token)
+
+    # token ที่หมดอายุแล้วต้อง decode ใหม่ให้ jose raise ExpiredSignatureError
+    if payload is None or payload.get("exp", 0) <= time.time():
+        payload = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+        )
+        _claims_cache.set(token, payload)
+
+    return dict(payload)
+
+
+def verify_token(token: str):
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    # token แบบเก่าที่ไม่มี type ยังใช้ได้จนกว่าจะหมดอายุ
+    if payload.get("type", "access") != "access":
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    return payload
+
+
+def get_token_cache_stats():
+    return _claims_cache.stats()
+
+
+# =========================
+# Refresh token (opaque, rotating)
+# =========================
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_refresh_token(db: Session, user_id: str, family_id: str = None) -> str:
+    """Add a refresh token row to ``db`` (caller commits) and return the raw token."""
+    token = secrets.token_urlsafe(32)
+
+    db.add(RefreshToken(
+        token_hash=_hash(token),
+        user_id=user_id,
+        family_id=family_id or str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+
+    return token
+
+
+def revoke_refresh_token(db: Session, token: str):
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == _hash(token), RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    db.commit()
+
+
+def rotate_refresh_token(db: Session, token: str):
+    """Swap a refresh token for a new one; returns ``(user_id, new_token)``.
+
+    Reusing an already-rotated token revokes its whole family.
+    """
+    record = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash(token)).first()
+    now = datetime.utcnow()
+
+    if record is None or record.expires_at <= now:
+        raise HTTPException(status_code=401, detail="Session หมดอายุ กรุณาเข้าสู่ระบบใหม่")
+
+    # UPDATE แบบมีเงื่อนไข: request ที่ใช้ token เดียวกันพร้อมกันจะได้แค่ตัวเดียว
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == record.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    ).rowcount
+
+    if not claimed:
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == record.family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        db.commit()
+        raise HTTPException(status_code=401, detail="Session หมดอายุ กรุณาเข้าสู่ระบบใหม่")
+
+    new_token = create_refresh_token(db, record.user_id, record.family_id)
+    db.commit()
+
+    return record.user_id, new_token
+
+
+def refresh_session(db: Session, token: str):
+    """Rotate ``token`` and return ``(access_token, refresh_token)``."""
+    user_id, refresh_token = rotate_refresh_token(db, token)
+
+    user = db.query(User.id, User.email).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="ไม่พบผู้ใช้งาน กรุณาเข้าสู่ระบบใหม่")
+
+    return create_access_token({"sub": user.email, "uid": user.id}), refresh_token
+
+
+# =========================
+# Cookie (เว็บ) — client อื่นส่ง Authorization: Bearer แทน (ดู app.dependencies)
+# =========================
+def set_auth_cookies(response: Response, access_token: str, refresh_token: str = None):
+    response.set_cookie(
+        key=ACCESS_COOKIE,
+        value=access_token,
+        httponly=True,
+        secure=settings.COOKIE_SECURE,
+        samesite="lax",
+        path="/",
+    )
+
+    if refresh_token:
+        response.set_cookie(
+            key=REFRESH_COOKIE,
+            value=refresh_token,
+            httponly=True,
+            secure=settings.COOKIE_SECURE,
+            samesite="lax",
+            path=REFRESH_COOKIE_PATH,
+            max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        )
+
+
+def clear_auth_cookies(response: Response):
+    response.delete_cookie(ACCESS_COOKIE, path="/")
+    response.delete_cookie(REFRESH_COOKIE, path=REFRESH_COOKIE_PATH)
+
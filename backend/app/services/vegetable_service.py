@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+import json
+
+from app.ml.labels import CLASS_NAMES
+
+# =========================
+# 🌿 VEGETABLE INFO DATABASE
+# =========================
+VEGETABLE_INFO = {
+    "มะแขว่น": {
+        "thai_name": "มะแขว่น",
+        "local_name": "หมากแขว่น",
+        "scientific_name": "Zanthoxylum limonella",
+        "properties": "ช่วยขับลม แก้ท้องอืด บำรุงธาตุ",
+        "recommended_menu": "ไส้อั่ว, น้ำพริกมะแขว่น",
+        "botanical_description": "ไม้ยืนต้นขนาดเล็ก มีหนามตามลำต้น",
+        "images": [
+            "/images/makwaen1.png",
+            "/images/makwaen2.png",
+            "/images/makwaen3.png"
+        ]
+    },
+    "สะเดา": {
+        "thai_name": "สะเดา",
+        "local_name": "ผักสะเดา",
+        "scientific_name": "Azadirachta indica",
+        "properties": "ช่วยลดไข้ บำรุงเลือด",
+        "recommended_menu": "สะเดาน้ำปลาหวาน",
+        "botanical_description": "ไม้ยืนต้น ใบประกอบ ดอกสีขาว",
+        "images": [
+            "/images/sadao1.png",
+            "/images/sadao2.png",
+            "/images/sadao3.png"
+        ]
+    },
+    "สะแล": {
+        "thai_name": "สะแล",
+        "local_name": "ผักสะแล",
+        "scientific_name": "Bauhinia purpurea",
+        "properties": "ช่วยบำรุงร่างกาย",
+        "recommended_menu": "แกงแคสะแล",
+        "botanical_description": "ไม้ยืนต้น ดอกสีม่วง",
+        "images": [
+            "/images/salae1.png",
+            "/images/salae2.png",
+            "/images/salae3.png"
+        ]
+    },
+    "นางแลว": {
+        "thai_name": "นางแลว",
+        "local_name": "ดอกนางแลว",
+        "scientific_name": "Clerodendrum glandulosum",
+        "properties": "ช่วยลดความดัน",
+        "recommended_menu": "แกงดอกนางแลว",
+        "botanical_description": "ไม้พุ่ม ดอกเป็นช่อ",
+        "images": [
+            "/images/nanglaew1.png",
+            "/images/nanglaew2.png",
+            "/images/nanglaew3.png"
+        ]
+    },
+    "ผักเผ็ด": {
+        "thai_name": "ผักเผ็ด",
+        "local_name": "ผักแพว",
+        "scientific_name": "Polygonum odoratum",
+        "properties": "ช่วยขับลม เจริญอาหาร",
+        "recommended_menu": "ลาบ, น้ำตก",
+        "botanical_description": "ไม้ล้มลุก ใบเรียวยาว",
+        "images": [
+            "/images/phakphet1.png",
+            "/images/phakphet2.png",
+            "/images/phakphet3.png"
+        ]
+    },
+    "ขี้หูด": {
+        "thai_name": "ผักขี้หูด",
+        "local_name": "ขี้หูด",
+        "scientific_name": "Senna tora",
+        "properties": "ช่วยระบายอ่อน ๆ",
+        "recommended_menu": "แกงผักขี้หูด",
+        "botanical_description": "ไม้ล้มลุก ดอกสีเหลือง",
+        "images": [
+            "/images/kheehud1.png",
+            "/images/kheehud2.png",
+            "/images/kheehud3.png"
+        ]
+    }
+}
+
+
+# =========================
+# ชื่อ class ของโมเดล (classes.json) -> key ใน VEGETABLE_INFO
+# =========================
+CLASS_VEGETABLE_KEYS = {
+    "Broussonetia kurzil": "สะแล",
+    "Neem tree": "สะเดา",
+    "Para cress": "ผักเผ็ด",
+    "RattailedRadish": "ขี้หูด",
+    "Tupistra albiflora": "นางแลว",
+    "Zanthoxylum limonella": "มะแขว่น",
+}
+
+
+# =========================
+# Class index: output index ของโมเดล -> metadata ที่ encode เป็น JSON ไว้แล้ว
+# =========================
+@dataclass(frozen=True)
+class ClassRecord:
+    index: int
+    class_name: str
+    info: dict
+
+    # '"class_name":"...",' + ข้อมูลผัก (ไม่มีวงเล็บปีกกา) สำหรับต่อเป็น response
+    fragment: bytes
+
+    # '{"class_name":"...","thai_name":"...","confidence":' สำหรับรายการ top_k
+    top_k_prefix: bytes
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_class_index(class_names=None):
+    records = []
+
+    for index, class_name in enumerate(class_names or CLASS_NAMES):
+        info = VEGETABLE_INFO.get(CLASS_VEGETABLE_KEYS.get(class_name), {})
+
+        fields = {"class_name": class_name, **info}
+        fragment = _encode(fields)[1:-1]
+
+        top_k_prefix = _encode({
+            "class_name": class_name,
+            "thai_name": info.get("thai_name"),
+        })[:-1] + b',"confidence":'
+
+        records.append(ClassRecord(index, class_name, info, fragment, top_k_prefix))
+
+    return records
+
+
+CLASS_INDEX = build_class_index()
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import threading
+import zipfile
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.exceptions import UploadRejectedError
+from app.utils.image_utils import sniff_image_format
+
+# ตัวนับหน่วยความจำที่ใช้เก็บไฟล์อัปโหลดอยู่ ณ ขณะนั้น (ดูได้ที่ /predict/stats)
+_stats_lock = threading.Lock()
+_stats = {
+    "in_flight_bytes": 0,
+    "peak_in_flight_bytes": 0,
+    "largest_upload_bytes": 0,
+    "rejected": 0,
+}
+
+
+def _track(delta: int):
+    with _stats_lock:
+        _stats["in_flight_bytes"] += delta
+        _stats["peak_in_flight_bytes"] = max(
+            _stats["peak_in_flight_bytes"], _stats["in_flight_bytes"]
+        )
+
+
+def _count_rejected():
+    with _stats_lock:
+        _stats["rejected"] += 1
+
+
+def _reject(status_code: int, detail: str):
+    _count_rejected()
+    return UploadRejectedError(status_code, detail)
+
+
+def get_upload_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+@dataclass
+class UploadedImage:
+    contents: bytes
+    sha256: str
+    format: str
+
+    @property
+    def size(self) -> int:
+        return len(self.contents)
+
+
+# =========================
+# อ่านไฟล์ทีละ chunk: เช็ค format จาก chunk แรก และหยุดทันทีเมื่อเกินขนาด
+# =========================
+async def read_image_upload(
+    file: UploadFile,
+    max_bytes: int = None,
+    chunk_size: int = None,
+) -> UploadedImage:
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    # multipart parser รู้ขนาดไฟล์แล้ว -> ปฏิเสธได้โดยไม่ต้องอ่าน
+    if file.size is not None and file.size > max_bytes:
+        raise _reject(413, f"ไฟล์มีขนาดใหญ่เกิน {max_bytes // (1024 * 1024)} MB")
+
+    first = await file.read(chunk_size)
+
+    image_format = sniff_image_format(first)
+    if image_format not in settings.ALLOWED_IMAGE_FORMATS:
+        raise _reject(415, "รองรับเฉพาะไฟล์ภาพ JPEG, PNG หรือ WEBP")
+
+    digest = hashlib.sha256(first)
+    buffer = bytearray(first)
+    _track(len(buffer))
+
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+
+            if len(buffer) + len(chunk) > max_bytes:
+                raise _reject(413, f"ไฟล์มีขนาดใหญ่เกิน {max_bytes // (1024 * 1024)} MB")
+
+            digest.update(chunk)
+            buffer += chunk
+            _track(len(chunk))
+
+        contents = bytes(buffer)
+    finally:
+        _track(-len(buffer))
+
+    with _stats_lock:
+        _stats["largest_upload_bytes"] = max(_stats["largest_upload_bytes"], len(contents))
+
+    return UploadedImage(
+        contents=contents,
+        sha256=digest.hexdigest(),
+        format=image_format,
+    )
+
+
+# =========================
+# 🗜 Zip ของภาพหลายไฟล์ (สำหรับ /predict/batch)
+# =========================
+def _extract_zip_images(fileobj, max_files: int, max_bytes: int, max_total_bytes: int):
+    items = []
+    total = 0
+
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise _reject(400, "ไฟล์ zip เสียหาย")
+
+    with archive:
+        entries = [info for info in archive.infolist() if not info.is_dir()]
+
+        if len(entries) > max_files:
+            raise _reject(413, f"ส่งภาพได้ไม่เกิน {max_files} ภาพต่อครั้ง")
+
+        for info in entries:
+            # เช็คขนาดจาก header ก่อนแตกไฟล์ (กัน zip bomb) แล้วอ่านแบบจำกัดอีกชั้น
+            if info.file_size > max_bytes:
+                items.append((info.filename, _reject(413, "ไฟล์มีขนาดใหญ่เกินกำหนด")))
+                continue
+
+            with archive.open(info) as entry:
+                contents = entry.read(max_bytes + 1)
+
+            if len(contents) > max_bytes:
+                items.append((info.filename, _reject(413, "ไฟล์มีขนาดใหญ่เกินกำหนด")))
+                continue
+
+            total += len(contents)
+            if total > max_total_bytes:
+                raise _reject(413, "ขนาดรวมของภาพใน zip ใหญ่เกินกำหนด")
+
+            image_format = sniff_image_format(contents[:16])
+            if image_format not in settings.ALLOWED_IMAGE_FORMATS:
+                items.append((info.filename, _reject(415, "รองรับเฉพาะไฟล์ภาพ JPEG, PNG หรือ WEBP")))
+                continue
+
+            items.append((
+                info.filename,
+                UploadedImage(
+                    contents=contents,
+                    sha256=hashlib.sha256(contents).hexdigest(),
+                    format=image_format,
+                )
+            ))
+
+    return items
+
+
+async def read_zip_upload(file: UploadFile, max_files: int = None, max_bytes: int = None):
+    """Return ``[(filename, UploadedImage | UploadRejectedError), ...]`` for a zip upload."""
+    max_files = max_files or settings.PREDICT_BATCH_MAX_FILES
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+
+    # zipfile อ่านแบบ sync -> ทำใน thread
+    return await asyncio.to_thread(
+        _extract_zip_images, file.file, max_files, max_bytes, settings.MAX_BATCH_UPLOAD_BYTES
+    )
+
+
+# =========================
+# ASGI middleware: ปฏิเสธ request ที่ใหญ่เกินก่อน multipart parser จะอ่าน body
+# =========================
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, limits: dict):
+        self.app = app
+        # {path_prefix: max_bytes} เลือก prefix ที่ยาวที่สุดที่ตรงกับ path
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit(self, path: str):
+        for prefix, max_bytes in self.limits:
+            if path.startswith(prefix):
+                # เผื่อ overhead ของ multipart boundary / header
+                return max_bytes + 64 * 1024
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit(scope["path"]) if scope["type"] == "http" else None
+
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                _count_rejected()
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": "ไฟล์มีขนาดใหญ่เกินกำหนด"}
+                )
+                return await response(scope, receive, send)
+
+        # chunked upload ไม่มี content-length -> นับ byte ระหว่างรับ
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    _count_rejected()
+                    # HTTPException ผ่าน body parser ของ FastAPI ออกมาเป็น 413 ตรงๆ
+                    raise HTTPException(status_code=413, detail="ไฟล์มีขนาดใหญ่เกินกำหนด")
+
+            return message
+
+        return await self.app(scope, limited_receive, send)
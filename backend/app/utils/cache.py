@@ -0,0 +1,371 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+_MISSING = object()
+
+
+# =========================
+# In-process LRU + TTL
+# =========================
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# =========================
+# Second-tier stores (ค่าเก็บเป็น JSON)
+# =========================
+class SQLiteCacheStore:
+    def __init__(self, path: str, ttl: float = 86400):
+        self.path = path
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or row[1] < time.time():
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at)
+        )
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        self._conn().execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+    def stats(self):
+        return {"backend": "sqlite", "hits": self.hits, "misses": self.misses}
+
+
+class DiskCacheStore:
+    def __init__(self, directory: str, ttl: float = 86400):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        # แยกโฟลเดอร์ย่อยตาม 2 ตัวท้ายของ key (ส่วน hash) กันไฟล์เยอะเกินในโฟลเดอร์เดียว
+        return self.directory / key[-2:] / f"{key}.json"
+
+    def get(self, key, default=None):
+        path = self._path(key)
+
+        try:
+            if path.stat().st_mtime + self.ttl < time.time():
+                path.unlink(missing_ok=True)
+                self.misses += 1
+                return default
+
+            value = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        # เขียนไฟล์ชั่วคราวแล้ว rename เพื่อไม่ให้อ่านเจอไฟล์ครึ่งๆ กลางๆ
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(value), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def stats(self):
+        return {"backend": "disk", "hits": self.hits, "misses": self.misses}
+
+
+class RedisCacheStore:
+    """Redis-compatible store (Redis, Valkey, KeyDB ...); ``path`` is the URL."""
+
+    def __init__(self, url: str, ttl: float = 86400):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Redis cache backend requires redis (pip install redis)")
+
+        self._client = redis.Redis.from_url(url)
+        self._errors = (redis.RedisError,)
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key, default=None):
+        try:
+            raw = self._client.get(key)
+        except self._errors:
+            # Redis ล่ม -> ถือว่า miss แล้วไปอ่านจากต้นทาง
+            self.errors += 1
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl: float = None):
+        try:
+            self._client.set(key, json.dumps(value), px=int((self.ttl if ttl is None else ttl) * 1000))
+        except self._errors:
+            self.errors += 1
+
+    def delete(self, key):
+        try:
+            self._client.delete(key)
+        except self._errors:
+            self.errors += 1
+
+    def stats(self):
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+def create_cache_store(backend: str, path: str, ttl: float):
+    if not backend:
+        return None
+    if backend == "sqlite":
+        return SQLiteCacheStore(path, ttl=ttl)
+    if backend == "disk":
+        return DiskCacheStore(path, ttl=ttl)
+    if backend == "redis":
+        return RedisCacheStore(path, ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+# =========================
+# LRU (tier 1) + store (tier 2)
+# =========================
+class TieredCache:
+    def __init__(self, memory: LRUCache, store=None):
+        self.memory = memory
+        self.store = store
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        if self.store is None:
+            return default
+
+        value = self.store.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+
+        # ดึงขึ้นมาไว้ใน memory สำหรับครั้งถัดไป
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    # 🔥 ใช้บน event loop: memory อ่าน/เขียน inline, tier 2 (sqlite / ไฟล์ / redis) ใน thread
+    async def aget(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        if self.store is None:
+            return default
+
+        value = await asyncio.to_thread(self.store.get, key, _MISSING)
+        if value is _MISSING:
+            return default
+
+        self.memory.set(key, value)
+        return value
+
+    async def aset(self, key, value):
+        self.memory.set(key, value)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, value)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def stats(self):
+        return {
+            "memory": self.memory.stats(),
+            "store": self.store.stats() if self.store is not None else None,
+        }
+
+
+# =========================
+# Near-duplicate lookup ของ perceptual hash (Hamming distance <= max_distance)
+# แบ่ง hash เป็น max_distance + 1 ช่วง: hash ที่ต่างกันไม่เกิน max_distance bit
+# ต้องมีอย่างน้อย 1 ช่วงที่ตรงกันทุก bit (pigeonhole) -> เทียบเฉพาะ hash ใน bucket เดียวกัน
+# =========================
+class HammingIndex:
+    def __init__(self, max_distance: int = 3, maxsize: int = 1024, bits: int = 64):
+        self.max_distance = max(0, min(max_distance, bits - 1))
+        self.maxsize = maxsize
+
+        bands = self.max_distance + 1
+        self._bands = [
+            (bits * i // bands, bits * (i + 1) // bands)
+            for i in range(bands)
+        ]
+        self._bits = bits
+
+        self._hashes = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, value: int):
+        for i, (start, end) in enumerate(self._bands):
+            width = end - start
+            yield i, (value >> (self._bits - end)) & ((1 << width) - 1)
+
+    def add(self, hash_hex: str):
+        if self.maxsize <= 0:
+            return
+
+        value = int(hash_hex, 16)
+
+        with self._lock:
+            if hash_hex in self._hashes:
+                self._hashes.move_to_end(hash_hex)
+                return
+
+            self._hashes[hash_hex] = value
+            for band in self._band_keys(value):
+                self._buckets.setdefault(band, set()).add(hash_hex)
+
+            while len(self._hashes) > self.maxsize:
+                old_hex, old_value = self._hashes.popitem(last=False)
+                for band in self._band_keys(old_value):
+                    bucket = self._buckets.get(band)
+                    if bucket is not None:
+                        bucket.discard(old_hex)
+                        if not bucket:
+                            del self._buckets[band]
+
+    def find(self, hash_hex: str):
+        """Return the closest indexed hash within ``max_distance`` bits, or None."""
+        value = int(hash_hex, 16)
+        best, best_distance = None, self.max_distance + 1
+
+        with self._lock:
+            for band in self._band_keys(value):
+                for candidate in self._buckets.get(band, ()):
+                    distance = bin(self._hashes[candidate] ^ value).count("1")
+                    if distance < best_distance:
+                        best, best_distance = candidate, distance
+
+            if best is not None:
+                self._hashes.move_to_end(best)
+
+        return best
+
+    def __len__(self):
+        return len(self._hashes)
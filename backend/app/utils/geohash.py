@@ -0,0 +1,67 @@
+# =========================
+# Geohash (base32) สำหรับจัดกลุ่มจุดบนแผนที่
+# prefix ยาว n ตัว = cell เดียวกัน -> GROUP BY substr(geohash, 1, n)
+# =========================
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# 9 ตัว ≈ 5m x 5m พอสำหรับทุก zoom ที่ cluster
+DEFAULT_PRECISION = 9
+
+
+def encode(latitude: float, longitude: float, precision: int = DEFAULT_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        # สลับ bit ของ longitude / latitude
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lng_range[0] = mid
+            else:
+                value <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_range[0] = mid
+            else:
+                value <<= 1
+                lat_range[1] = mid
+
+        even = not even
+        bits += 1
+
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def decode(geohash: str):
+    """Return the ``(latitude, longitude)`` centre of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if value >> shift & 1:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
@@ -0,0 +1,62 @@
+from pathlib import Path
+from PIL import Image
+import numpy as np
+
+from app.config import settings
+from app.exceptions import UploadRejectedError
+
+# PIL เตือนที่ MAX_IMAGE_PIXELS และ raise DecompressionBombError ที่ 2 เท่า
+Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
+
+
+# =========================
+# Format sniffing จาก magic bytes (ไม่ต้องเชื่อ content-type / นามสกุลไฟล์)
+# =========================
+def sniff_image_format(header: bytes):
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+# =========================
+# Max-pixels guard (อ่านแค่ header ก่อน decode จริง กัน decompression bomb)
+# =========================
+def check_image_pixels(image: Image.Image, max_pixels: int = None):
+    max_pixels = max_pixels or settings.MAX_IMAGE_PIXELS
+    width, height = image.size
+
+    if width * height > max_pixels:
+        raise UploadRejectedError(
+            413,
+            f"ภาพมีขนาด {width}x{height} พิกเซล ใหญ่เกินกำหนด ({max_pixels} พิกเซล)"
+        )
+
+
+# =========================
+# Perceptual hash (dHash 64-bit) สำหรับจับภาพที่เกือบซ้ำ (resize / re-encode)
+# =========================
+def dhash(image, hash_size: int = 8) -> str:
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+
+    gray = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(gray, dtype=np.int16)
+
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def list_image_files(directory) -> list:
+    return sorted(
+        path for path in Path(directory).rglob("*")
+        if path.suffix.lower() in IMAGE_EXTENSIONS
+    )
@@ -0,0 +1,55 @@
+import orjson
+
+
+# =========================
+# ประกอบ JSON response จากชิ้นส่วนที่ encode ไว้แล้ว (ไม่ต้องสร้าง dict + json.dumps ทุก request)
+# =========================
+def encode_value(value) -> bytes:
+    # orjson: UTF-8 ตรงๆ (ไม่ escape ภาษาไทย), datetime เป็น ISO 8601 เหมือน pydantic
+    return orjson.dumps(value)
+
+
+def encode_rows(rows) -> bytes:
+    """``[row, ...]`` from a column projection -> JSON array of objects in one pass."""
+    if not rows:
+        return b"[]"
+
+    # zip กับชื่อ column เร็วกว่า row._asdict() ราว 3 เท่า
+    keys = rows[0]._fields
+    return orjson.dumps([dict(zip(keys, row)) for row in rows])
+
+
+def encode_float(value: float) -> bytes:
+    # repr ของ float ที่เป็นค่าจำกัดเป็น JSON number ที่ถูกต้องอยู่แล้ว
+    return repr(float(value)).encode("ascii")
+
+
+def encode_top_k(top_k) -> bytes:
+    """``top_k`` is ``[(ClassRecord, score), ...]``."""
+    return b"[" + b",".join(
+        record.top_k_prefix + encode_float(score) + b"}"
+        for record, score in top_k
+    ) + b"]"
+
+
+def encode_prediction(record, confidence: float, top_k) -> bytes:
+    return (
+        b'{"confidence":' + encode_float(confidence)
+        + b"," + record.fragment
+        + b',"top_k":' + encode_top_k(top_k)
+        + b"}"
+    )
+
+
+def encode_unknown(confidence: float, message_fragment: bytes, top_k) -> bytes:
+    return (
+        b'{"class_name":"Unknown","confidence":' + encode_float(confidence)
+        + b',"message":' + message_fragment
+        + b',"top_k":' + encode_top_k(top_k)
+        + b"}"
+    )
+
+
+def with_fields(body: bytes, fields: dict) -> bytes:
+    # ต่อ field เพิ่มไว้หน้า object ที่ encode แล้ว: {"a":1} -> {"index":0,"a":1}
+    return encode_value(fields)[:-1] + b"," + body[1:]
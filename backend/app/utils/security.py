@@ -1,41 +0,0 @@
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from fastapi import HTTPException
-
-from app.config import settings
-
-
-# =========================
-# Create Access Token
-# =========================
-def create_access_token(data: dict):
-    to_encode = data.copy()
-
-    expire = datetime.utcnow() + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-
-    to_encode.update({"exp": expire})
-
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM,
-    )
-
-    return encoded_jwt
-
-
-# =========================
-# Verify Token
-# =========================
-def verify_token(token: str):
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        return payload
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -0,0 +1,231 @@
+"""Shared helpers for the benchmark suite: latency summaries, report
+metadata, a seeded throwaway database and a local uvicorn server."""
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+CLASS_NAMES = [f"class_{i}" for i in range(20)]
+
+
+# =========================
+# Latency summary (ms)
+# =========================
+def percentile(sorted_values, q: float) -> float:
+    # nearest-rank: p99 ของ 100 ค่า = ค่าที่ 99
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ms, elapsed_s: float = None) -> dict:
+    values = sorted(latencies_ms)
+    if not values:
+        return {"count": 0}
+
+    summary = {
+        "count": len(values),
+        "mean_ms": round(statistics.fmean(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+    if elapsed_s:
+        summary["throughput_per_s"] = round(len(values) / elapsed_s, 1)
+    return summary
+
+
+def time_calls(fn, repeat: int, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+# =========================
+# Report (JSON, diff ระหว่าง commit ด้วย benchmarks.compare)
+# =========================
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_metadata() -> dict:
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(path: str, report: dict):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Wrote {path}")
+
+
+# =========================
+# Test data
+# =========================
+def synthetic_jpeg(width: int, height: int, seed: int = 0, quality: int = 90) -> bytes:
+    """Noise + gradient JPEG (ขนาดไฟล์ใกล้ภาพถ่ายจริงกว่าสีพื้น)"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    pixels = np.clip(gradient + rng.normal(0, 40, (height, width, 3)), 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def migrate(database_url: str):
+    # schema จริงจาก alembic (รวม search index) ไม่ใช่ create_all
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, DATABASE_URL=database_url),
+        check=True,
+        capture_output=True,
+    )
+
+
+def seed_reviews(database_url: str, reviews: int, users: int = 100) -> list:
+    """Migrate ``database_url`` and fill it with users/reviews; returns user emails."""
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+
+    from app.models.user import User
+    from app.models.review import Review
+    from app.services.review_stats_service import rebuild_review_stats
+
+    migrate(database_url)
+
+    rng = random.Random(0)
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    emails = [f"user{i}@example.com" for i in range(users)]
+    start = datetime(2024, 1, 1)
+
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": email, "full_name": f"User {i}"}
+            for i, (user_id, email) in enumerate(zip(user_ids, emails))
+        ])
+        conn.execute(insert(Review), [
+            {
+                "class_name": rng.choice(CLASS_NAMES),
+                "review_text": "อร่อยมาก",
+                "rating": rng.randint(1, 5),
+                "is_deleted": False,
+                "created_at": start + timedelta(seconds=i),
+                "user_id": rng.choice(user_ids),
+            }
+            for i in range(reviews)
+        ])
+
+    with Session(engine) as db:
+        rebuild_review_stats(db)
+    engine.dispose()
+
+    return emails
+
+
+# =========================
+# Local server
+# =========================
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(client, base_url: str, path: str = "/ping", timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get(base_url + path)
+            if response.status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"{base_url}{path} did not come up")
+
+
+@contextmanager
+def serve(app: str, env: dict, port: int = None, cwd: Path = BACKEND_DIR, workers: int = 1):
+    """Run ``uvicorn app`` in a subprocess; yields its base URL."""
+    port = port or free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", app,
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=cwd,
+        env=dict(os.environ, **env),
+    )
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# =========================
+# Model: ไฟล์จริง (MODEL_PATH) หรือ MobileNetV3-Large น้ำหนักสุ่ม (latency เท่ากัน ไม่ต้องโหลดอะไร)
+# =========================
+def benchmark_model_path(model_path: str = None, random_weights: bool = False, directory: str = None):
+    """Return ``(path, None)`` or ``(None, reason)`` when the model cannot be used here."""
+    try:
+        import torch
+    except ImportError:
+        return None, "torch is not installed"
+
+    from app.ml.model_loader import resolve_model_path
+
+    if not random_weights:
+        try:
+            return str(resolve_model_path(model_path)), None
+        except FileNotFoundError as e:
+            return None, f"{e} (use --random-weights)"
+
+    try:
+        from torchvision.models import mobilenet_v3_large
+    except ImportError:
+        return None, "--random-weights requires torchvision"
+
+    from app.ml import labels
+
+    model = mobilenet_v3_large(weights=None, num_classes=len(labels.CLASS_NAMES)).eval()
+    path = Path(directory or BACKEND_DIR) / "benchmark-random-weights.pt"
+    torch.jit.script(model).save(str(path))
+    return str(path), None
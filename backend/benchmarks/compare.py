@@ -0,0 +1,75 @@
+"""Diff two benchmark reports (micro / load / suite JSON) and flag regressions.
+
+    cd backend && python -m benchmarks.compare benchmarks/results/abc123.json \\
+        benchmarks/results/def456.json --threshold 10 --fail
+
+เทียบทุก field ที่ลงท้าย ``_ms`` (มากขึ้น = แย่ลง) และ ``throughput_per_s``
+(น้อยลง = แย่ลง) ที่มีอยู่ในทั้งสองไฟล์
+"""
+import argparse
+import json
+
+
+def flatten(report, prefix=""):
+    for key, value in report.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(base: dict, new: dict, threshold: float):
+    base_values = dict(flatten({k: v for k, v in base.items() if k != "meta"}))
+    rows = []
+
+    for path, value in flatten({k: v for k, v in new.items() if k != "meta"}):
+        if path not in base_values:
+            continue
+
+        field = path.rsplit(".", 1)[-1]
+        higher_is_worse = field.endswith("_ms")
+        if not higher_is_worse and field != "throughput_per_s":
+            continue
+
+        before = base_values[path]
+        if before == 0:
+            continue
+
+        change = (value - before) / before * 100
+        worse = change if higher_is_worse else -change
+        rows.append((path, before, value, change, worse > threshold))
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    parser.add_argument("--fail", action="store_true", help="exit 1 when anything regressed")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"{base.get('meta', {}).get('commit', args.base)} -> {new.get('meta', {}).get('commit', args.new)}")
+
+    rows = compare(base, new, args.threshold)
+    width = max((len(path) for path, *_ in rows), default=10)
+    for path, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{path:<{width}}  {before:>12.3f} -> {after:>12.3f}  {change:+7.1f}%{flag}")
+
+    regressions = sum(1 for *_, regressed in rows if regressed)
+    print(f"{len(rows)} metrics compared, {regressions} regressed by more than {args.threshold}%")
+
+    if args.fail and regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Concurrent load test of the review / auth endpoints: sync threadpool vs
+async engine (DB_ASYNC).
+
+    cd backend && python -m benchmarks.db_load_test --reviews 20000 \\
+        --concurrency 200 --requests 4000
+
+แต่ละ mode รันใน subprocess แยก (DB_ASYNC อ่านตอน import) บน SQLite
+ชั่วคราวที่ seed ข้อมูลเดียวกัน แล้วยิง request ผ่าน uvicorn จริงด้วย httpx
+ต้องมี aiosqlite (หรือ asyncpg ถ้าตั้ง DATABASE_URL เป็น Postgres เอง)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+ENDPOINTS = (
+    "/reviews/all/list",
+    "/reviews/my/list",
+    "/reviews/stats",
+    "/me",
+)
+
+
+def seed(database_url: str, reviews: int):
+    from sqlalchemy import create_engine, insert
+
+    from app.database import Base
+    from app.models.user import User
+    from app.models.review import Review
+    from app.models.review_stats import ReviewStats
+    from app.models.prediction_log import PredictionLog
+    from app.models.refresh_token import RefreshToken
+    from app.services.review_stats_service import rebuild_review_stats
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+
+    rng = random.Random(0)
+    user_ids = [str(uuid.uuid4()) for _ in range(100)]
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"user{i}@example.com", "full_name": f"User {i}"}
+            for i, user_id in enumerate(user_ids)
+        ])
+        conn.execute(insert(Review), [
+            {
+                "class_name": f"class_{rng.randrange(20)}",
+                "review_text": "อร่อยมาก",
+                "rating": rng.randint(1, 5),
+                "is_deleted": False,
+                "created_at": start + timedelta(seconds=i),
+                "user_id": rng.choice(user_ids),
+            }
+            for i in range(reviews)
+        ])
+
+    with Session(engine) as db:
+        rebuild_review_stats(db)
+    engine.dispose()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(client, base_url):
+    for _ in range(100):
+        try:
+            await client.get(f"{base_url}/ping")
+            return
+        except Exception:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def drive(base_url: str, token: str, total: int, concurrency: int):
+    import httpx
+
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60, cookies={"access_token": token}) as client:
+        await wait_until_up(client, base_url)
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                response = await client.get(base_url + ENDPOINTS[i % len(ENDPOINTS)])
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+def run_mode(mode: str, database_url: str, args):
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        DB_ASYNC="true" if mode == "async" else "false",
+        MODEL_EAGER_LOAD="false",
+        PREDICTION_LOG_ENABLED="false",
+    )
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        # import หลัง set env ไม่ได้ (settings โหลดไปแล้ว) -> สร้าง token ด้วย secret เดียวกัน
+        from app.services.token_service import create_access_token
+        token = create_access_token({"sub": "user0@example.com"})
+
+        return asyncio.run(drive(f"http://127.0.0.1:{port}", token, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=4_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        seed(database_url, args.reviews)
+
+        report = {"reviews": args.reviews, "concurrency": args.concurrency, "modes": {}}
+        for mode in args.modes.split(","):
+            report["modes"][mode] = run_mode(mode, database_url, args)
+            print(mode, json.dumps(report["modes"][mode]))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Minimal OpenID Connect provider that stands in for Google during load
+tests, so /google/login -> /google/callback runs offline.
+
+    cd backend && python -m uvicorn benchmarks.fake_oauth:app --port 9100
+    GOOGLE_SERVER_METADATA_URL=http://127.0.0.1:9100/.well-known/openid-configuration
+
+/authorize ไม่มีหน้า login: redirect กลับพร้อม code ทันที ส่ง ``login_hint=<email>``
+มาเพื่อเลือกผู้ใช้ (ไม่ส่ง = user0@example.com) id_token เซ็นด้วย HS256
+"""
+import base64
+import os
+import secrets
+import time
+from urllib.parse import urlencode
+
+from authlib.jose import jwt
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse
+from starlette.routing import Route
+
+SIGNING_KEY = os.getenv("FAKE_OAUTH_SIGNING_KEY", "benchmark-signing-key").encode()
+KEY_ID = "benchmark"
+
+# code -> claims (ใช้ครั้งเดียว)
+_codes = {}
+
+
+def _issuer(request: Request) -> str:
+    return str(request.base_url).rstrip("/")
+
+
+async def metadata(request: Request):
+    issuer = _issuer(request)
+    return JSONResponse({
+        "issuer": issuer,
+        "authorization_endpoint": f"{issuer}/authorize",
+        "token_endpoint": f"{issuer}/token",
+        "userinfo_endpoint": f"{issuer}/userinfo",
+        "jwks_uri": f"{issuer}/jwks",
+        "id_token_signing_alg_values_supported": ["HS256"],
+        "response_types_supported": ["code"],
+        "subject_types_supported": ["public"],
+    })
+
+
+async def jwks(request: Request):
+    key = base64.urlsafe_b64encode(SIGNING_KEY).decode().rstrip("=")
+    return JSONResponse({"keys": [{"kty": "oct", "k": key, "alg": "HS256", "kid": KEY_ID}]})
+
+
+async def authorize(request: Request):
+    params = request.query_params
+    email = params.get("login_hint") or "user0@example.com"
+
+    code = secrets.token_urlsafe(16)
+    _codes[code] = {
+        "aud": params["client_id"],
+        "nonce": params.get("nonce"),
+        "email": email,
+        "name": email.split("@")[0],
+        "sub": f"fake-{email}",
+    }
+
+    query = urlencode({"code": code, "state": params.get("state", "")})
+    return RedirectResponse(f"{params['redirect_uri']}?{query}", status_code=302)
+
+
+async def token(request: Request):
+    form = await request.form()
+    claims = _codes.pop(form.get("code"), None)
+    if claims is None:
+        return JSONResponse({"error": "invalid_grant"}, status_code=400)
+
+    now = int(time.time())
+    id_token = jwt.encode(
+        {"alg": "HS256", "kid": KEY_ID},
+        {**claims, "iss": _issuer(request), "iat": now, "exp": now + 3600, "email_verified": True},
+        SIGNING_KEY,
+    ).decode()
+
+    return JSONResponse({
+        "access_token": secrets.token_urlsafe(16),
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "id_token": id_token,
+    })
+
+
+async def userinfo(request: Request):
+    return JSONResponse({"email": "user0@example.com", "name": "user0", "sub": "fake-user0@example.com"})
+
+
+app = Starlette(routes=[
+    Route("/.well-known/openid-configuration", metadata),
+    Route("/jwks", jwks),
+    Route("/authorize", authorize),
+    Route("/token", token, methods=["POST"]),
+    Route("/userinfo", userinfo),
+])
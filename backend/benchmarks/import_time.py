@@ -0,0 +1,101 @@
+"""Import-time profile of ``app.main`` (``python -X importtime``) with a budget.
+
+    cd backend && python -m benchmarks.import_time                  # exit 1 ถ้าเกิน budget
+    cd backend && python -m benchmarks.import_time --budget-ms 1500 --top 30
+
+import รันใน interpreter ใหม่ด้วย environment ว่าง (ไม่มี .env.dev, ไม่มี Google credential)
+ทุกรอบ แล้วใช้ค่า median; ถ้า module หนัก (torch ฯลฯ) ถูก import ตอน import app ถือว่า fail
+เช่นเดียวกับเวลารวมที่เกิน --budget-ms
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import BACKEND_DIR, run_metadata, write_report
+
+# ต้องโหลดตอนใช้งานครั้งแรกเท่านั้น (warm-up / predict / login)
+FORBIDDEN_MODULES = (
+    "torch",
+    "torchvision",
+    "onnxruntime",
+    "authlib.integrations.starlette_client",
+)
+
+
+def profile_import(module: str) -> dict:
+    """Import ``module`` in a fresh interpreter; returns ``{name: (self_us, cumulative_us)}``."""
+    env = {
+        "PATH": os.environ.get("PATH", ""),
+        "PYTHONPATH": str(BACKEND_DIR),
+        # ไม่อ่าน .env.dev ของเครื่อง dev
+        "ENV_FILE": os.devnull,
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def run(args) -> dict:
+    runs = [profile_import(args.module) for _ in range(args.runs)]
+    totals = [modules[args.module][1] / 1000 for modules in runs]
+
+    # module ที่กินเวลามากสุด (cumulative) จากรอบที่ใกล้ median ที่สุด
+    median_ms = statistics.median(totals)
+    modules = runs[min(range(len(runs)), key=lambda i: abs(totals[i] - median_ms))]
+    top = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+
+    forbidden = [name for name in FORBIDDEN_MODULES if name in modules]
+
+    return {
+        "module": args.module,
+        "budget_ms": args.budget_ms,
+        "import_ms": round(median_ms, 1),
+        "runs_ms": [round(total, 1) for total in totals],
+        "module_count": len(modules),
+        "forbidden_imported": forbidden,
+        "top_cumulative_ms": {name: round(cumulative / 1000, 1) for name, (_, cumulative) in top},
+        "passed": median_ms <= args.budget_ms and not forbidden,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        write_report(args.output, {"meta": run_metadata(), "import_time": report})
+
+    if report["forbidden_imported"]:
+        print(f"FAIL: import {args.module} pulled in {', '.join(report['forbidden_imported'])}")
+    if report["import_ms"] > args.budget_ms:
+        print(f"FAIL: import {args.module} took {report['import_ms']} ms (budget {args.budget_ms} ms)")
+    if not report["passed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
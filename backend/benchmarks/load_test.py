@@ -0,0 +1,263 @@
+"""Load test of /predict, the public review lists and the Google login flow
+against a local uvicorn server, at one or more concurrency levels.
+
+    cd backend && python -m benchmarks.load_test --concurrency 1 16 64 \\
+        --output benchmarks/results/load.json
+    cd backend && python -m benchmarks.load_test --scenarios predict --random-weights
+
+ทุกอย่างรัน offline: SQLite ชั่วคราว (หรือ --database-url ของ Postgres ที่ทิ้งได้),
+OAuth provider จำลอง (benchmarks.fake_oauth) และภาพ JPEG สังเคราะห์
+แต่ละ scenario x concurrency ยิง --requests ครั้ง แล้วสรุป p50/p95/p99 + throughput
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import quote
+
+from benchmarks.common import (
+    CLASS_NAMES,
+    benchmark_model_path,
+    free_port,
+    run_metadata,
+    seed_reviews,
+    serve,
+    summarize,
+    synthetic_jpeg,
+    wait_until_up,
+    write_report,
+)
+
+SCENARIOS = ("reviews_all", "reviews_class", "predict", "auth")
+
+
+# =========================
+# Scenarios: แต่ละรอบคืน [(ชื่อ, latency ms, ok), ...]
+# =========================
+async def timed_request(client, name: str, method: str, url: str, ok=(200,), **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return (name, (time.perf_counter() - start) * 1000, response.status_code in ok), response
+
+
+async def reviews_all(client, base_url, i, context):
+    sample, _ = await timed_request(client, "reviews_all", "GET", f"{base_url}/reviews/all/list")
+    return [sample]
+
+
+async def reviews_class(client, base_url, i, context):
+    class_name = CLASS_NAMES[i % len(CLASS_NAMES)]
+    sample, _ = await timed_request(client, "reviews_class", "GET", f"{base_url}/reviews/class/{class_name}")
+    return [sample]
+
+
+async def predict(client, base_url, i, context):
+    images = context["images"]
+    files = {"file": (f"{i}.jpg", images[i % len(images)], "image/jpeg")}
+    sample, _ = await timed_request(client, "predict", "POST", f"{base_url}/predict/", files=files)
+    return [sample]
+
+
+async def auth(client, base_url, i, context):
+    """Google login (stub provider) -> /me -> /auth/refresh"""
+    email = context["emails"][i % len(context["emails"])]
+    start = time.perf_counter()
+
+    login = await client.get(f"{base_url}/google/login")
+    provider = await client.get(f"{login.headers['location']}&login_hint={quote(email)}")
+    callback = await client.get(
+        provider.headers["location"],
+        headers={"Cookie": f"session={login.cookies.get('session', '')}"},
+    )
+
+    samples = [("auth_login", (time.perf_counter() - start) * 1000, callback.status_code == 302)]
+    access_token = callback.cookies.get("access_token")
+    refresh_token = callback.cookies.get("refresh_token")
+    if not access_token:
+        return samples
+
+    sample, _ = await timed_request(
+        client, "auth_me", "GET", f"{base_url}/me",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    samples.append(sample)
+
+    sample, _ = await timed_request(
+        client, "auth_refresh", "POST", f"{base_url}/auth/refresh",
+        json={"refresh_token": refresh_token},
+    )
+    samples.append(sample)
+    return samples
+
+
+SCENARIO_FUNCTIONS = {
+    "reviews_all": reviews_all,
+    "reviews_class": reviews_class,
+    "predict": predict,
+    "auth": auth,
+}
+
+
+# =========================
+# Driver
+# =========================
+async def drive(base_url: str, scenario: str, total: int, concurrency: int, context: dict) -> dict:
+    import httpx
+
+    fn = SCENARIO_FUNCTIONS[scenario]
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    counter = iter(range(total))
+
+    # ไม่เก็บ cookie ข้ามรอบ (แต่ละรอบของ auth ส่ง cookie เอง)
+    cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=120, cookies=cookies) as client:
+        async def worker():
+            for i in counter:
+                try:
+                    results = await fn(client, base_url, i, context)
+                except httpx.HTTPError:
+                    errors[scenario] += 1
+                    continue
+
+                for name, latency, ok in results:
+                    samples[name].append(latency)
+                    if not ok:
+                        errors[name] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        name: {**summarize(latencies, elapsed), "errors": errors[name]}
+        for name, latencies in samples.items()
+    } or {scenario: {"count": 0, "errors": errors[scenario]}}
+
+
+async def run_scenarios(base_url: str, args, context: dict) -> dict:
+    import httpx
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        # /ready = warm-up ของโมเดลเสร็จแล้ว
+        await wait_until_up(client, base_url, "/ready", timeout=300)
+
+    report = {}
+    for scenario in args.scenarios:
+        total = args.predict_requests if scenario == "predict" else args.requests
+        report[scenario] = {}
+
+        for concurrency in args.concurrency:
+            # warm-up รอบสั้นๆ ไม่นับผล (connection pool, cache, JIT ของ TorchScript)
+            await drive(base_url, scenario, min(total, concurrency * 2), concurrency, context)
+
+            result = await drive(base_url, scenario, total, concurrency, context)
+            report[scenario][f"c{concurrency}"] = result
+
+            for name, summary in result.items():
+                print(
+                    f"[{scenario} c={concurrency}] {name}: p50 {summary.get('p50_ms')} ms"
+                    f" p95 {summary.get('p95_ms')} ms p99 {summary.get('p99_ms')} ms"
+                    f" {summary.get('throughput_per_s')}/s errors {summary['errors']}"
+                )
+
+    return report
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        skipped = {}
+        env = {
+            "GOOGLE_CLIENT_ID": "benchmark-client",
+            "GOOGLE_CLIENT_SECRET": "benchmark-secret",
+            "FRONTEND_URL": "http://127.0.0.1/",
+            "PREDICT_CACHE_SIZE": "0" if not args.predict_cache else os.getenv("PREDICT_CACHE_SIZE", "1024"),
+            "PREDICT_CACHE_BACKEND": "",
+        }
+
+        if args.no_review_cache:
+            env["REVIEW_CACHE_SIZE"] = "0"
+
+        if "predict" in args.scenarios:
+            model_path, reason = benchmark_model_path(args.model_path, args.random_weights, tmp)
+            if model_path is None:
+                skipped["predict"] = reason
+                args.scenarios = [s for s in args.scenarios if s != "predict"]
+            else:
+                env["MODEL_PATH"] = model_path
+                env["MODEL_EAGER_LOAD"] = "true"
+
+        if "predict" not in args.scenarios:
+            env["MODEL_EAGER_LOAD"] = "false"
+
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        env["DATABASE_URL"] = database_url
+        emails = seed_reviews(database_url, args.reviews)
+
+        context = {
+            "emails": emails,
+            # ภาพไม่ซ้ำกัน -> ไม่มีรอบไหนได้ผลจาก prediction cache
+            "images": [synthetic_jpeg(1280, 960, seed=i) for i in range(32)] if "predict" in args.scenarios else [],
+        }
+
+        oauth_port = free_port()
+        env["GOOGLE_SERVER_METADATA_URL"] = f"http://127.0.0.1:{oauth_port}/.well-known/openid-configuration"
+
+        with serve("benchmarks.fake_oauth:app", {}, port=oauth_port), \
+                serve("app.main:app", env, workers=args.workers) as base_url:
+            report = asyncio.run(run_scenarios(base_url, args, context))
+
+    for scenario, reason in skipped.items():
+        report[scenario] = {"skipped": reason}
+        print(f"[{scenario}] skipped: {reason}")
+
+    return {
+        "config": {
+            "reviews": args.reviews,
+            "requests": args.requests,
+            "predict_requests": args.predict_requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "database": database_url.split(":", 1)[0],
+        },
+        "scenarios": report,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=1_000, help="per scenario and concurrency level")
+    parser.add_argument("--predict-requests", type=int, default=200)
+    parser.add_argument("--reviews", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--database-url", help="throwaway database to seed (default: temporary SQLite)")
+    parser.add_argument("--model-path", help="defaults to MODEL_PATH")
+    parser.add_argument("--random-weights", action="store_true",
+                        help="serve an untrained MobileNetV3-Large instead of MODEL_PATH")
+    parser.add_argument("--predict-cache", action="store_true", help="keep the prediction cache on")
+    parser.add_argument("--no-review-cache", action="store_true", help="set REVIEW_CACHE_SIZE=0")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = {"meta": run_metadata(), "load": run(args)}
+
+    if args.output:
+        write_report(args.output, report)
+    else:
+        print(json.dumps(report["load"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Micro-benchmarks of the per-request hot paths: image decode/preprocess
+(app.ml.preprocess), the forward pass (app.ml.inference) and review
+serialization (encode_rows).
+
+    cd backend && python -m benchmarks.micro --output benchmarks/results/micro.json
+    cd backend && python -m benchmarks.micro --random-weights   # ไม่มีไฟล์โมเดล
+
+กลุ่มที่รันไม่ได้ในเครื่องนี้ (เช่น ไม่มี torch) จะถูกบันทึกเป็น "skipped" พร้อมเหตุผล
+"""
+import argparse
+import json
+import tempfile
+
+from benchmarks.common import (
+    benchmark_model_path,
+    run_metadata,
+    synthetic_jpeg,
+    time_calls,
+    write_report,
+)
+
+IMAGE_SIZES = ((640, 480), (1920, 1080), (4032, 3024))
+
+
+def bench_preprocess(repeat: int) -> dict:
+    try:
+        from app.ml.preprocess import decode_image, preprocess_batch
+    except ImportError as e:
+        return {"skipped": str(e)}
+
+    report = {}
+    for width, height in IMAGE_SIZES:
+        contents = synthetic_jpeg(width, height)
+        report[f"decode_{width}x{height}"] = {
+            "bytes": len(contents),
+            **time_calls(lambda: decode_image(contents), repeat),
+        }
+
+    batch = [synthetic_jpeg(1920, 1080, seed=i) for i in range(8)]
+    report["preprocess_batch_8x1920x1080"] = time_calls(lambda: preprocess_batch(batch), repeat)
+    return report
+
+
+def bench_inference(repeat: int, model_path: str, random_weights: bool, batch_sizes) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path, reason = benchmark_model_path(model_path, random_weights, tmp)
+        if path is None:
+            return {"skipped": reason}
+
+        import numpy as np
+        from PIL import Image
+
+        from app.ml.inference import predict, predict_batch
+        from app.ml.model_loader import build_model
+        from app.ml.preprocess import INPUT_SIZE, stack_images
+
+        model = build_model(model_path=path)
+
+    image = Image.new("RGB", (1920, 1080), (40, 120, 40))
+    report = {"model": "random-weights" if random_weights else path}
+
+    # predict() = resize + normalize + forward + top-k ของภาพเดียว (path เดียวกับ /predict ที่ไม่ batch)
+    report["predict_1x1920x1080"] = time_calls(lambda: predict(model, image), repeat)
+
+    blank = np.zeros((INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8)
+    for batch_size in batch_sizes:
+        tensor = stack_images([blank] * batch_size)
+        result = time_calls(lambda: predict_batch(model, tensor), repeat)
+        result["ms_per_image"] = round(result["p50_ms"] / batch_size, 3)
+        report[f"predict_batch_{batch_size}"] = result
+
+    return report
+
+
+def bench_serialization(repeat: int, row_counts) -> dict:
+    from app.utils.response_formatter import encode_rows
+    from benchmarks.serialization import load_rows
+
+    report = {}
+    for count in row_counts:
+        rows = load_rows(count)
+        result = time_calls(lambda: encode_rows(rows), repeat)
+        result["us_per_row"] = round(result["p50_ms"] * 1000 / count, 3)
+        report[f"encode_rows_{count}"] = result
+    return report
+
+
+def run(args) -> dict:
+    return {
+        "preprocess": bench_preprocess(args.repeat),
+        "inference": bench_inference(args.repeat, args.model_path, args.random_weights, args.batch_sizes),
+        "serialization": bench_serialization(args.repeat, args.rows),
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--model-path", help="defaults to MODEL_PATH")
+    parser.add_argument("--random-weights", action="store_true",
+                        help="benchmark an untrained MobileNetV3-Large instead of MODEL_PATH")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rows", type=int, nargs="+", default=[20, 1_000])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = {"meta": run_metadata(), "micro": run(args)}
+    print(json.dumps(report["micro"], indent=2))
+
+    if args.output:
+        write_report(args.output, report)
+
+
+if __name__ == "__main__":
+    main()
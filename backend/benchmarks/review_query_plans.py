@@ -0,0 +1,156 @@
+"""EXPLAIN QUERY PLAN + timing of the review list queries before/after the
+indexes from alembic revision 0002.
+
+    cd backend && python -m benchmarks.review_query_plans --reviews 100000
+
+ใช้ SQLite ชั่วคราว (ไม่แตะฐานข้อมูลจริง) และ compile query จาก
+app.services.review_service ตรงๆ จึงเห็น plan เดียวกับที่ API ใช้
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.review import Review
+from app.models.user import User
+from app.models.prediction_log import PredictionLog
+from app.services import review_service
+
+CLASS_NAMES = [f"class_{i}" for i in range(20)]
+
+
+def seed(engine, reviews: int, users: int, deleted_ratio: float):
+    rng = random.Random(42)
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"{user_id}@example.com", "full_name": "bench"}
+            for user_id in user_ids
+        ])
+        conn.execute(insert(Review), [
+            {
+                "class_name": rng.choice(CLASS_NAMES),
+                "review_text": "อร่อย",
+                "rating": rng.randint(1, 5),
+                "latitude": 18.7 + rng.random() if rng.random() < 0.5 else None,
+                "longitude": 98.9 + rng.random(),
+                "is_deleted": rng.random() < deleted_ratio,
+                "created_at": start + timedelta(seconds=rng.randrange(60 * 60 * 24 * 365)),
+                "user_id": rng.choice(user_ids),
+            }
+            for _ in range(reviews)
+        ])
+
+    return user_ids
+
+
+def list_queries(db: Session, user_id: str):
+    """(name, query) ของทุกหน้า list — หน้าแรก limit เท่ากับ API"""
+    limit = review_service.clamp_page_size(None) + 1
+    order = (Review.created_at.desc(), Review.id.desc())
+    base = review_service.review_rows_query(db)
+
+    return [
+        ("all", base.order_by(*order).limit(limit)),
+        ("class", base.filter(Review.class_name == CLASS_NAMES[0]).order_by(*order).limit(limit)),
+        ("user", base.filter(Review.user_id == user_id).order_by(*order).limit(limit)),
+        ("bbox", db.query(Review.id).filter(
+            Review.latitude.between(18.9, 19.0),
+            Review.longitude.between(99.0, 99.2),
+        )),
+    ]
+
+
+def compiled(query, engine):
+    return str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+
+
+def measure(engine, user_id: str, repeat: int):
+    report = {}
+
+    with Session(engine) as db:
+        for name, query in list_queries(db, user_id):
+            sql = compiled(query, engine)
+
+            with engine.connect() as conn:
+                plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    conn.execute(text(sql)).fetchall()
+                    timings.append((time.perf_counter() - start) * 1000)
+
+            report[name] = {
+                "plan": plan,
+                "median_ms": round(statistics.median(timings), 3),
+            }
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--deleted-ratio", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+
+        # "ก่อน": ตัด index ของ revision 0002 ออก เหลือแค่ schema ของ 0001
+        new_indexes = list(Review.__table__.indexes - {
+            index for index in Review.__table__.indexes if index.name == "ix_reviews_id"
+        })
+        for index in new_indexes:
+            index.drop(engine)
+
+        user_ids = seed(engine, args.reviews, args.users, args.deleted_ratio)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        before = measure(engine, user_ids[0], args.repeat)
+
+        for index in new_indexes:
+            index.create(engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        after = measure(engine, user_ids[0], args.repeat)
+        engine.dispose()
+
+    report = {
+        "reviews": args.reviews,
+        "queries": {
+            name: {"before": before[name], "after": after[name]}
+            for name in before
+        },
+    }
+
+    for name, result in report["queries"].items():
+        print(f"[{name}] {result['before']['median_ms']} ms -> {result['after']['median_ms']} ms")
+        for line in result["after"]["plan"]:
+            print(f"    {line}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""/reviews/search latency on a synthetic Thai/English corpus: FTS5 (trigram)
+from alembic revision 0007 vs. a plain LIKE scan, plus the write overhead of
+the sync triggers.
+
+    cd backend && python -m benchmarks.review_search --reviews 100000
+
+ใช้ SQLite ชั่วคราว (ไม่แตะฐานข้อมูลจริง) และเรียก search_reviews ตัวเดียวกับ API
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base
+from app.models.review import Review
+from app.models.user import User
+from app.models.prediction_log import PredictionLog
+from app.services import search_service
+from app.services.review_service import review_rows_query, clamp_page_size
+
+# ข้อความไทยเขียนติดกันไม่เว้นวรรค (เหมือนรีวิวจริง)
+WORDS = [
+    "ผักหวาน", "สะเดา", "ผักกูด", "ชะอม", "ผักแพว", "ยอดมะระ", "ดอกแค", "ใบย่านาง",
+    "แกง", "ต้ม", "ลวก", "จิ้ม", "น้ำพริก", "ไข่มดแดง", "อร่อย", "ขม", "หวาน", "กรอบ",
+    "สด", "ตลาด", "กาดหลวง", "เชียงใหม่", "ลำพูน", "ราคาถูก", "แนะนำ", "มาก",
+]
+ENGLISH = ["fresh", "bitter", "neem", "curry", "market", "spicy", "chili", "paste"]
+PLACES = ["กาดหลวง", "กาดต้นลำไย", "ตลาดสันป่าข่อย", "Warorot market", None]
+
+# ความถี่ของคำแบบ Zipf: คำต้นๆ เจอเกือบทุกรีวิว คำท้ายๆ เจอไม่บ่อย
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+# ตั้งแต่คำที่เจอบ่อย (ต้องจัดอันดับหลายหมื่นแถว) ไปจนถึงคำที่ไม่มีเลย (LIKE ต้อง scan ทั้งตาราง)
+QUERIES = ["ผักหวาน", "ไข่มดแดง", "ผักหวาน แกง", "กาดหลวง", "ใบย่านาง", "chili paste", "มด", "ผักไม่มีในรีวิว"]
+
+
+def make_text(rng: random.Random) -> str:
+    thai = "".join(rng.choices(WORDS, WEIGHTS, k=rng.randint(3, 12)))
+    if rng.random() < 0.3:
+        thai += " " + " ".join(rng.choice(ENGLISH) for _ in range(rng.randint(1, 4)))
+    return thai
+
+
+def seed(engine, reviews: int, users: int):
+    rng = random.Random(42)
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"{user_id}@example.com", "full_name": "bench"}
+            for user_id in user_ids
+        ])
+
+    rows = [
+        {
+            "class_name": f"class_{rng.randrange(20)}",
+            "review_text": make_text(rng),
+            "rating": rng.randint(1, 5),
+            "place_name": rng.choice(PLACES),
+            "is_deleted": rng.random() < 0.05,
+            "created_at": start + timedelta(seconds=rng.randrange(60 * 60 * 24 * 365)),
+            "user_id": rng.choice(user_ids),
+        }
+        for _ in range(reviews)
+    ]
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(Review), rows)
+    return time.perf_counter() - started
+
+
+def like_search(db: Session, q: str, limit: int = None):
+    """Baseline: substring scan ทุกคำ (ไม่มี ranking) เรียงรีวิวใหม่สุด"""
+    query = review_rows_query(db)
+    for term in search_service.parse_search_query(q):
+        query = query.filter(search_service.term_filter(term))
+    query = query.order_by(Review.created_at.desc(), Review.id.desc())
+    return query.all() if limit is None else query.limit(limit + 1).all()
+
+
+def search_all_pages(db: Session, q: str, limit: int) -> list:
+    ids, cursor = [], None
+    while True:
+        rows, cursor = search_service.search_reviews(db, q, limit=limit, cursor=cursor)
+        ids += [row.id for row in rows]
+        if not cursor:
+            return ids
+
+
+def check_candidate_cap(engine, candidates: int) -> dict:
+    """SEARCH_RANK_CANDIDATES เล็กกว่าจำนวน match -> เลื่อนหน้าจนสุดต้องได้ครบทุกรีวิวที่ LIKE เจอ
+
+    (รีวิวที่ถูกลบ ~5% ต้องไม่กินโควตา candidate และ match ที่เก่ากว่า cutoff ต้องไม่หาย)
+    """
+    limit = clamp_page_size(None)
+    original = settings.SEARCH_RANK_CANDIDATES
+    settings.SEARCH_RANK_CANDIDATES = candidates
+    report = {}
+
+    try:
+        with Session(engine) as db:
+            for q in ("ใบย่านาง", "chili paste", "ผักหวาน"):
+                ids = search_all_pages(db, q, limit)
+                expected = {row.id for row in like_search(db, q, None)}
+                report[q] = {
+                    "matches": len(expected),
+                    "returned": len(ids),
+                    "passed": len(ids) == len(set(ids)) and set(ids) == expected,
+                }
+    finally:
+        settings.SEARCH_RANK_CANDIDATES = original
+
+    return report
+
+
+def timed(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, timings
+
+
+def summary(timings):
+    timings = sorted(timings)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+def measure(engine, repeat: int):
+    limit = clamp_page_size(None)
+    report = {}
+
+    with Session(engine) as db:
+        for q in QUERIES:
+            (rows, cursor), fts = timed(lambda: search_service.search_reviews(db, q), repeat)
+            deep = None
+            if cursor:
+                _, deep = timed(lambda: search_service.search_reviews(db, q, cursor=cursor), repeat)
+            like_rows, like = timed(lambda: like_search(db, q, limit), repeat)
+
+            report[q] = {
+                "fts": summary(fts),
+                "fts_page_2": summary(deep) if deep else None,
+                "like": summary(like),
+                "returned": len(rows),
+                "like_returned": min(len(like_rows), limit),
+            }
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cap-check-candidates", type=int, default=50,
+                        help="SEARCH_RANK_CANDIDATES used by the pagination completeness check")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # เขียนแบบไม่มี trigger ก่อน เพื่อวัด overhead ของการ sync index
+        plain = create_engine(f"sqlite:///{os.path.join(tmp, 'plain.db')}")
+        Base.metadata.create_all(plain)
+        plain_seconds = seed(plain, args.reviews, args.users)
+        plain.dispose()
+
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            search_service.create_search_index(conn)
+
+        indexed_seconds = seed(engine, args.reviews, args.users)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        queries = measure(engine, args.repeat)
+        cap_check = check_candidate_cap(engine, args.cap_check_candidates)
+        with engine.connect() as conn:
+            fts_bytes = conn.execute(text("SELECT sum(length(block)) FROM reviews_fts_data")).scalar()
+        engine.dispose()
+
+    report = {
+        "reviews": args.reviews,
+        "insert_seconds": {
+            "without_index": round(plain_seconds, 3),
+            "with_index": round(indexed_seconds, 3),
+        },
+        "fts_index_mb": round(fts_bytes / 1024 / 1024, 1),
+        "queries": queries,
+        "candidate_cap_check": cap_check,
+    }
+
+    print(
+        f"insert {args.reviews} reviews: {report['insert_seconds']['without_index']} s"
+        f" -> {report['insert_seconds']['with_index']} s with triggers,"
+        f" index {report['fts_index_mb']} MB"
+    )
+    for q, result in queries.items():
+        page_2 = result["fts_page_2"]["median_ms"] if result["fts_page_2"] else "-"
+        print(
+            f"[{q}] like {result['like']['median_ms']} ms -> fts {result['fts']['median_ms']} ms"
+            f" (page 2: {page_2} ms, {result['returned']} rows)"
+        )
+
+    for q, result in cap_check.items():
+        status = "ok" if result["passed"] else "FAIL"
+        print(
+            f"[{q}] candidates={args.cap_check_candidates}: {result['returned']}/{result['matches']}"
+            f" matches across all pages {status}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if not all(result["passed"] for result in cap_check.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
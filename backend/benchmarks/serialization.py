@@ -0,0 +1,111 @@
+"""Per-row cost of serializing review listings: the pydantic / stdlib json
+path vs the orjson row-to-bytes path (encode_rows).
+
+    cd backend && python -m benchmarks.serialization --rows 1000 10000
+
+"before" จำลอง path เดิม: สร้าง ReviewResponse ทีละแถว -> validate กับ
+response_model อีกรอบ -> dump เป็น JSON-able -> json.dumps (JSONResponse)
+"after" คือ encode_rows ที่ router ใช้อยู่ตอนนี้
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from starlette.responses import JSONResponse
+
+from app.database import Base
+from app.models.user import User
+from app.models.review import Review
+from app.schemas.review_schema import ReviewResponse
+from app.services.review_service import review_rows_query
+from app.utils.response_formatter import encode_rows
+
+response_adapter = TypeAdapter(List[ReviewResponse])
+
+
+def load_rows(count: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": "u1", "email": "u1@example.com", "full_name": "ผู้ใช้"}])
+        conn.execute(insert(Review), [
+            {
+                "class_name": "Neem tree",
+                "review_text": "ยอดสะเดาลวกจิ้มน้ำพริก อร่อยมาก",
+                "rating": 1 + i % 5,
+                "place_name": "กาดหลวง" if i % 2 else None,
+                "latitude": 18.79 if i % 2 else None,
+                "longitude": 98.98 if i % 2 else None,
+                "is_deleted": False,
+                "created_at": datetime(2024, 1, 1) + timedelta(seconds=i),
+                "user_id": "u1",
+            }
+            for i in range(count)
+        ])
+
+    with Session(engine) as db:
+        return review_rows_query(db).all()
+
+
+def before(rows) -> bytes:
+    items = [ReviewResponse(**row._mapping) for row in rows]
+    content = response_adapter.dump_python(
+        response_adapter.validate_python(items, from_attributes=True),
+        mode="json",
+    )
+    return JSONResponse(content=None).render(content)
+
+
+def after(rows) -> bytes:
+    return encode_rows(rows)
+
+
+def measure(fn, rows, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = []
+    for count in args.rows:
+        rows = load_rows(count)
+
+        # ต้องได้ byte เดียวกันก่อนจึงเทียบเวลาได้
+        assert before(rows) == after(rows)
+
+        before_s = measure(before, rows, args.repeat)
+        after_s = measure(after, rows, args.repeat)
+
+        result = {
+            "rows": count,
+            "before_us_per_row": round(before_s * 1e6 / count, 3),
+            "after_us_per_row": round(after_s * 1e6 / count, 3),
+            "speedup": round(before_s / after_s, 1),
+        }
+        report.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Run the micro-benchmarks and the load test, and save one JSON report per
+commit so runs can be diffed with ``python -m benchmarks.compare``.
+
+    cd backend && python -m benchmarks.suite                     # -> benchmarks/results/<commit>.json
+    cd backend && python -m benchmarks.suite --random-weights --concurrency 1 8 --requests 300
+
+option ของ benchmarks.micro และ benchmarks.load_test ใช้ร่วมกันได้ทั้งหมด
+"""
+import argparse
+
+from benchmarks import load_test, micro
+from benchmarks.common import BACKEND_DIR, run_metadata, write_report
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        conflict_handler="resolve",
+    )
+    micro.add_arguments(parser)
+    load_test.add_arguments(parser)
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--output", help="default: benchmarks/results/<commit>.json")
+    args = parser.parse_args(argv)
+
+    meta = run_metadata()
+    report = {"meta": meta}
+
+    if not args.skip_micro:
+        report["micro"] = micro.run(args)
+    if not args.skip_load:
+        report["load"] = load_test.run(args)
+
+    write_report(args.output or RESULTS_DIR / f"{meta['commit']}.json", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""gunicorn settings for running several uvicorn workers.
+
+    cd backend && gunicorn -c gunicorn.conf.py app.main:app
+
+/metrics รวมค่าของทุก worker ผ่าน PROMETHEUS_MULTIPROC_DIR (prometheus_client multiprocess mode)
+"""
+import os
+import shutil
+import tempfile
+
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+# ต้องตั้งก่อน worker import app (app.core.metrics อ่านค่านี้ตอน import)
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "flowerveg-prometheus"),
+)
+
+
+def on_starting(server):
+    # ไฟล์ของรอบก่อนทำให้ counter ผิด -> ล้างทุกครั้งที่ master start
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
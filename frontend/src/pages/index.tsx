@@ -19,8 +19,14 @@ export default function Home() {
       .catch(() => setLoading(false));
   }, []);
 
-  const handleLogout = () => {
-    window.location.href = "http://localhost:8000/logout";
+  const handleLogout = async () => {
+    // revoke refresh token ฝั่ง server (POST เท่านั้น) แล้วค่อยกลับหน้าแรก
+    await fetch("http://localhost:8000/auth/refresh/logout", {
+      method: "POST",
+      credentials: "include",
+    }).catch(() => {});
+    setUser(null);
+    window.location.href = "/";
   };
 
   return (